@@ -1,12 +1,16 @@
 import os
 import time
+import asyncio
 import logging
 import requests
 import threading
-from typing import Optional
-from dataclasses import dataclass
+from contextlib import nullcontext
+from typing import Optional, Protocol
+from dataclasses import asdict, dataclass
 from urllib.parse import urlparse
 from dotenv import load_dotenv
+from config.project_config import TOKEN_CACHE_ENABLED, TOKEN_CACHE_FILE
+from api.token_cache import TokenCache
 
 # Configure logging
 logging.basicConfig(
@@ -45,28 +49,59 @@ class TokenInfo:
     token_type: str
 
 
-class Authentication:
-    def __init__(self, app_id: str, app_secret: str, auth_url: str):
-        """Initialize the Authentication instance with validation."""
-        # Initialize lock first, before any other operations
-        self._lock = threading.Lock()
+class TokenProvider(Protocol):
+    """What DU clients need from authentication: a current bearer token."""
 
-        # Now use the lock for the initialization
-        with self._lock:
-            self._validate_credentials(app_id, app_secret, auth_url)
+    async def authorization_header(self) -> dict: ...
 
-            self.app_id = app_id
-            self.app_secret = app_secret
-            self.auth_url = auth_url
-            self.bearer_token: Optional[str] = None
-            self.token_expiry: Optional[float] = None
 
-        # Get initial token
-        try:
-            self._initial_token_fetch()
-        except AuthenticationError as e:
-            logger.error(f"Failed to initialize authentication: {e}")
-            raise
+@dataclass(frozen=True)
+class TokenState:
+    """A bearer token and when it expires and should be renewed."""
+
+    access_token: str
+    expires_at: float
+    renew_at: float
+
+
+class Authentication:
+    """Token provider shared by every DU client.
+
+    Reads are lock-free: the current token is an immutable ``TokenState``
+    swapped in whole. Only a refresh takes the lock, so when the token
+    expires a single request is sent and concurrent callers wait for it.
+    No token is fetched until one is first needed; from then on the
+    refresh thread renews it ahead of expiry so callers rarely see an
+    expired one.
+    With a ``token_cache`` the token is shared with the app's other
+    processes through a file on disk.
+    """
+
+    # Seconds before expiry to consider the token invalid
+    EXPIRY_MARGIN = 60
+    # Fraction of the token lifetime after which it is renewed in the background
+    RENEW_FRACTION = 0.75
+
+    def __init__(
+        self,
+        app_id: str,
+        app_secret: str,
+        auth_url: str,
+        token_cache: Optional[TokenCache] = None,
+    ):
+        """Initialize the Authentication instance with validation."""
+        self._validate_credentials(app_id, app_secret, auth_url)
+
+        self.app_id = app_id
+        self.app_secret = app_secret
+        self.auth_url = auth_url
+        self.token_cache = token_cache
+        self._state: Optional[TokenState] = None
+        # Held only while a token request is in flight
+        self._lock = threading.Lock()
+        self.refreshes = 0
+        # Started once the first token is obtained, to renew it ahead of expiry
+        self._refresh_thread: Optional[threading.Thread] = None
 
     @staticmethod
     def _validate_credentials(app_id: str, app_secret: str, auth_url: str) -> None:
@@ -84,48 +119,80 @@ class Authentication:
         except Exception as e:
             raise ConfigurationError(f"Invalid AUTH_URL: {e}")
 
-    def _initial_token_fetch(self):
-        """Fetch initial token without using the lock since we're already in a locked context."""
-        try:
-            data = {
-                "client_id": self.app_id,
-                "client_secret": self.app_secret,
-                "grant_type": "client_credentials",
-                "scope": (
-                    "Du.DocumentManager.Document "
-                    "Du.Classification.Api "
-                    "Du.Digitization.Api "
-                    "Du.Extraction.Api "
-                    "Du.Validation.Api"
-                ),
-            }
+    @property
+    def bearer_token(self) -> Optional[str]:
+        state = self._state
+        return state.access_token if state else None
 
-            response = requests.post(
-                self.auth_url,
-                data=data,
-                timeout=10,
-                headers={"Content-Type": "application/x-www-form-urlencoded"},
-            )
-            response.raise_for_status()
-            token_data = response.json()
-
-            # Validate token response
-            self._validate_token_response(token_data)
-
-            # Set initial token values
-            self.bearer_token = token_data["access_token"]
-            self.token_expiry = time.time() + token_data["expires_in"]
-
-        except Exception as e:
-            logger.error(f"Failed to fetch initial token: {e}")
-            raise TokenError(f"Initial token fetch failed: {str(e)}")
+    @property
+    def token_expiry(self) -> Optional[float]:
+        state = self._state
+        return state.expires_at if state else None
 
     def get_bearer_token(self) -> str:
         """Get a valid bearer token, refreshing if necessary."""
-        # with self._lock:
-        if self._is_token_valid():
-            return self.bearer_token
-
+        state = self._state
+        if self._is_token_valid(state):
+            return state.access_token
+        return self._refresh(state)
+
+    async def aget_bearer_token(self) -> str:
+        """Get a valid bearer token without blocking the event loop to refresh it."""
+        state = self._state
+        if self._is_token_valid(state):
+            return state.access_token
+        return await asyncio.to_thread(self._refresh, state)
+
+    async def authorization_header(self) -> dict:
+        """Return the Authorization header for a DU request."""
+        return {"Authorization": f"Bearer {await self.aget_bearer_token()}"}
+
+    def _refresh(self, seen: Optional[TokenState]) -> str:
+        """Replace the token ``seen`` by the caller, unless another caller already did."""
+        with self._lock:
+            state = self._state
+            if state is not seen and self._is_token_valid(state):
+                return state.access_token
+            with self.token_cache.locked() if self.token_cache else nullcontext():
+                cached = self._cached_state(seen)
+                if cached is not None:
+                    self._state = cached
+                else:
+                    self._update_token(self._fetch_token())
+                    self.refreshes += 1
+                    logger.info("Successfully obtained new bearer token")
+                    if self.token_cache:
+                        self.token_cache.store(**asdict(self._state))
+            self._start_refresh_thread()
+            return self._state.access_token
+
+    def _start_refresh_thread(self) -> None:
+        """Start renewing the token in the background; called with the lock held."""
+        if self._refresh_thread is not None:
+            return
+        self._refresh_thread = threading.Thread(
+            target=token_refresh_scheduler,
+            args=(self,),
+            daemon=True,
+            name="TokenRefreshThread",
+        )
+        self._refresh_thread.start()
+
+    def _cached_state(self, seen: Optional[TokenState]) -> Optional[TokenState]:
+        """Return a valid token another process stored, other than ``seen``."""
+        if self.token_cache is None:
+            return None
+        data = self.token_cache.load()
+        if data is None:
+            return None
+        state = TokenState(**data)
+        if not self._is_token_valid(state):
+            return None
+        if seen is not None and state.access_token == seen.access_token:
+            return None
+        return state
+
+    def _fetch_token(self) -> TokenInfo:
         data = {
             "client_id": self.app_id,
             "client_secret": self.app_secret,
@@ -152,17 +219,12 @@ class Authentication:
             # Validate token response
             self._validate_token_response(token_data)
 
-            # Update token information
-            token_info = TokenInfo(
+            return TokenInfo(
                 access_token=token_data["access_token"],
                 expires_in=token_data["expires_in"],
                 token_type=token_data["token_type"],
             )
 
-            self._update_token(token_info)
-            logger.info("Successfully obtained new bearer token")
-            return self.bearer_token
-
         except requests.exceptions.Timeout:
             raise TokenError("Authentication request timed out")
         except requests.exceptions.ConnectionError:
@@ -190,28 +252,42 @@ class Authentication:
             raise TokenError("Invalid expires_in value in token response")
 
     def _update_token(self, token_info: TokenInfo) -> None:
-        """Update token information with thread safety."""
-        with self._lock:
-            self.bearer_token = token_info.access_token
-            self.token_expiry = time.time() + token_info.expires_in
-
-    def _is_token_valid(self) -> bool:
-        """Check if the current token is valid with a safety margin."""
-        EXPIRY_MARGIN = 60  # Seconds before expiry to consider token invalid
-        return (
-            self.bearer_token is not None
-            and self.token_expiry is not None
-            and time.time() < (self.token_expiry - EXPIRY_MARGIN)
+        """Publish a new token; readers see either the old state or the new one."""
+        now = time.time()
+        lifetime = token_info.expires_in
+        renew_after = min(
+            lifetime * self.RENEW_FRACTION, lifetime - 2 * self.EXPIRY_MARGIN
+        )
+        self._state = TokenState(
+            access_token=token_info.access_token,
+            expires_at=now + lifetime,
+            renew_at=now + max(0.0, renew_after),
+        )
+
+    def _is_token_valid(self, state: Optional[TokenState]) -> bool:
+        """Check if a token is valid with a safety margin."""
+        return state is not None and time.time() < (
+            state.expires_at - self.EXPIRY_MARGIN
         )
 
     def refresh_token(self) -> None:
-        """Refresh the bearer token."""
+        """Renew the bearer token if it is due for renewal."""
+        state = self._state
+        if self._is_token_valid(state) and time.time() < state.renew_at:
+            return
         try:
-            self.get_bearer_token()
+            self._refresh(state)
         except AuthenticationError as e:
             logger.error(f"Failed to refresh token: {e}")
             raise
 
+    def seconds_until_renewal(self) -> float:
+        """Return how long until the token should be renewed."""
+        state = self._state
+        if state is None:
+            return 0.0
+        return max(0.0, state.renew_at - time.time())
+
     def token_validity_duration(self) -> float:
         """Return the remaining validity duration of the token in seconds."""
         if self.token_expiry is None:
@@ -223,8 +299,8 @@ def token_refresh_scheduler(auth_instance: Authentication) -> None:
     """Periodically refresh the bearer token with error handling."""
     while True:
         try:
-            # Calculate sleep duration (half of the remaining validity time)
-            sleep_duration = max(60, auth_instance.token_validity_duration() / 2)
+            # Sleep until the token is due for renewal, ahead of its expiry
+            sleep_duration = max(1.0, auth_instance.seconds_until_renewal())
             time.sleep(sleep_duration)
 
             auth_instance.refresh_token()
@@ -254,16 +330,13 @@ def initialize_authentication() -> Authentication:
             )
 
         # Initialize Authentication
-        auth = Authentication(app_id, app_secret, auth_url)
-
-        # Create and start token refresh thread
-        refresh_thread = threading.Thread(
-            target=token_refresh_scheduler,
-            args=(auth,),
-            daemon=True,
-            name="TokenRefreshThread",
+        token_cache = (
+            TokenCache(TOKEN_CACHE_FILE, auth_url, app_id)
+            if TOKEN_CACHE_ENABLED
+            else None
         )
-        refresh_thread.start()
+        # The refresh thread starts once the first token has been fetched
+        auth = Authentication(app_id, app_secret, auth_url, token_cache)
         logger.info("Authentication initialized successfully")
 
         return auth
@@ -271,3 +344,31 @@ def initialize_authentication() -> Authentication:
     except Exception as e:
         logger.error(f"Failed to initialize authentication: {e}")
         raise
+
+
+# Singleton instance of Authentication
+_authentication: Optional[Authentication] = None
+_authentication_lock = threading.Lock()
+
+
+def get_authentication() -> Authentication:
+    """Get the shared authentication, creating it on first use.
+
+    Creating it only validates the configuration; the first token is
+    fetched when it is first needed, which also starts the refresh thread.
+    """
+    global _authentication
+    if _authentication is None:
+        with _authentication_lock:
+            if _authentication is None:
+                _authentication = initialize_authentication()
+    return _authentication
+
+
+async def warm_up_authentication() -> None:
+    """Fetch the first token in the background so the first request finds one."""
+    try:
+        await get_authentication().aget_bearer_token()
+        logger.info("Authentication warmed up")
+    except AuthenticationError as e:
+        logger.error(f"Authentication warm-up failed: {e}")
@@ -1,20 +1,24 @@
 import os
 import json
-import requests
+import time
+import asyncio
+import logging
+import httpx
+from dataclasses import dataclass
 from fastapi import APIRouter, HTTPException, Depends
-from typing import Optional
+from typing import Any, Awaitable, Callable, Optional
 from models.settings_model import Settings
-from config.project_config import CACHE_DIR, CACHE_FILE, BASE_URL
-from api.auth import initialize_authentication
-
-# Initialize authentication
-auth = initialize_authentication()
-
-
-def get_bearer_token():
-    """Returns the latest valid bearer token."""
-    return auth.get_bearer_token()
-
+from config.project_config import (
+    CACHE_DIR,
+    CACHE_FILE,
+    BASE_URL,
+    DISCOVERY_CACHE_TTL,
+    DISCOVERY_STALE_TTL,
+)
+from api.auth import get_authentication
+from services.du_client import get_du_client
+
+logger = logging.getLogger(__name__)
 
 base_url = BASE_URL
 
@@ -101,67 +105,274 @@ async def update_config(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@dataclass
+class DiscoveryEntry:
+    data: Any
+    etag: Optional[str]
+    fetched_at: float
+
+
+class DiscoveryCache:
+    """In-memory cache of DU discovery responses with stale-while-revalidate.
+
+    A response younger than ``ttl`` is served from memory. An older one is
+    still served for up to ``stale_ttl`` more seconds while a single
+    background request revalidates it; beyond that callers wait for a fresh
+    copy. Revalidation sends the stored ETag as If-None-Match, so unchanged
+    data costs DU a 304 instead of the full listing. Payloads assembled from
+    several responses are cached under their own key by ``get_computed``.
+    """
+
+    def __init__(
+        self, ttl: float = DISCOVERY_CACHE_TTL, stale_ttl: float = DISCOVERY_STALE_TTL
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries: dict[str, DiscoveryEntry] = {}
+        self._fetches: dict[str, asyncio.Task] = {}
+        # Bumped by invalidate; refreshes started before it are not stored
+        self._generation = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    async def get(self, url: str) -> dict:
+        """Return the DU response for ``url``."""
+        return await self._get(url, lambda: self._fetch_url(url))
+
+    async def get_computed(self, key: str, build: Callable[[], Awaitable[Any]]):
+        """Return the value ``build`` produces, cached under ``key``."""
+        return await self._get(key, lambda: self._build(build))
+
+    async def revalidate(self, url: str) -> dict:
+        """Return the DU response for ``url``, revalidated now whatever its age."""
+        return await asyncio.shield(self._fetch(url, lambda: self._fetch_url(url)))
+
+    async def _get(self, key: str, load: Callable[[], Awaitable[DiscoveryEntry]]):
+        entry = self._entries.get(key)
+        age = time.monotonic() - entry.fetched_at if entry else None
+        if entry is not None and age < self.ttl:
+            self.hits += 1
+            return entry.data
+        if entry is not None and age < self.ttl + self.stale_ttl:
+            self.stale_hits += 1
+            self._fetch(key, load)
+            return entry.data
+        self.misses += 1
+        return await asyncio.shield(self._fetch(key, load))
+
+    def _fetch(
+        self, key: str, load: Callable[[], Awaitable[DiscoveryEntry]]
+    ) -> asyncio.Task:
+        """Start a refresh of ``key`` unless one is already running."""
+        task = self._fetches.get(key)
+        if task is None:
+            task = asyncio.create_task(self._refresh(key, load))
+            self._fetches[key] = task
+            task.add_done_callback(lambda t: self._on_refreshed(key, t))
+        return task
+
+    def _on_refreshed(self, key: str, task: asyncio.Task) -> None:
+        if self._fetches.get(key) is task:
+            del self._fetches[key]
+        if not task.cancelled() and task.exception() is not None:
+            # Callers waiting on the task get the error; stale data stays served
+            logger.warning(f"Refreshing {key} failed: {task.exception()!r}")
+
+    async def _refresh(
+        self, key: str, load: Callable[[], Awaitable[DiscoveryEntry]]
+    ) -> Any:
+        generation = self._generation
+        entry = await load()
+        if generation == self._generation:
+            self._entries[key] = entry
+        return entry.data
+
+    async def _fetch_url(self, url: str) -> DiscoveryEntry:
+        entry = self._entries.get(url)
+        headers = {
+            **await get_authentication().authorization_header(),
+            "accept": "application/json",
+        }
+        if entry is not None and entry.etag:
+            headers["If-None-Match"] = entry.etag
+
+        response = await get_du_client().get(
+            url, headers=headers, timeout=300, family="discovery"
+        )
+        if response.status_code == 304 and entry is not None:
+            self.not_modified += 1
+            entry.fetched_at = time.monotonic()
+            return entry
+        response.raise_for_status()
+        return DiscoveryEntry(
+            response.json(), response.headers.get("ETag"), time.monotonic()
+        )
+
+    @staticmethod
+    async def _build(build: Callable[[], Awaitable[Any]]) -> DiscoveryEntry:
+        data = await build()
+        return DiscoveryEntry(data, None, time.monotonic())
+
+    def invalidate(self) -> int:
+        """Drop every cached response; returns how many were dropped.
+
+        Refreshes already running still answer the callers waiting on them,
+        but their results are not stored, and later callers start new ones.
+        """
+        count = len(self._entries)
+        self._entries.clear()
+        self._fetches.clear()
+        self._generation += 1
+        return count
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+        }
+
+
+# Singleton instance of DiscoveryCache
+_discovery_cache: Optional[DiscoveryCache] = None
+
+
+def get_discovery_cache() -> DiscoveryCache:
+    """Get the shared discovery cache, creating it if necessary."""
+    global _discovery_cache
+    if _discovery_cache is None:
+        _discovery_cache = DiscoveryCache()
+    return _discovery_cache
+
+
+def _projects_url() -> str:
+    return f"{base_url}/du_/api/framework/projects/?api-version=1.1"
+
+
+def _classifiers_url(project_id: str) -> str:
+    return f"{base_url}/du_/api/framework/projects/{project_id}/classifiers?api-version=1.1"
+
+
+def _classifier_url(project_id: str, classifier_id: str) -> str:
+    return f"{base_url}/du_/api/framework/projects/{project_id}/classifiers/{classifier_id}?api-version=1.1"
+
+
+def _extractors_url(project_id: str) -> str:
+    return (
+        f"{base_url}/du_/api/framework/projects/{project_id}/extractors?api-version=1.1"
+    )
+
+
+async def _build_catalog() -> list[dict]:
+    """Fetch every project with its classifiers, their document types and extractors.
+
+    Each level is fetched concurrently once the level above it is known.
+    Every response is revalidated, so the catalog never combines stale data.
+    """
+    cache = get_discovery_cache()
+    projects = (await cache.revalidate(_projects_url())).get("projects") or []
+
+    listings = await asyncio.gather(
+        *(
+            asyncio.gather(
+                cache.revalidate(_classifiers_url(project["id"])),
+                cache.revalidate(_extractors_url(project["id"])),
+            )
+            for project in projects
+        )
+    )
+    classifiers_by_project = [
+        classifiers.get("classifiers") or [] for classifiers, _ in listings
+    ]
+    details = await asyncio.gather(
+        *(
+            cache.revalidate(_classifier_url(project["id"], classifier["id"]))
+            for project, classifiers in zip(projects, classifiers_by_project)
+            for classifier in classifiers
+        )
+    )
+
+    details_iter = iter(details)
+    catalog = []
+    for project, classifiers, (_, extractors) in zip(
+        projects, classifiers_by_project, listings
+    ):
+        catalog.append(
+            {
+                **project,
+                "classifiers": [
+                    {
+                        **classifier,
+                        "documentTypes": [
+                            doc_types["name"]
+                            for doc_types in next(details_iter).get("documentTypes")
+                            or []
+                        ],
+                    }
+                    for classifier in classifiers
+                ],
+                "extractors": extractors.get("extractors") or [],
+            }
+        )
+    return catalog
+
+
+@router.get("/catalog")
+async def get_catalog():
+    """Retrieve all projects with their classifiers and extractors in one payload."""
+    try:
+        return await get_discovery_cache().get_computed("catalog", _build_catalog)
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching catalog: {str(e)}")
+
+
 @router.get("/projects")
-def get_projects():
+async def get_projects():
     """Retrieve projects from API."""
-    api_url = f"{base_url}/du_/api/framework/projects/?api-version=1.1"
-    headers = {
-        "Authorization": f"Bearer {get_bearer_token()}",
-        "accept": "application/json",
-    }
+    api_url = _projects_url()
 
     try:
-        response = requests.get(api_url, headers=headers, timeout=300)
-        response.raise_for_status()
-        data = response.json()
+        data = await get_discovery_cache().get(api_url)
 
         if not data.get("projects"):
             raise HTTPException(status_code=404, detail="No projects found.")
 
         return data["projects"]
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         raise HTTPException(
             status_code=500, detail=f"Error fetching projects: {str(e)}"
         )
 
 
 @router.get("/project/{project_id}/classifiers")
-def get_classifiers(project_id: str):
+async def get_classifiers(project_id: str):
     """Retrieve classifiers from API."""
-    api_url = f"{base_url}/du_/api/framework/projects/{project_id}/classifiers?api-version=1.1"
-    headers = {
-        "Authorization": f"Bearer {get_bearer_token()}",
-        "accept": "application/json",
-    }
+    api_url = _classifiers_url(project_id)
 
     try:
-        response = requests.get(api_url, headers=headers, timeout=300)
-        response.raise_for_status()
-        data = response.json()
+        data = await get_discovery_cache().get(api_url)
 
         if not data.get("classifiers"):
             raise HTTPException(status_code=404, detail="No classifiers found.")
 
         return data["classifiers"]
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         raise HTTPException(
             status_code=500, detail=f"Error fetching classifiers: {str(e)}"
         )
 
 
 @router.get("/project/{project_id}/classifiers/{classifier_id}")
-def get_classifier_id(project_id: str, classifier_id: str):
+async def get_classifier_id(project_id: str, classifier_id: str):
     """Retrieve classifiers from API."""
-    api_url = f"{base_url}/du_/api/framework/projects/{project_id}/classifiers/{classifier_id}?api-version=1.1"
-    headers = {
-        "Authorization": f"Bearer {get_bearer_token()}",
-        "accept": "application/json",
-    }
+    api_url = _classifier_url(project_id, classifier_id)
 
     try:
-        response = requests.get(api_url, headers=headers, timeout=300)
-        response.raise_for_status()
-        data = response.json()
+        data = await get_discovery_cache().get(api_url)
 
         if not data.get("documentTypes"):
             raise HTTPException(status_code=404, detail="No classifier data found.")
@@ -170,33 +381,37 @@ def get_classifier_id(project_id: str, classifier_id: str):
         # properties = data['properties']
 
         return names
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         raise HTTPException(
             status_code=500, detail=f"Error fetching classifier: {str(e)}"
         )
 
 
 @router.get("/project/{project_id}/extractors")
-def get_extractors(project_id: str):
+async def get_extractors(project_id: str):
     """Retrieve extractors from API."""
-    api_url = (
-        f"{base_url}/du_/api/framework/projects/{project_id}/extractors?api-version=1.1"
-    )
-    headers = {
-        "Authorization": f"Bearer {get_bearer_token()}",
-        "accept": "application/json",
-    }
+    api_url = _extractors_url(project_id)
 
     try:
-        response = requests.get(api_url, headers=headers, timeout=300)
-        response.raise_for_status()
-        data = response.json()
+        data = await get_discovery_cache().get(api_url)
 
         if not data.get("extractors"):
             raise HTTPException(status_code=404, detail="No extractors found.")
 
         return data["extractors"]
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         raise HTTPException(
             status_code=500, detail=f"Error fetching extractors: {str(e)}"
         )
+
+
+@router.get("/cache")
+async def get_discovery_cache_stats():
+    """Hit counters of the discovery cache."""
+    return get_discovery_cache().stats()
+
+
+@router.delete("/cache")
+async def invalidate_discovery_cache():
+    """Drop cached discovery responses, e.g. after a project or module changed."""
+    return {"invalidated": get_discovery_cache().invalidate()}
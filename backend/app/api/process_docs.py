@@ -1,33 +1,47 @@
 import os
 import json
 import asyncio
-import shutil
-from typing import List
+from typing import List, Optional
 from fastapi import (
     APIRouter,
+    HTTPException,
+    Request,
     UploadFile,
     File,
     WebSocket,
     WebSocketDisconnect,
 )
-from api.auth import initialize_authentication
+from api.auth import get_authentication
 from database.db_utils import (
-    update_cache,
-    get_filenames_processing,
+    register_uploads,
+    claim_uploaded_documents,
+    count_uploaded_documents,
     fetch_document_statuses,
 )
 from services.document_processor import get_document_processor
-from config.project_config import CACHE_DIR
+from services.operation_poller import get_operation_poller
+from services.rate_limiter import get_rate_limiter
+from services.resilience import get_resilience
+from services.result_cache import get_result_cache
+from services.single_flight import get_single_flight
+from services.speculation import get_speculation_tracker
+from services.prompt_registry import get_prompt_registry
+from services.upload_sessions import (
+    UploadSessionError,
+    UploadSessionNotFound,
+    UploadTooLarge,
+    get_upload_sessions,
+)
+from config.project_config import CACHE_DIR, PROCESS_BATCH_SIZE
 from api.discovery_routes import SettingsManager
+from utils.uploads import save_upload
 from models.settings_model import Settings
-
-# Initialize authentication
-auth = initialize_authentication()
+from models.upload_model import UploadSessionCreate
 
 
 def get_bearer_token():
     """Returns the latest valid bearer token."""
-    return auth.get_bearer_token()
+    return get_authentication().get_bearer_token()
 
 
 router = APIRouter()
@@ -35,19 +49,77 @@ router = APIRouter()
 
 @router.post("/upload")
 async def upload_files(files: List[UploadFile] = File(...)):
-    uploaded_files = []
+    """Stream uploaded files to disk and register them in one batch."""
+    uploads = []
     upload_dir = "cache/documents/"
     os.makedirs(upload_dir, exist_ok=True)
 
     for file in files:
-        if file.filename.lower().endswith((".png", ".jpg", ".jpeg", ".pdf", ".tif")):
-            file_path = os.path.join(upload_dir, file.filename)
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
+        filename = os.path.basename(file.filename or "")
+        if filename.lower().endswith((".png", ".jpg", ".jpeg", ".pdf", ".tif")):
+            content_hash, size = await save_upload(file, upload_dir, filename)
+            uploads.append((filename, content_hash, size))
+
+    await asyncio.to_thread(register_uploads, uploads)
+    return {"uploaded_files": [filename for filename, _, _ in uploads]}
+
 
-            update_cache(filename=file.filename, document_id=None, stage="uploaded")
-            uploaded_files.append(file.filename)
-    return {"uploaded_files": uploaded_files}
+def _upload_session_error(error: UploadSessionError) -> HTTPException:
+    if isinstance(error, UploadSessionNotFound):
+        status_code = 404
+    elif isinstance(error, UploadTooLarge):
+        status_code = 413
+    else:
+        status_code = 409
+    return HTTPException(status_code=status_code, detail=str(error))
+
+
+@router.post("/uploads")
+async def create_upload_session(request: UploadSessionCreate):
+    """Start a resumable upload; returns the session ID to send chunks to."""
+    try:
+        return await get_upload_sessions().create(request.filename, request.size)
+    except UploadSessionError as e:
+        raise _upload_session_error(e)
+
+
+@router.get("/uploads/{session_id}")
+async def get_upload_session_status(session_id: str):
+    """Return the byte ranges received so far, to resume an interrupted upload."""
+    try:
+        return await get_upload_sessions().status(session_id)
+    except UploadSessionError as e:
+        raise _upload_session_error(e)
+
+
+@router.put("/uploads/{session_id}")
+async def upload_chunk(session_id: str, offset: int, request: Request):
+    """Write the request body at ``offset`` of the upload."""
+    try:
+        return await get_upload_sessions().write_chunk(
+            session_id, offset, request.stream()
+        )
+    except UploadSessionError as e:
+        raise _upload_session_error(e)
+
+
+@router.post("/uploads/{session_id}/finalize")
+async def finalize_upload(session_id: str):
+    """Move a complete upload into the documents folder and register it."""
+    try:
+        return await get_upload_sessions().finalize(session_id)
+    except UploadSessionError as e:
+        raise _upload_session_error(e)
+
+
+@router.delete("/uploads/{session_id}")
+async def abort_upload(session_id: str):
+    """Discard an upload session and the bytes received for it."""
+    try:
+        await get_upload_sessions().abort(session_id)
+    except UploadSessionError as e:
+        raise _upload_session_error(e)
+    return {"message": "Upload session removed"}
 
 
 # Get all files
@@ -63,31 +135,64 @@ async def get_files():
 
 
 @router.post("/process/")
-def process_documents():
-    """API endpoint to process uploaded documents concurrently."""
+async def process_documents(batch_size: int = PROCESS_BATCH_SIZE):
+    """API endpoint to process uploaded documents concurrently.
+
+    Claims at most ``batch_size`` uploaded documents per call; call again to
+    pull the next batch while ``remaining`` is non-zero.
+    """
     processor = get_document_processor()
     config: Settings = SettingsManager.get_settings()
-    filenames = get_filenames_processing()
+    batch_size = max(1, min(batch_size, PROCESS_BATCH_SIZE))
+    claim_token, filenames = await asyncio.to_thread(
+        claim_uploaded_documents, batch_size
+    )
 
     if not filenames:
         return {"error": "No documents found for processing."}
 
     processed_files = []
 
-    for (filename,) in filenames:
+    for filename, content_hash in filenames:
         document_id = filename.rsplit(".", 1)[0]
         document_path = os.path.join(f"{CACHE_DIR}/documents/", filename)
 
-        # Submit each task to the ThreadPoolExecutor
-        processor.executor.submit(
-            processor.process_document,
-            document_id,
-            document_path,
-            config,
-        )
+        # Schedule each document on the event loop
+        await processor.submit(document_id, document_path, config, content_hash)
         processed_files.append(filename)
 
-    return {"message": "Processing started", "processed_files": processed_files}
+    return {
+        "message": "Processing started",
+        "processed_files": processed_files,
+        "claim_token": claim_token,
+        "remaining": await asyncio.to_thread(count_uploaded_documents),
+    }
+
+
+@router.get("/pipeline/stats")
+async def get_pipeline_stats():
+    """Pipeline stage throughput plus poller, rate-limit and breaker state."""
+    processor = get_document_processor()
+    return {
+        "stages": processor.pipeline.stats(),
+        "awaiting_validation": len(processor.pending_validations),
+        "poller": get_operation_poller().stats(),
+        "rate_limits": get_rate_limiter().stats(),
+        "resilience": get_resilience().stats(),
+        "result_cache": get_result_cache().stats(),
+        "single_flight": get_single_flight().stats(),
+        "speculation": get_speculation_tracker().stats(),
+        "prompts": get_prompt_registry().stats(),
+    }
+
+
+@router.delete("/result-cache")
+async def invalidate_result_cache(
+    action: Optional[str] = None, module_id: Optional[str] = None
+):
+    """Drop cached classification/extraction results, optionally for one module."""
+    removed = await asyncio.to_thread(get_result_cache().invalidate, action, module_id)
+    return {"message": f"Removed {removed} cached results", "removed": removed}
 
 
 # Store active WebSocket connections
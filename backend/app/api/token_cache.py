@@ -0,0 +1,87 @@
+import os
+import json
+import hashlib
+import logging
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: the cache still works, without locking
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class TokenCache:
+    """On-disk bearer token shared by every process of the app.
+
+    The file holds one token together with its expiry and renewal times and
+    is only readable by its owner. A process that needs a token takes an
+    exclusive lock on ``<path>.lock``, reuses the cached token if it is
+    still valid and otherwise fetches and stores a new one, so concurrent
+    workers send a single token request between them. Tokens are tied to
+    the auth URL and client ID; the client secret is never written.
+    """
+
+    def __init__(self, path: str, auth_url: str, app_id: str):
+        self.path = path
+        self.key = hashlib.sha256(f"{auth_url}|{app_id}".encode("utf-8")).hexdigest()
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """Hold the cross-process lock around a load, fetch and store."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def load(self) -> Optional[dict]:
+        """Return the cached token fields, or None if there is no usable entry."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable token cache {self.path}: {e}")
+            return None
+        if data.get("key") != self.key:
+            return None
+        try:
+            return {
+                "access_token": data["access_token"],
+                "expires_at": float(data["expires_at"]),
+                "renew_at": float(data["renew_at"]),
+            }
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def store(self, access_token: str, expires_at: float, renew_at: float) -> None:
+        """Atomically replace the cached token with an owner-only file."""
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(
+                    {
+                        "key": self.key,
+                        "access_token": access_token,
+                        "expires_at": expires_at,
+                        "renew_at": renew_at,
+                    },
+                    file,
+                )
+            # O_CREAT's mode only applies to new files
+            os.chmod(temp_path, 0o600)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not write token cache {self.path}: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
@@ -11,6 +11,120 @@ SQLITE_DB_PATH = os.path.join(CACHE_DIR, "document_cache.db")
 load_dotenv()
 BASE_URL = os.getenv("BASE_URL")
 
+# Optional on-disk bearer token shared by all worker processes
+TOKEN_CACHE_ENABLED = os.getenv("TOKEN_CACHE_ENABLED", "false").lower() == "true"
+TOKEN_CACHE_FILE = os.getenv("TOKEN_CACHE_FILE", os.path.join(CACHE_DIR, "token.json"))
+
+# SQLite connection tuning (applied to every connection)
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", str(64 * 1024)))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+# Shared Document Understanding HTTP client (connection pool and timeouts)
+DU_MAX_CONNECTIONS = int(os.getenv("DU_MAX_CONNECTIONS", "100"))
+DU_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("DU_MAX_KEEPALIVE_CONNECTIONS", "20"))
+DU_MAX_CONNECTIONS_PER_HOST = int(os.getenv("DU_MAX_CONNECTIONS_PER_HOST", "50"))
+DU_KEEPALIVE_EXPIRY = float(os.getenv("DU_KEEPALIVE_EXPIRY", "30"))
+DU_CONNECT_TIMEOUT = float(os.getenv("DU_CONNECT_TIMEOUT", "10"))
+DU_READ_TIMEOUT = float(os.getenv("DU_READ_TIMEOUT", "60"))
+DU_WRITE_TIMEOUT = float(os.getenv("DU_WRITE_TIMEOUT", "60"))
+DU_POOL_TIMEOUT = float(os.getenv("DU_POOL_TIMEOUT", "30"))
+
+# Central operation poller
+POLLER_TICK_SECONDS = float(os.getenv("POLLER_TICK_SECONDS", "0.25"))
+POLLER_WHEEL_SLOTS = int(os.getenv("POLLER_WHEEL_SLOTS", "512"))
+POLLER_MAX_CONCURRENT_POLLS = int(os.getenv("POLLER_MAX_CONCURRENT_POLLS", "50"))
+
+# Adaptive poll intervals derived from observed stage durations
+POLL_MIN_INTERVAL = float(os.getenv("POLL_MIN_INTERVAL", "0.5"))
+POLL_MAX_INTERVAL = float(os.getenv("POLL_MAX_INTERVAL", "30"))
+VALIDATION_POLL_MAX_INTERVAL = float(os.getenv("VALIDATION_POLL_MAX_INTERVAL", "60"))
+POLL_HISTORY_WINDOW = int(os.getenv("POLL_HISTORY_WINDOW", "200"))
+
+# Per-stage worker pools of the document pipeline
+DIGITIZATION_CONCURRENCY = int(os.getenv("DIGITIZATION_CONCURRENCY", "20"))
+CLASSIFICATION_CONCURRENCY = int(os.getenv("CLASSIFICATION_CONCURRENCY", "20"))
+EXTRACTION_CONCURRENCY = int(os.getenv("EXTRACTION_CONCURRENCY", "20"))
+VALIDATION_CONCURRENCY = int(os.getenv("VALIDATION_CONCURRENCY", "20"))
+
+# DU request rates per endpoint family (requests per second, 0 disables)
+DU_RATE_LIMITS = {
+    "digitization": float(os.getenv("DU_DIGITIZATION_RATE", "5")),
+    "classification": float(os.getenv("DU_CLASSIFICATION_RATE", "5")),
+    "extraction": float(os.getenv("DU_EXTRACTION_RATE", "5")),
+    "validation": float(os.getenv("DU_VALIDATION_RATE", "5")),
+    "result": float(os.getenv("DU_RESULT_RATE", "20")),
+    "discovery": float(os.getenv("DU_DISCOVERY_RATE", "10")),
+}
+DU_RATE_BURST = float(os.getenv("DU_RATE_BURST", "10"))
+DU_MAX_THROTTLE_RETRIES = int(os.getenv("DU_MAX_THROTTLE_RETRIES", "5"))
+
+# Operations allowed in flight per classifier/extractor (0 disables), with
+# per-module overrides such as "generative_extractor=2,invoices=8"
+DU_MODULE_MAX_IN_FLIGHT = int(os.getenv("DU_MODULE_MAX_IN_FLIGHT", "10"))
+DU_MODULE_IN_FLIGHT_OVERRIDES = {
+    module_id.strip(): int(limit)
+    for module_id, limit in (
+        item.split("=", 1)
+        for item in os.getenv("DU_MODULE_IN_FLIGHT_OVERRIDES", "").split(",")
+        if "=" in item
+    )
+}
+
+# Total size of digitization uploads streamed to DU at once (0 disables)
+DU_UPLOAD_MAX_IN_FLIGHT_BYTES = int(
+    os.getenv("DU_UPLOAD_MAX_IN_FLIGHT_BYTES", str(256 * 1024 * 1024))
+)
+
+# Retries of transient DU failures: jittered backoff, bounded by a global
+# budget of retries per request sent in a sliding window
+DU_MAX_RETRIES = int(os.getenv("DU_MAX_RETRIES", "3"))
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "0.5"))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "30"))
+RETRY_BUDGET_RATIO = float(os.getenv("RETRY_BUDGET_RATIO", "0.2"))
+RETRY_BUDGET_MIN = int(os.getenv("RETRY_BUDGET_MIN", "10"))
+RETRY_BUDGET_WINDOW = float(os.getenv("RETRY_BUDGET_WINDOW", "60"))
+
+# Per-extractor circuit breaker
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", "30"))
+
+# Cache of classification/extraction results per (content, module, prompts);
+# entries expire after RESULT_CACHE_TTL_DAYS (0 keeps them) and the least
+# recently used are evicted beyond RESULT_CACHE_MAX_ENTRIES (0 is unbounded)
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true"
+RESULT_CACHE_TTL_DAYS = float(
+    os.getenv("RESULT_CACHE_TTL_DAYS", str(CACHE_EXPIRY_DAYS))
+)
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "10000"))
+
+# Speculative extraction: speculate per extractor while its predictions are
+# right at least SPECULATION_MIN_HIT_RATE of the last SPECULATION_WINDOW times
+SPECULATION_MIN_HIT_RATE = float(os.getenv("SPECULATION_MIN_HIT_RATE", "0.6"))
+SPECULATION_WARMUP = int(os.getenv("SPECULATION_WARMUP", "10"))
+SPECULATION_WINDOW = int(os.getenv("SPECULATION_WINDOW", "100"))
+
+# Resumable upload sessions: partial files, file and chunk size caps and
+# session lifetime
+UPLOAD_SESSION_DIR = os.path.join(CACHE_DIR, "uploads")
+UPLOAD_MAX_FILE_BYTES = int(os.getenv("UPLOAD_MAX_FILE_BYTES", str(1024 * 1024 * 1024)))
+UPLOAD_MAX_CHUNK_BYTES = int(os.getenv("UPLOAD_MAX_CHUNK_BYTES", str(64 * 1024 * 1024)))
+UPLOAD_SESSION_TTL_HOURS = float(os.getenv("UPLOAD_SESSION_TTL_HOURS", "24"))
+
+# Discovery responses (projects, classifiers, extractors) are served from
+# memory for DISCOVERY_CACHE_TTL seconds, then served stale while they are
+# revalidated in the background for up to DISCOVERY_STALE_TTL more seconds
+DISCOVERY_CACHE_TTL = float(os.getenv("DISCOVERY_CACHE_TTL", "300"))
+DISCOVERY_STALE_TTL = float(os.getenv("DISCOVERY_STALE_TTL", "3600"))
+
+# Pipeline jobs are leased to the process running them for JOB_LEASE_SECONDS
+# and renewed well before expiry; jobs and claimed documents of a process
+# that stopped renewing are resumed by another once the lease expires
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+
+# Maximum number of uploaded documents claimed per /process call
+PROCESS_BATCH_SIZE = int(os.getenv("PROCESS_BATCH_SIZE", "100"))
+
 
 class ProcessingConfig:
     """
@@ -0,0 +1,49 @@
+import sqlite3
+import threading
+from config.project_config import (
+    SQLITE_DB_PATH,
+    SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_CACHE_SIZE_KB,
+    SQLITE_MMAP_SIZE,
+)
+
+# Thread-local storage for the current thread's connection
+_local = threading.local()
+
+
+def configure_connection(conn) -> None:
+    """Apply the shared SQLite settings to a new connection.
+
+    WAL lets the dashboard read while the pipeline writes, and with it
+    synchronous=NORMAL only syncs at checkpoints. busy_timeout makes a
+    writer wait for the lock instead of failing with "database is locked".
+    """
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA cache_size={-int(SQLITE_CACHE_SIZE_KB)}")
+    cursor.execute(f"PRAGMA mmap_size={int(SQLITE_MMAP_SIZE)}")
+    cursor.close()
+
+
+def get_connection() -> sqlite3.Connection:
+    """Return this thread's connection to the cache database, opening it once.
+
+    Connections are kept for the life of their thread, so callers must not
+    close them; use ``with conn:`` to commit or roll back a transaction.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(SQLITE_DB_PATH, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000)
+        configure_connection(conn)
+        _local.conn = conn
+    return conn
+
+
+def close_connection() -> None:
+    """Close this thread's connection, if it has one."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
@@ -1,6 +1,7 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 from config.project_config import SQLITE_DB_PATH
+from database.connection import configure_connection
 
 # Ensure SQLITE_DB_PATH includes sqlite:/// if using a file
 if not SQLITE_DB_PATH.startswith("sqlite:///"):
@@ -8,6 +9,13 @@ if not SQLITE_DB_PATH.startswith("sqlite:///"):
 
 engine = create_engine(SQLITE_DB_PATH, connect_args={"check_same_thread": False})
 
+
+@event.listens_for(engine, "connect")
+def _configure_sqlite(dbapi_connection, connection_record):
+    # Pooled connections get the same WAL and pragma settings as db_utils
+    configure_connection(dbapi_connection)
+
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
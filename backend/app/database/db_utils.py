@@ -1,14 +1,16 @@
+import uuid
 import sqlite3
 import time
-from datetime import datetime, timedelta
+from datetime import timedelta
 from typing import Any, Optional
-from config.project_config import SQLITE_DB_PATH, CACHE_EXPIRY_DAYS
+from config.project_config import CACHE_EXPIRY_DAYS
+from database.connection import get_connection
 
 
 def execute_query(query: str, params: tuple = ()) -> list[Any]:
     """Execute an SQL query and return results."""
     try:
-        with sqlite3.connect(SQLITE_DB_PATH) as conn:
+        with get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(query, params)
             return cursor.fetchall()
@@ -24,11 +26,70 @@ async def fetch_document_statuses():
     return results
 
 
-def get_filenames_processing():
-    """Fetches all filenames for records with stage 'uploaded'."""
-    query = "SELECT filename FROM documents WHERE stage = 'uploaded'"
-    results = execute_query(query)
-    return results
+def claim_uploaded_documents(batch_size: int) -> tuple[str, list[tuple]]:
+    """Atomically move up to batch_size 'uploaded' documents to 'queued'.
+
+    The rows are flipped and tagged with a fresh claim token in a single
+    UPDATE, so concurrent callers (or uvicorn workers) can never claim the
+    same document twice. Returns the token and the claimed
+    (filename, content_hash) rows.
+    """
+    claim_token = uuid.uuid4().hex
+    query = """
+        UPDATE documents
+        SET stage = 'queued', claim_token = ?, claimed_at = ?
+        WHERE rowid IN (
+            SELECT rowid FROM documents
+            WHERE stage = 'uploaded'
+            ORDER BY timestamp
+            LIMIT ?
+        )
+    """
+    execute_query(query, (claim_token, time.time(), batch_size))
+    claimed = execute_query(
+        "SELECT filename, content_hash FROM documents WHERE claim_token = ?",
+        (claim_token,),
+    )
+    return claim_token, claimed
+
+
+def register_uploads(uploads: list[tuple[str, str, int]]) -> None:
+    """Mark (filename, content_hash, size) uploads as 'uploaded' in one transaction.
+
+    Re-uploading a filename resets its existing row, like ``update_cache``.
+    """
+    if not uploads:
+        return
+    timestamp = time.time()
+    try:
+        with get_connection() as conn:
+            conn.executemany(
+                """
+                UPDATE documents
+                SET document_id = NULL, stage = 'uploaded', timestamp = ?,
+                    content_hash = ?, file_size = ?, error_code = NULL,
+                    project_id = NULL, error_message = NULL, claim_token = NULL,
+                    claimed_at = NULL
+                WHERE filename = ?
+                """,
+                [(timestamp, h, size, name) for name, h, size in uploads],
+            )
+            conn.executemany(
+                """
+                INSERT INTO documents (filename, stage, timestamp, content_hash, file_size)
+                SELECT ?, 'uploaded', ?, ?, ?
+                WHERE NOT EXISTS (SELECT 1 FROM documents WHERE filename = ?)
+                """,
+                [(name, timestamp, h, size, name) for name, h, size in uploads],
+            )
+    except sqlite3.Error as e:
+        print(f"Database error: {e}")
+
+
+def count_uploaded_documents() -> int:
+    """Count documents still waiting to be claimed for processing."""
+    result = execute_query("SELECT COUNT(*) FROM documents WHERE stage = 'uploaded'")
+    return result[0][0] if result else 0
 
 
 def update_document_stage(
@@ -70,6 +131,25 @@ def update_document_stage(
     execute_query(query, tuple(params))
 
 
+def get_stage_durations(action: str, limit: int = 500) -> list[tuple]:
+    """Fetch recent (module_id, duration) pairs recorded for a stage."""
+    if action.startswith("classification"):
+        module_column = "classifier_id"
+    elif action.startswith("extraction"):
+        module_column = "extractor_id"
+    else:
+        module_column = "'digitization'"
+
+    query = f"""
+        SELECT {module_column}, {action}_duration
+        FROM documents
+        WHERE {action}_duration IS NOT NULL
+        ORDER BY timestamp DESC
+        LIMIT ?
+    """
+    return execute_query(query, (limit,))
+
+
 def insert_classification_results(
     document_id: str,
     filename: str,
@@ -99,17 +179,119 @@ def insert_classification_results(
     execute_query(query, params)
 
 
-def get_document_id_from_cache(filename: str) -> Optional[str]:
-    """Retrieve the document_id based on the filename."""
-    query = "SELECT document_id, timestamp FROM documents WHERE filename = ?"
-    result = execute_query(query, (filename,))
-    if result:
-        document_id, timestamp = result[0]
-        cache_time = datetime.fromtimestamp(timestamp)
-        if datetime.now() - cache_time > timedelta(days=CACHE_EXPIRY_DAYS):
-            return None
-        return document_id
-    return None
+def get_cached_digitization(content_hash: str, project_id: str) -> Optional[str]:
+    """Return the DU documentId of a digitized file with the same content.
+
+    Entries older than ``CACHE_EXPIRY_DAYS`` are removed and not returned.
+    """
+    query = """
+        SELECT document_id, timestamp FROM digitization_cache
+        WHERE content_hash = ? AND project_id = ?
+    """
+    result = execute_query(query, (content_hash, project_id))
+    if not result:
+        return None
+    document_id, timestamp = result[0]
+    if time.time() - timestamp > timedelta(days=CACHE_EXPIRY_DAYS).total_seconds():
+        execute_query(
+            "DELETE FROM digitization_cache WHERE content_hash = ? AND project_id = ?",
+            (content_hash, project_id),
+        )
+        return None
+    return document_id
+
+
+def save_cached_digitization(
+    content_hash: str, project_id: str, document_id: str, filename: str
+) -> None:
+    """Remember the DU documentId produced for a file's content."""
+    query = """
+        INSERT OR REPLACE INTO digitization_cache
+            (content_hash, project_id, document_id, filename, timestamp)
+        VALUES (?, ?, ?, ?, ?)
+    """
+    execute_query(query, (content_hash, project_id, document_id, filename, time.time()))
+
+
+def get_result_cache_entry(
+    action: str, content_hash: str, module_id: str, prompt_hash: str
+) -> Optional[tuple]:
+    """Return (operation_id, payload, created_at) for a cached result and mark it used."""
+    key = (action, content_hash, module_id, prompt_hash)
+    result = execute_query(
+        """
+        SELECT operation_id, payload, created_at FROM result_cache
+        WHERE action = ? AND content_hash = ? AND module_id = ? AND prompt_hash = ?
+        """,
+        key,
+    )
+    if not result:
+        return None
+    execute_query(
+        """
+        UPDATE result_cache SET last_used = ?
+        WHERE action = ? AND content_hash = ? AND module_id = ? AND prompt_hash = ?
+        """,
+        (time.time(), *key),
+    )
+    return result[0]
+
+
+def save_result_cache_entry(
+    action: str,
+    content_hash: str,
+    module_id: str,
+    prompt_hash: str,
+    operation_id: Optional[str],
+    payload: str,
+) -> None:
+    """Insert or replace a cached result."""
+    now = time.time()
+    execute_query(
+        """
+        INSERT OR REPLACE INTO result_cache
+            (action, content_hash, module_id, prompt_hash, operation_id, payload,
+             created_at, last_used)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (action, content_hash, module_id, prompt_hash, operation_id, payload, now, now),
+    )
+
+
+def evict_result_cache(max_entries: int, max_age_seconds: Optional[float]) -> None:
+    """Drop expired entries, then the least recently used beyond ``max_entries``."""
+    if max_age_seconds:
+        execute_query(
+            "DELETE FROM result_cache WHERE created_at < ?",
+            (time.time() - max_age_seconds,),
+        )
+    if max_entries > 0:
+        execute_query(
+            """
+            DELETE FROM result_cache WHERE rowid IN (
+                SELECT rowid FROM result_cache ORDER BY last_used DESC
+                LIMIT -1 OFFSET ?
+            )
+            """,
+            (max_entries,),
+        )
+
+
+def delete_result_cache_entries(
+    action: Optional[str] = None, module_id: Optional[str] = None
+) -> int:
+    """Delete cached results, optionally only for one action and/or module."""
+    conditions, params = [], []
+    if action:
+        conditions.append("action = ?")
+        params.append(action)
+    if module_id:
+        conditions.append("module_id = ?")
+        params.append(module_id)
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    count = execute_query(f"SELECT COUNT(*) FROM result_cache{where}", tuple(params))
+    execute_query(f"DELETE FROM result_cache{where}", tuple(params))
+    return count[0][0]
 
 
 def update_cache(
@@ -157,3 +339,196 @@ def update_cache(
 
     execute_query(query_update, params_update)
     execute_query(query_insert, params_insert)
+
+
+def create_upload_session(session_id: str, filename: str, size: int) -> None:
+    """Record a new resumable upload with nothing received yet."""
+    now = time.time()
+    execute_query(
+        """
+        INSERT INTO upload_sessions (session_id, filename, size, received, created_at, updated_at)
+        VALUES (?, ?, ?, '[]', ?, ?)
+        """,
+        (session_id, filename, size, now, now),
+    )
+
+
+def get_upload_session(session_id: str) -> Optional[tuple]:
+    """Return (filename, size, received JSON, updated_at) for an upload session."""
+    result = execute_query(
+        "SELECT filename, size, received, updated_at FROM upload_sessions WHERE session_id = ?",
+        (session_id,),
+    )
+    return result[0] if result else None
+
+
+def update_upload_session(session_id: str, received: str) -> None:
+    """Store the byte ranges received so far for an upload session."""
+    execute_query(
+        "UPDATE upload_sessions SET received = ?, updated_at = ? WHERE session_id = ?",
+        (received, time.time(), session_id),
+    )
+
+
+def delete_upload_session(session_id: str) -> None:
+    execute_query("DELETE FROM upload_sessions WHERE session_id = ?", (session_id,))
+
+
+def get_expired_upload_sessions(max_age_seconds: float) -> list[str]:
+    """Return IDs of upload sessions not touched within ``max_age_seconds``."""
+    result = execute_query(
+        "SELECT session_id FROM upload_sessions WHERE updated_at < ?",
+        (time.time() - max_age_seconds,),
+    )
+    return [session_id for (session_id,) in result]
+
+
+def save_job(
+    document_id: str,
+    filename: str,
+    document_path: str,
+    stage: str,
+    state: str,
+    lease_owner: str,
+    lease_seconds: float,
+) -> None:
+    """Insert or replace a queued pipeline job leased to ``lease_owner``."""
+    now = time.time()
+    query = """
+        INSERT OR REPLACE INTO jobs (document_id, filename, document_path, stage, status,
+                                     operation_id, state, error_message, updated_at,
+                                     lease_owner, lease_expires_at)
+        VALUES (?, ?, ?, ?, 'queued', NULL, ?, NULL, ?, ?, ?)
+    """
+    execute_query(
+        query,
+        (
+            document_id,
+            filename,
+            document_path,
+            stage,
+            state,
+            now,
+            lease_owner,
+            now + lease_seconds,
+        ),
+    )
+
+
+def update_job_stage(
+    document_id: str, stage: str, state: str, operation_id: Optional[str] = None
+) -> None:
+    """Record that a job entered a stage, with the operation it is reattaching to."""
+    query = """
+        UPDATE jobs
+        SET stage = ?, status = 'running', operation_id = ?, state = ?, updated_at = ?
+        WHERE document_id = ?
+    """
+    execute_query(query, (stage, operation_id, state, time.time(), document_id))
+
+
+def update_job_state(document_id: str, state: str) -> None:
+    """Persist a job's resumable state without changing its stage."""
+    query = "UPDATE jobs SET state = ?, updated_at = ? WHERE document_id = ?"
+    execute_query(query, (state, time.time(), document_id))
+
+
+def update_job_operation(document_id: str, operation_id: str) -> None:
+    """Record the DU operation started for a job's current stage."""
+    query = "UPDATE jobs SET operation_id = ?, updated_at = ? WHERE document_id = ?"
+    execute_query(query, (operation_id, time.time(), document_id))
+
+
+def finish_job(
+    document_id: str, status: str, error_message: Optional[str] = None
+) -> None:
+    """Mark a job completed or failed."""
+    query = """
+        UPDATE jobs SET status = ?, error_message = ?, updated_at = ?
+        WHERE document_id = ?
+    """
+    execute_query(query, (status, error_message, time.time(), document_id))
+
+
+def claim_resumable_jobs(
+    lease_owner: str, lease_seconds: float
+) -> tuple[str, list[tuple]]:
+    """Atomically lease the unfinished jobs no live process holds.
+
+    Jobs are leased to the process running them and the lease is renewed
+    while it runs, so only jobs whose lease expired (their process died)
+    are claimed, never jobs ``lease_owner`` is already running. As with ``claim_uploaded_documents`` the lease and a fresh
+    claim token are written in a single UPDATE, so two processes never
+    resume the same job. Returns the token and the claimed (document_id,
+    document_path, stage, operation_id, state) rows.
+    """
+    claim_token = uuid.uuid4().hex
+    now = time.time()
+    execute_query(
+        """
+        UPDATE jobs
+        SET lease_owner = ?, lease_expires_at = ?, claim_token = ?
+        WHERE rowid IN (
+            SELECT rowid FROM jobs
+            WHERE status IN ('queued', 'running')
+              AND (lease_expires_at IS NULL OR lease_expires_at < ?)
+              AND lease_owner IS NOT ?
+        )
+        """,
+        (lease_owner, now + lease_seconds, claim_token, now, lease_owner),
+    )
+    claimed = execute_query(
+        """
+        SELECT document_id, document_path, stage, operation_id, state
+        FROM jobs
+        WHERE claim_token = ?
+        ORDER BY updated_at
+        """,
+        (claim_token,),
+    )
+    return claim_token, claimed
+
+
+def renew_job_leases(lease_owner: str, lease_seconds: float) -> None:
+    """Extend the lease on every unfinished job ``lease_owner`` is running."""
+    execute_query(
+        """
+        UPDATE jobs SET lease_expires_at = ?
+        WHERE lease_owner = ? AND status IN ('queued', 'running')
+        """,
+        (time.time() + lease_seconds, lease_owner),
+    )
+
+
+def claim_orphaned_documents(lease_seconds: float) -> tuple[str, list[tuple]]:
+    """Atomically reclaim documents claimed for processing but never queued.
+
+    ``/process/`` claims documents and then saves a job for each; a process
+    that dies in between leaves them 'queued' with no job. Documents claimed
+    more than ``lease_seconds`` ago without a job saved since are claimed
+    again under a fresh token. Returns it with the (filename, content_hash)
+    rows, like ``claim_uploaded_documents``.
+    """
+    claim_token = uuid.uuid4().hex
+    now = time.time()
+    execute_query(
+        """
+        UPDATE documents
+        SET claim_token = ?, claimed_at = ?
+        WHERE rowid IN (
+            SELECT rowid FROM documents
+            WHERE stage = 'queued' AND COALESCE(claimed_at, 0) < ?
+              AND NOT EXISTS (
+                  SELECT 1 FROM jobs
+                  WHERE jobs.filename = documents.filename
+                    AND jobs.updated_at >= COALESCE(documents.claimed_at, 0)
+              )
+        )
+        """,
+        (claim_token, now, now - lease_seconds),
+    )
+    claimed = execute_query(
+        "SELECT filename, content_hash FROM documents WHERE claim_token = ?",
+        (claim_token,),
+    )
+    return claim_token, claimed
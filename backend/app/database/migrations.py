@@ -0,0 +1,359 @@
+import logging
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+def _add_missing_columns(cursor, table: str, columns: dict[str, str]) -> None:
+    """Add columns introduced after a database was first created."""
+    cursor.execute(f"PRAGMA table_info({table})")
+    existing = {row[1] for row in cursor.fetchall()}
+    for name, column_type in columns.items():
+        if name not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}")
+
+
+EXTRACTION_COLUMNS = (
+    "filename, document_id, document_type_id, field_id, field, is_missing, "
+    "field_value, field_unformatted_value, validated_field_value, is_correct, "
+    "confidence, ocr_confidence, operator_confirmed, row_index, column_index, "
+    "page_range, page_count, timestamp"
+)
+
+EXTRACTION_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS extraction (
+        filename TEXT NOT NULL,
+        document_id TEXT NOT NULL,
+        document_type_id TEXT NOT NULL,
+        field_id TEXT,
+        field TEXT,
+        is_missing BOOLEAN,
+        field_value TEXT,
+        field_unformatted_value TEXT,
+        validated_field_value TEXT,
+        is_correct BOOLEAN,
+        confidence REAL,
+        ocr_confidence REAL,
+        operator_confirmed BOOLEAN,
+        row_index INTEGER DEFAULT -1,
+        column_index INTEGER DEFAULT -1,
+        page_range TEXT NOT NULL DEFAULT '',
+        page_count INTEGER,
+        timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (filename, page_range, field_id, field, row_index, column_index)
+    )
+"""
+
+
+def _rebuild_extraction_primary_key(cursor) -> None:
+    """Add page_range to the primary key of an extraction table created without it.
+
+    SQLite cannot alter a primary key, so the table is copied into a new one.
+    """
+    cursor.execute("PRAGMA table_info(extraction)")
+    if any(row[1] == "page_range" and row[5] for row in cursor.fetchall()):
+        return
+    cursor.execute("ALTER TABLE extraction RENAME TO extraction_old")
+    cursor.execute(EXTRACTION_TABLE_SQL)
+    cursor.execute(
+        f"""
+        INSERT OR REPLACE INTO extraction ({EXTRACTION_COLUMNS})
+        SELECT {EXTRACTION_COLUMNS.replace("page_range", "COALESCE(page_range, '')")}
+        FROM extraction_old
+        """
+    )
+    cursor.execute("DROP TABLE extraction_old")
+
+
+def _create_tables(cursor) -> None:
+    """Baseline schema.
+
+    Databases created before versioning may be at any earlier state of it,
+    so every statement is idempotent.
+    """
+    # Create documents table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS documents (
+            document_id TEXT PRIMARY KEY,
+            filename TEXT NOT NULL,
+            stage TEXT NOT NULL,
+            digitization_operation_id TEXT,
+            classification_operation_id TEXT,
+            classification_validation_operation_id TEXT,
+            extraction_operation_id TEXT,
+            extraction_validation_operation_id TEXT,
+            digitization_duration REAL,
+            classification_duration REAL,
+            classification_validation_duration REAL,
+            extraction_duration REAL,
+            extraction_validation_duration REAL,
+            project_id TEXT,
+            classifier_id TEXT,
+            extractor_id TEXT,
+            error_code TEXT,
+            error_message TEXT,
+            claim_token TEXT,
+            content_hash TEXT,
+            file_size INTEGER,
+            timestamp REAL NOT NULL
+        )
+    """)
+    _add_missing_columns(
+        cursor,
+        "documents",
+        {"claim_token": "TEXT", "content_hash": "TEXT", "file_size": "INTEGER"},
+    )
+
+    # Create classification table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS classification (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            document_id TEXT NOT NULL,
+            filename TEXT NOT NULL,
+            document_type_id TEXT NOT NULL,
+            classification_confidence REAL NOT NULL,
+            start_page INTEGER NOT NULL,
+            page_count INTEGER NOT NULL,
+            classifier_name TEXT NOT NULL,
+            operation_id TEXT NOT NULL
+        )
+    """)
+
+    # Create extraction table (one row set per page range of a split document)
+    cursor.execute(EXTRACTION_TABLE_SQL)
+    _rebuild_extraction_primary_key(cursor)
+
+    # Create digitization cache table (DU documentId per file content)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS digitization_cache (
+            content_hash TEXT NOT NULL,
+            project_id TEXT NOT NULL,
+            document_id TEXT NOT NULL,
+            filename TEXT,
+            timestamp REAL NOT NULL,
+            PRIMARY KEY (content_hash, project_id)
+        )
+    """)
+
+    # Create result cache table (raw classification/extraction payloads)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS result_cache (
+            action TEXT NOT NULL,
+            content_hash TEXT NOT NULL,
+            module_id TEXT NOT NULL,
+            prompt_hash TEXT NOT NULL,
+            operation_id TEXT,
+            payload TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_used REAL NOT NULL,
+            PRIMARY KEY (action, content_hash, module_id, prompt_hash)
+        )
+    """)
+
+    # Create upload sessions table (resumable chunked uploads)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS upload_sessions (
+            session_id TEXT PRIMARY KEY,
+            filename TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            received TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        )
+    """)
+
+    # Create jobs table (durable pipeline queue)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            document_id TEXT PRIMARY KEY,
+            filename TEXT NOT NULL,
+            document_path TEXT NOT NULL,
+            stage TEXT NOT NULL,
+            status TEXT NOT NULL,
+            operation_id TEXT,
+            state TEXT,
+            error_message TEXT,
+            updated_at REAL NOT NULL
+        )
+    """)
+
+
+def _add_documents_indexes(cursor) -> None:
+    # update_cache and register_uploads match documents by filename
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_documents_filename ON documents (filename)"
+    )
+    # claim_uploaded_documents and count_uploaded_documents
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_documents_stage_timestamp "
+        "ON documents (stage, timestamp)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_documents_claim_token "
+        "ON documents (claim_token) WHERE claim_token IS NOT NULL"
+    )
+
+
+def _add_lookup_indexes(cursor) -> None:
+    """Indexes for the lookups that otherwise scan whole tables."""
+    _add_documents_indexes(cursor)
+    # Validated-value updates in WriteResults and the dashboard's field data
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_extraction_document_field "
+        "ON extraction (document_id, field_id, field, row_index, column_index, "
+        "page_range)"
+    )
+    # claim_resumable_jobs
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_jobs_status_updated_at "
+        "ON jobs (status, updated_at)"
+    )
+    # Expiry of upload sessions and result cache entries
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_upload_sessions_updated_at "
+        "ON upload_sessions (updated_at)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_result_cache_last_used "
+        "ON result_cache (last_used)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_result_cache_created_at "
+        "ON result_cache (created_at)"
+    )
+
+
+DOCUMENTS_COLUMNS = (
+    "document_id, filename, stage, digitization_operation_id, "
+    "classification_operation_id, classification_validation_operation_id, "
+    "extraction_operation_id, extraction_validation_operation_id, "
+    "digitization_duration, classification_duration, "
+    "classification_validation_duration, extraction_duration, "
+    "extraction_validation_duration, project_id, classifier_id, extractor_id, "
+    "error_code, error_message, claim_token, content_hash, file_size, timestamp"
+)
+
+
+def _share_document_ids(cursor) -> None:
+    """Drop the primary key on documents.document_id.
+
+    Files with the same content are digitized once and share the DU
+    document id, so each file keeps its own row and stage updates by
+    document id reach all of them. SQLite cannot drop a primary key, so the
+    table is copied into a new one.
+    """
+    cursor.execute("ALTER TABLE documents RENAME TO documents_old")
+    cursor.execute("""
+        CREATE TABLE documents (
+            document_id TEXT,
+            filename TEXT NOT NULL,
+            stage TEXT NOT NULL,
+            digitization_operation_id TEXT,
+            classification_operation_id TEXT,
+            classification_validation_operation_id TEXT,
+            extraction_operation_id TEXT,
+            extraction_validation_operation_id TEXT,
+            digitization_duration REAL,
+            classification_duration REAL,
+            classification_validation_duration REAL,
+            extraction_duration REAL,
+            extraction_validation_duration REAL,
+            project_id TEXT,
+            classifier_id TEXT,
+            extractor_id TEXT,
+            error_code TEXT,
+            error_message TEXT,
+            claim_token TEXT,
+            content_hash TEXT,
+            file_size INTEGER,
+            timestamp REAL NOT NULL
+        )
+    """)
+    cursor.execute(
+        f"INSERT INTO documents ({DOCUMENTS_COLUMNS}) "
+        f"SELECT {DOCUMENTS_COLUMNS} FROM documents_old"
+    )
+    # Dropping the old table drops its indexes too
+    cursor.execute("DROP TABLE documents_old")
+    _add_documents_indexes(cursor)
+    # update_document_stage matches documents by DU document id
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_documents_document_id "
+        "ON documents (document_id)"
+    )
+
+
+def _lease_jobs(cursor) -> None:
+    """Lease jobs to the process running them.
+
+    A process renews the lease on its jobs while it runs, so jobs are only
+    resumed elsewhere once it stops renewing. documents.claimed_at dates
+    each claim, so documents claimed by a process that died before saving
+    their jobs can be found again.
+    """
+    _add_missing_columns(
+        cursor,
+        "jobs",
+        {"lease_owner": "TEXT", "lease_expires_at": "REAL", "claim_token": "TEXT"},
+    )
+    _add_missing_columns(cursor, "documents", {"claimed_at": "REAL"})
+    # claim_resumable_jobs
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_jobs_claim_token "
+        "ON jobs (claim_token) WHERE claim_token IS NOT NULL"
+    )
+    # renew_job_leases
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_jobs_lease_owner "
+        "ON jobs (lease_owner) WHERE lease_owner IS NOT NULL"
+    )
+    # claim_orphaned_documents looks for a job saved since the claim
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_jobs_filename_updated_at "
+        "ON jobs (filename, updated_at)"
+    )
+
+
+# Schema versions in order; a database records the last one applied in
+# PRAGMA user_version. Append new migrations, never edit applied ones.
+MIGRATIONS: list[tuple[int, str, Callable]] = [
+    (1, "baseline tables", _create_tables),
+    (2, "indexes for hot lookups", _add_lookup_indexes),
+    (3, "documents share DU document ids", _share_document_ids),
+    (4, "job leases", _lease_jobs),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def migrate(conn) -> int:
+    """Apply every migration newer than the database's version; returns the version.
+
+    Each migration runs in its own transaction together with the version
+    bump, so an interrupted upgrade resumes at the migration that failed.
+    """
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version > SCHEMA_VERSION:
+        logger.warning(
+            f"Database schema version {version} is newer than this app's "
+            f"{SCHEMA_VERSION}"
+        )
+        return version
+
+    for target, description, apply in MIGRATIONS:
+        if target <= version:
+            continue
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN")
+            apply(cursor)
+            cursor.execute(f"PRAGMA user_version = {target}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+        logger.info(f"Migrated database to version {target}: {description}")
+        version = target
+    return version
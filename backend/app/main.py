@@ -1,14 +1,40 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from api.discovery_routes import router as discovery_router
 from api.process_docs import router as process_docs_router
 from api.results_dashboard import router as dashboard_router
+from api.auth import warm_up_authentication
 from config.project_setup import ensure_database
+from database.connection import close_connection
+from services.du_client import close_du_client
+from services.operation_poller import stop_operation_poller
+from services.document_processor import (
+    resume_document_processor,
+    stop_document_processor,
+)
 
 # Initialize the database
 ensure_database()
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Fetch the first token in the background instead of delaying startup
+    warm_up = asyncio.create_task(warm_up_authentication())
+    # Pick up documents that were in flight when the server last stopped
+    await resume_document_processor()
+    yield
+    warm_up.cancel()
+    # Stop the pipeline and poller, then release pooled DU connections
+    await stop_document_processor()
+    await stop_operation_poller()
+    await close_du_client()
+    close_connection()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Add CORS middleware to allow all origins
 app.add_middleware(
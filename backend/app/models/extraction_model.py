@@ -31,12 +31,14 @@ class Extraction(Base):
     operator_confirmed = Column(Boolean, nullable=True)
     row_index = Column(Integer, default=-1)
     column_index = Column(Integer, default=-1)
+    page_range = Column(String, nullable=False, default="")
+    page_count = Column(Integer, nullable=True)
     timestamp = Column(DateTime, default=func.now())
 
-    # Composite Primary Key
+    # Composite Primary Key (a split document has one row set per page range)
     __table_args__ = (
         PrimaryKeyConstraint(
-            "filename", "field_id", "field", "row_index", "column_index"
+            "filename", "page_range", "field_id", "field", "row_index", "column_index"
         ),
     )
 
@@ -28,4 +28,8 @@ class Settings(BaseModel):
     validate_extraction_later: bool = False
     perform_classification: bool = False
     perform_extraction: bool = False
+    # Extract every classified sub-document concurrently, not just the first
+    fan_out_extraction: bool = False
+    # Start extraction with the predicted extractor while classification runs
+    speculative_extraction: bool = False
     project: ProjectSettings = ProjectSettings()
@@ -0,0 +1,6 @@
+from pydantic import BaseModel, Field
+
+
+class UploadSessionCreate(BaseModel):
+    filename: str
+    size: int = Field(gt=0)
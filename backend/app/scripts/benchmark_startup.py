@@ -0,0 +1,89 @@
+"""Measure cold-start latency of the API.
+
+Each run starts a fresh interpreter in an empty working directory, imports
+``main``, runs the application lifespan and sends a first request, and
+reports how long each step took. Run it from backend/app:
+
+    python -m scripts.benchmark_startup --runs 5 --max-ready 2.0
+
+With ``--max-ready`` the script exits with status 1 when the median
+import-to-ready time exceeds the limit, so it can gate a CI job.
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child interpreter; prints the timings as one JSON line
+PROBE = r"""
+import json
+import time
+from fastapi.testclient import TestClient
+
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+with TestClient(main.app) as client:
+    ready = time.perf_counter()
+    client.get("/openapi.json")
+    first_request = time.perf_counter()
+print(json.dumps({
+    "import": imported - start,
+    "lifespan": ready - imported,
+    "ready": ready - start,
+    "first_request": first_request - ready,
+}))
+"""
+
+METRICS = ("import", "lifespan", "ready", "first_request")
+
+
+def run_once() -> dict:
+    env = {**os.environ, "PYTHONPATH": APP_DIR}
+    with tempfile.TemporaryDirectory() as workdir:
+        completed = subprocess.run(
+            [sys.executable, "-c", PROBE],
+            cwd=workdir,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="cold starts to measure")
+    parser.add_argument(
+        "--max-ready",
+        type=float,
+        default=None,
+        help="fail if the median import-to-ready time exceeds this many seconds",
+    )
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    print(f"{'metric':<15}{'min':>10}{'median':>10}{'max':>10}")
+    for metric in METRICS:
+        values = [run[metric] for run in runs]
+        print(
+            f"{metric:<15}{min(values):>9.3f}s{statistics.median(values):>9.3f}s"
+            f"{max(values):>9.3f}s"
+        )
+
+    ready = statistics.median(run["ready"] for run in runs)
+    if args.max_ready is not None and ready > args.max_ready:
+        print(f"Median import-to-ready {ready:.3f}s exceeds {args.max_ready:.3f}s")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
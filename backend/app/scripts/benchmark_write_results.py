@@ -0,0 +1,167 @@
+"""Compare batched extraction writes with one statement per row.
+
+Builds a synthetic extraction result with large ``Tables`` and writes it
+into a scratch database twice per run: once the way WriteResults used to,
+with an UPSERT string built and executed for every field and cell, and once
+through WriteResults, which sends all rows of each kind through a single
+``executemany``. Both paths commit once. Run it from backend/app:
+
+    python -m scripts.benchmark_write_results --tables 4 --rows 500 --columns 10
+"""
+
+import os
+import sys
+import argparse
+import tempfile
+import statistics
+import time
+from database.connection import get_connection, close_connection
+from database.migrations import migrate
+from utils.write_results import (
+    EXTRACTION_KEY_COLUMNS,
+    EXTRACTION_ROW_COLUMNS,
+    WriteResults,
+)
+
+
+def _value(text: str) -> dict:
+    return {
+        "Value": text,
+        "UnformattedValue": text,
+        "Confidence": 0.97,
+        "OcrConfidence": 0.99,
+        "OperatorConfirmed": False,
+        "DataSource": "Automatic",
+    }
+
+
+def synthetic_extraction(tables: int, rows: int, columns: int, fields: int) -> dict:
+    """An extractionResult payload with ``tables`` tables of rows x columns cells."""
+    table_results = []
+    for table in range(tables):
+        cells = [
+            {
+                "RowIndex": 0,
+                "ColumnIndex": column,
+                "IsHeader": True,
+                "Values": [_value(f"column_{column}")],
+            }
+            for column in range(columns)
+        ]
+        cells += [
+            {
+                "RowIndex": row,
+                "ColumnIndex": column,
+                "IsHeader": False,
+                "IsMissing": False,
+                "Values": [_value(f"{table}-{row}-{column}")],
+            }
+            for row in range(1, rows + 1)
+            for column in range(columns)
+        ]
+        table_results.append(
+            {"FieldId": f"table_{table}", "Values": [{"Cells": cells}]}
+        )
+
+    return {
+        "extractionResult": {
+            "DocumentId": "benchmark-document",
+            "ResultsDocument": {
+                "DocumentTypeId": "benchmark",
+                "Bounds": {"PageRange": "1-10", "PageCount": 10},
+                "Fields": [
+                    {
+                        "FieldId": f"field_{field}",
+                        "FieldName": f"Field {field}",
+                        "IsMissing": False,
+                        "Values": [_value(f"value {field}")],
+                    }
+                    for field in range(fields)
+                ],
+                "Tables": table_results,
+            },
+        }
+    }
+
+
+def per_row_upsert(cursor, rows: list[tuple]) -> None:
+    """The previous write path: one UPSERT string built and executed per row."""
+    for row in rows:
+        row_data = dict(zip(EXTRACTION_ROW_COLUMNS, row))
+        columns = ", ".join(row_data.keys())
+        placeholders = ", ".join("?" * len(row_data))
+        updates = ", ".join(f"{key} = excluded.{key}" for key in row_data.keys())
+        cursor.execute(
+            f"""
+            INSERT INTO extraction ({columns})
+            VALUES ({placeholders})
+            ON CONFLICT({", ".join(EXTRACTION_KEY_COLUMNS)})
+            DO UPDATE SET {updates}
+            """,
+            tuple(row_data.values()),
+        )
+
+
+def write_per_row(payload: dict) -> None:
+    writer = WriteResults("benchmark.pdf", payload)
+    per_row_upsert(writer.cursor, writer.field_rows())
+    per_row_upsert(writer.cursor, writer.table_rows())
+    writer.conn.commit()
+    writer.cursor.close()
+
+
+def write_batched(payload: dict) -> None:
+    writer = WriteResults("benchmark.pdf", payload)
+    writer.write_extraction_results()
+    writer.conn.commit()
+    writer.cursor.close()
+
+
+def timed(write, payload: dict) -> float:
+    """Write into an empty extraction table and return the elapsed seconds."""
+    conn = get_connection()
+    conn.execute("DELETE FROM extraction")
+    conn.commit()
+    start = time.perf_counter()
+    write(payload)
+    return time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tables", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--columns", type=int, default=10)
+    parser.add_argument("--fields", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    payload = synthetic_extraction(args.tables, args.rows, args.columns, args.fields)
+    row_count = args.tables * args.rows * args.columns + args.fields
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        # The connection opens cache/document_cache.db relative to the cwd
+        os.chdir(directory)
+        os.makedirs("cache")
+        migrate(get_connection())
+
+        results = {"per_row": [], "batched": []}
+        for _ in range(args.runs):
+            results["per_row"].append(timed(write_per_row, payload))
+            results["batched"].append(timed(write_batched, payload))
+        written = get_connection().execute("SELECT COUNT(*) FROM extraction")
+        assert written.fetchone()[0] == row_count
+        close_connection()
+        os.chdir(cwd)
+
+    print(f"{row_count} rows, median of {args.runs} runs")
+    medians = {name: statistics.median(times) for name, times in results.items()}
+    for name, median in medians.items():
+        print(f"{name:<8}{median * 1000:9.1f} ms{row_count / median:12.0f} rows/s")
+    print(f"speedup {medians['per_row'] / medians['batched']:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""Check that the operation poller survives failed status polls.
+
+Registers operations with the shared poller against a mocked DU endpoint
+whose first status poll fails, with DU client retries turned off so the
+failure reaches the poller. Transport errors, 5xx and 429 responses must
+leave the operation pending until a later poll resolves it; a 404 must fail
+it. Run it from backend/app:
+
+    python -m scripts.check_operation_poller
+"""
+
+import sys
+import asyncio
+import httpx
+from services.du_client import get_du_client
+from services.resilience import get_resilience
+from services.operation_poller import PollResult, get_operation_poller
+
+URL = "https://du.example.com/operations/{}"
+
+
+def failing_first_poll(failure) -> httpx.MockTransport:
+    """A DU endpoint whose first status poll fails with ``failure``."""
+    polls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal polls
+        polls += 1
+        if polls == 1:
+            if isinstance(failure, Exception):
+                raise failure
+            return httpx.Response(failure, request=request)
+        return httpx.Response(200, json={"status": "Succeeded"}, request=request)
+
+    return httpx.MockTransport(handler)
+
+
+async def evaluate(response: dict, operation) -> PollResult:
+    return PollResult(done=response["status"] == "Succeeded", result="done")
+
+
+async def poll_once_failed(name: str, failure) -> str:
+    """Poll an operation whose first poll fails; return its outcome."""
+    client = get_du_client()
+    client._client = httpx.AsyncClient(transport=failing_first_poll(failure))
+    future = get_operation_poller().register(
+        name, URL.format(name), {}, evaluate, interval=0.1
+    )
+    try:
+        return await asyncio.wait_for(future, 10)
+    except Exception as e:
+        return f"failed: {e!r}"
+    finally:
+        await client.aclose()
+
+
+CASES = [
+    ("connect_error", httpx.ConnectError("refused"), "done"),
+    ("read_timeout", httpx.ReadTimeout("timed out"), "done"),
+    ("service_unavailable", 503, "done"),
+    ("throttled", 429, "done"),
+    ("not_found", 404, None),
+]
+
+
+async def run() -> int:
+    # Let every failure reach the poller instead of the client's retry loop
+    get_resilience().max_retries = 0
+    failures = 0
+    for name, failure, expected in CASES:
+        outcome = await poll_once_failed(name, failure)
+        ok = outcome == expected if expected else outcome.startswith("failed")
+        failures += not ok
+        print(f"{'ok' if ok else 'FAIL':<5}{name}: {outcome}")
+    print(get_operation_poller().stats())
+    return 1 if failures else 0
+
+
+def main() -> int:
+    return asyncio.run(run())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
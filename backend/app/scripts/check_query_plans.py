@@ -0,0 +1,181 @@
+"""Check that the hot database lookups use indexes instead of table scans.
+
+Builds a scratch database with the current migrations and calls each
+function below against it. Every statement those functions execute is
+traced and run through EXPLAIN QUERY PLAN, so the check follows the real
+queries as they change. Fails if any plan step scans a table. Run it from
+backend/app:
+
+    python -m scripts.check_query_plans
+"""
+
+import os
+import sys
+import asyncio
+import sqlite3
+import tempfile
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from config.project_config import SQLITE_DB_PATH
+from database.connection import get_connection, close_connection
+from database.migrations import migrate
+from database.db_utils import (
+    claim_uploaded_documents,
+    count_uploaded_documents,
+    evict_result_cache,
+    claim_orphaned_documents,
+    claim_resumable_jobs,
+    get_expired_upload_sessions,
+    register_uploads,
+    renew_job_leases,
+    update_cache,
+    update_document_stage,
+)
+from api.results_dashboard import get_field_data
+from utils.write_results import WriteResults
+
+# Statement kinds that have a query plan worth checking
+PLANNED_STATEMENTS = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+# Every statement sent to the scratch database, filled by the trace callbacks
+STATEMENTS: list[str] = []
+
+
+def _extraction_result() -> dict:
+    value = {"Value": "1", "Confidence": 0.9, "OcrConfidence": 0.9}
+    return {
+        "DocumentId": "doc",
+        "ResultsDocument": {
+            "DocumentTypeId": "invoices",
+            "Bounds": {"PageRange": "1", "PageCount": 1},
+            "Fields": [{"FieldId": "total", "FieldName": "Total", "Values": [value]}],
+            "Tables": [
+                {
+                    "FieldId": "items",
+                    "Values": [
+                        {
+                            "Cells": [
+                                {
+                                    "RowIndex": 0,
+                                    "ColumnIndex": 0,
+                                    "IsHeader": True,
+                                    "Values": [{"Value": "Amount"}],
+                                },
+                                {
+                                    "RowIndex": 1,
+                                    "ColumnIndex": 0,
+                                    "IsHeader": False,
+                                    "Values": [value],
+                                },
+                            ]
+                        }
+                    ],
+                }
+            ],
+        },
+    }
+
+
+def write_results() -> None:
+    """Write and validate an extraction, then export it to CSV."""
+    result = _extraction_result()
+    WriteResults(
+        "scratch.pdf",
+        {"extractionResult": result},
+        {"result": {"validatedExtractionResults": result}},
+    ).write_results()
+
+
+def field_data() -> None:
+    """Run the dashboard's ORM query on an engine bound to the scratch database.
+
+    The app's engine resolves its relative path when it is imported, so it
+    cannot follow the scratch directory.
+    """
+    engine = create_engine(f"sqlite:///{os.path.abspath(SQLITE_DB_PATH)}")
+    event.listen(
+        engine,
+        "connect",
+        lambda dbapi_connection, _: dbapi_connection.set_trace_callback(
+            STATEMENTS.append
+        ),
+    )
+    with Session(engine) as db:
+        asyncio.run(get_field_data("doc", db))
+    engine.dispose()
+
+
+# (description, call) for every hot lookup
+HOT_CALLS = [
+    ("register_uploads", lambda: register_uploads([("scratch.pdf", "hash", 1)])),
+    ("claim_uploaded_documents", lambda: claim_uploaded_documents(10)),
+    ("count_uploaded_documents", count_uploaded_documents),
+    ("update_cache", lambda: update_cache("scratch.pdf", "doc", "digitization")),
+    (
+        "update_document_stage",
+        lambda: update_document_stage(
+            "extraction", "doc", "extraction", "op", duration=1.0, extractor_id="ex"
+        ),
+    ),
+    ("WriteResults.write_results", write_results),
+    ("get_field_data", field_data),
+    ("claim_resumable_jobs", lambda: claim_resumable_jobs("owner", 60)),
+    ("renew_job_leases", lambda: renew_job_leases("owner", 60)),
+    ("claim_orphaned_documents", lambda: claim_orphaned_documents(60)),
+    ("get_expired_upload_sessions", lambda: get_expired_upload_sessions(60)),
+    ("evict_result_cache: expired entries", lambda: evict_result_cache(0, 60)),
+]
+
+
+def query_plan(conn: sqlite3.Connection, statement: str) -> list[str]:
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {statement}")]
+
+
+def traced_statements(call) -> list[str]:
+    """Run ``call`` and return the statements with a query plan it executed."""
+    STATEMENTS.clear()
+    call()
+    return [
+        statement
+        for statement in STATEMENTS
+        if statement.lstrip().upper().startswith(PLANNED_STATEMENTS)
+    ]
+
+
+def main() -> int:
+    failures = 0
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        # Connections open cache/document_cache.db relative to the cwd
+        os.chdir(directory)
+        os.makedirs("cache")
+        conn = get_connection()
+        migrate(conn)
+        conn.set_trace_callback(STATEMENTS.append)
+
+        for description, call in HOT_CALLS:
+            for statement in traced_statements(call):
+                plan = query_plan(conn, statement)
+                scans = [
+                    step
+                    for step in plan
+                    if step.startswith("SCAN") and step != "SCAN CONSTANT ROW"
+                ]
+                status = "FAIL" if scans else "ok"
+                failures += bool(scans)
+                summary = " ".join(statement.split())[:80]
+                print(f"{status:<5}{description}: {summary}")
+                print(f"       {'; '.join(plan) or 'no table access'}")
+
+        conn.set_trace_callback(None)
+        close_connection()
+        os.chdir(cwd)
+
+    if failures:
+        print(f"{failures} statement(s) scan a table")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
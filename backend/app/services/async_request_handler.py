@@ -1,13 +1,19 @@
+import asyncio
 import time
-import requests
+import httpx
 from datetime import datetime
 from database.db_utils import update_document_stage
+from .latency_model import get_latency_model
+from .operation_poller import PollResult, PolledOperation, get_operation_poller
+from .resilience import backoff_delay, get_resilience
+from api.auth import TokenProvider
 
 
-def _log_error(action, document_id, operation_id, error_code, error_message):
+async def _log_error(action, document_id, operation_id, error_code, error_message):
     print(f"{action.capitalize()} failed. OperationID: {operation_id}")
     print(f"Error Code: {error_code}, Error Message: {error_message}")
-    update_document_stage(
+    await asyncio.to_thread(
+        update_document_stage,
         action=action,
         document_id=document_id,
         new_stage=f"{action}_failed",
@@ -17,14 +23,14 @@ def _log_error(action, document_id, operation_id, error_code, error_message):
     )
 
 
-def submit_async_request(
+async def submit_async_request(
     action: str,
     base_url: str,
     project_id: str,
     module_id: str,
     operation_id: str,
     document_id: str,
-    bearer_token: str,
+    token_provider: TokenProvider,
     max_retries: int = 15,  # Maximum retries for errors
     retry_delay: float = 2.0,  # Initial delay for retries
 ) -> dict:
@@ -43,79 +49,91 @@ def submit_async_request(
         print("Invalid action or missing Module ID for extraction.")
         return None
 
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {bearer_token}",
-    }
+    # The poller adds a current Authorization header to every poll
+    headers = {"accept": "application/json"}
     start_time = time.time()
     retries = 0
+    latency_model = get_latency_model()
+    resilience = get_resilience()
 
-    while True:
-        try:
-            response = requests.get(api_url, headers=headers, timeout=60)
-            response.raise_for_status()
-            response_data = response.json()
-
-            if response_data["status"] == "Succeeded":
-                end_time = time.time()
-                duration = end_time - start_time
-                print(f"{action.capitalize()} completed successfully!")
-
-                update_document_stage(
-                    action=action,
-                    document_id=document_id,
-                    duration=duration,
-                    new_stage=action,
-                    operation_id=operation_id,
-                    classifier_id=classifier_id,
-                    extractor_id=extractor_id,
+    async def evaluate(response_data: dict, operation: PolledOperation) -> PollResult:
+        nonlocal retries
+
+        if response_data["status"] == "Succeeded":
+            end_time = time.time()
+            duration = end_time - start_time
+            print(f"{action.capitalize()} completed successfully!")
+            latency_model.record(action, module_id, duration)
+
+            await asyncio.to_thread(
+                update_document_stage,
+                action=action,
+                document_id=document_id,
+                duration=duration,
+                new_stage=action,
+                operation_id=operation_id,
+                classifier_id=classifier_id,
+                extractor_id=extractor_id,
+            )
+            return PollResult(done=True, result=response_data.get("result"))
+
+        elif response_data["status"] in {"NotStarted", "Running"}:
+            print(f"{action.capitalize()} status: {response_data['status']}...")
+            return PollResult(
+                delay=latency_model.next_interval(
+                    action, module_id, time.time() - start_time
                 )
-                return response_data.get("result")
-
-            elif response_data["status"] in {"NotStarted", "Running"}:
-                print(f"{action.capitalize()} status: {response_data['status']}...")
-                time.sleep(1)
-                continue
-
-            else:  # Handle failure states
-                error_code = response_data.get("error", {}).get("code")
-                error_message = response_data.get("error", {}).get("message")
-                _log_error(action, document_id, operation_id, error_code, error_message)
-
-                if error_code == "[IxpExtractorUnavailableError]":
-                    if retries < max_retries:
-                        retries += 1
-                        delay = retry_delay * (
-                            2 ** (retries - 1)
-                        )  # Exponential backoff
-                        print(
-                            f"Retrying due to error: {error_code}. Retry {retries}/{max_retries} in {delay} seconds..."
-                        )
-                        time.sleep(delay)
-                        continue  # Retry the loop
-                    else:
-                        raise RuntimeError(
-                            f"Maximum retries reached for error {error_code}. Unable to complete the request."
-                        )
-
-                # Raise for other errors
-                raise RuntimeError(
-                    f"Operation {action} failed: {error_message} (Error Code: {error_code})"
+            )
+
+        # Handle failure states
+        error_code = response_data.get("error", {}).get("code")
+        error_message = response_data.get("error", {}).get("message")
+        await _log_error(action, document_id, operation_id, error_code, error_message)
+
+        if error_code == "[IxpExtractorUnavailableError]":
+            # The only failure counted against the extractor's breaker
+            breaker = resilience.breaker(module_id)
+            breaker.record_failure()
+            # Stop retrying once the extractor's breaker opens; the job is parked
+            if not breaker.is_open() and resilience.should_retry(retries, max_retries):
+                delay = backoff_delay(retries, retry_delay)  # Jittered backoff
+                retries += 1
+                print(
+                    f"Retrying due to error: {error_code}. Retry {retries}/{max_retries} in {delay:.1f} seconds..."
                 )
+                return PollResult(delay=delay)
+            raise RuntimeError(
+                f"Giving up after {retries} retries for error {error_code}. Unable to complete the request."
+            )
 
-        except requests.exceptions.RequestException as e:
-            _log_error(action, document_id, operation_id, "NetworkError", str(e))
-        except KeyError as ke:
-            _log_error(action, document_id, operation_id, "KeyError", str(ke))
-        except Exception as ex:
-            _log_error(action, document_id, operation_id, "UnexpectedError", str(ex))
+        # Raise for other errors
+        raise RuntimeError(
+            f"Operation {action} failed: {error_message} (Error Code: {error_code})"
+        )
 
-        return None
+    # Wait on the shared poller instead of polling from this coroutine
+    try:
+        return await get_operation_poller().register(
+            operation_id,
+            api_url,
+            headers,
+            evaluate,
+            token_provider=token_provider,
+            delay=latency_model.next_interval(action, module_id, 0),
+        )
+    except httpx.HTTPError as e:
+        await _log_error(action, document_id, operation_id, "NetworkError", str(e))
+    except KeyError as ke:
+        await _log_error(action, document_id, operation_id, "KeyError", str(ke))
+    except Exception as ex:
+        await _log_error(action, document_id, operation_id, "UnexpectedError", str(ex))
+
+    return None
 
 
-def submit_validation_request(
+async def submit_validation_request(
     action: str,
-    bearer_token: str,
+    token_provider: TokenProvider,
     base_url: str,
     project_id: str,
     operation_id: str,
@@ -142,110 +160,105 @@ def submit_validation_request(
         print("Invalid action or missing extractor ID for extraction.")
         return None
 
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {bearer_token}",
-    }
+    # The poller adds a current Authorization header to every poll
+    headers = {"accept": "application/json"}
+    submitted_at = time.time()
+    latency_model = get_latency_model()
 
-    try:
-        while True:
-            response = requests.get(api_url, headers=headers, timeout=60)
-            response_data = response.json()
+    def poll_again() -> PollResult:
+        return PollResult(
+            delay=latency_model.next_interval(
+                action, module_id, time.time() - submitted_at
+            )
+        )
 
-            if response_data.get("status") == "Succeeded":
-                print(
-                    f"{action.capitalize()} Validation request submitted successfully!"
-                )
-                while True:
-                    response = requests.get(api_url, headers=headers, timeout=60)
-                    response_data = response.json()
-
-                    action_data_status = (
-                        response_data.get("result", {})
-                        .get("actionData", {})
-                        .get("status")
-                    )
-
-                    if action_data_status is None:
-                        print("Error: Missing actionData status in response.")
-                        return None
-
-                    print(
-                        f"Validate Document {action.capitalize()} action status: {action_data_status}"
-                    )
-
-                    if action_data_status == "Unassigned":
-                        print(
-                            f"Validation Document {action.capitalize()} is unassigned. Waiting..."
-                        )
-                    elif action_data_status == "Pending":
-                        print(
-                            f"Validate Document {action.capitalize()} in progress. Waiting..."
-                        )
-                    elif action_data_status == "Completed":
-                        print(f"Validate Document {action.capitalize()} is completed.")
-                        # Extract document ID based on action type
-                        document_key = (
-                            "validatedExtractionResults"
-                            if action == "extraction_validation"
-                            else "validatedClassificationResults"
-                        )
-                        if action == "classification_validation":
-                            document_id = response_data["result"][document_key][0][
-                                "DocumentId"
-                            ]
-                        else:
-                            document_id = response_data["result"][document_key][
-                                "DocumentId"
-                            ]
-
-                        # Parse start and end times
-                        start_time_str = response_data["result"]["actionData"][
-                            "lastAssignedTime"  ## Not valid if directly assigned!
-                        ]
-                        end_time_str = response_data["result"]["actionData"][
-                            "completionTime"
-                        ]
-                        start_time = datetime.fromisoformat(
-                            start_time_str.replace("Z", "+00:00")
-                        )
-                        end_time = datetime.fromisoformat(
-                            end_time_str.replace("Z", "+00:00")
-                        )
-
-                        # Calculate duration
-                        duration = (end_time - start_time).total_seconds()
-                        update_document_stage(
-                            document_id=document_id,
-                            action=action,
-                            new_stage=action,
-                            duration=duration,
-                            operation_id=operation_id,
-                            classifier_id=classifier_id,
-                            extractor_id=extractor_id,
-                        )
-                        return response_data
-                    else:
-                        print("Unknown validation action status.")
-                    time.sleep(5)  # Wait for 5 seconds before checking again
-
-            elif response_data.get("status") == "NotStarted":
-                print(
-                    f"{action.capitalize()} Validation request has not started. Waiting..."
-                )
-            elif response_data.get("status") == "Running":
-                print(
-                    f"{action.capitalize()} Validation request is in progress. Waiting..."
-                )
-            elif response_data.get("status") == "Unassigned":
-                print(
-                    f"{action.capitalize()} Validation request is unassigned. Waiting..."
-                )
+    async def evaluate(response_data: dict, operation: PolledOperation) -> PollResult:
+        status = response_data.get("status")
+
+        if status == "NotStarted":
+            print(
+                f"{action.capitalize()} Validation request has not started. Waiting..."
+            )
+            return poll_again()
+        elif status == "Running":
+            print(
+                f"{action.capitalize()} Validation request is in progress. Waiting..."
+            )
+            return poll_again()
+        elif status == "Unassigned":
+            print(f"{action.capitalize()} Validation request is unassigned. Waiting...")
+            return poll_again()
+        elif status != "Succeeded":
+            print(f"{action.capitalize()} Validation request failed...")
+            return PollResult(done=True)
+
+        action_data_status = (
+            response_data.get("result", {}).get("actionData", {}).get("status")
+        )
+
+        if action_data_status is None:
+            print("Error: Missing actionData status in response.")
+            return PollResult(done=True)
+
+        print(
+            f"Validate Document {action.capitalize()} action status: {action_data_status}"
+        )
+
+        if action_data_status == "Unassigned":
+            print(
+                f"Validation Document {action.capitalize()} is unassigned. Waiting..."
+            )
+        elif action_data_status == "Pending":
+            print(f"Validate Document {action.capitalize()} in progress. Waiting...")
+        elif action_data_status == "Completed":
+            print(f"Validate Document {action.capitalize()} is completed.")
+            # Extract document ID based on action type
+            document_key = (
+                "validatedExtractionResults"
+                if action == "extraction_validation"
+                else "validatedClassificationResults"
+            )
+            if action == "classification_validation":
+                document_id = response_data["result"][document_key][0]["DocumentId"]
             else:
-                print(f"{action.capitalize()} Validation request failed...")
-                return None
+                document_id = response_data["result"][document_key]["DocumentId"]
 
-    except requests.exceptions.RequestException as e:
+            # Parse start and end times
+            start_time_str = response_data["result"]["actionData"][
+                "lastAssignedTime"  ## Not valid if directly assigned!
+            ]
+            end_time_str = response_data["result"]["actionData"]["completionTime"]
+            start_time = datetime.fromisoformat(start_time_str.replace("Z", "+00:00"))
+            end_time = datetime.fromisoformat(end_time_str.replace("Z", "+00:00"))
+
+            # Calculate duration
+            duration = (end_time - start_time).total_seconds()
+            latency_model.record(action, module_id, duration)
+            await asyncio.to_thread(
+                update_document_stage,
+                document_id=document_id,
+                action=action,
+                new_stage=action,
+                duration=duration,
+                operation_id=operation_id,
+                classifier_id=classifier_id,
+                extractor_id=extractor_id,
+            )
+            return PollResult(done=True, result=response_data)
+        else:
+            print("Unknown validation action status.")
+        return poll_again()
+
+    try:
+        return await get_operation_poller().register(
+            operation_id,
+            api_url,
+            headers,
+            evaluate,
+            token_provider=token_provider,
+            delay=latency_model.next_interval(action, module_id, 0),
+        )
+    except httpx.HTTPError as e:
         print(f"Error submitting {action} validation request: {e}")
     except KeyError as ke:
         print(f"KeyError: {ke}")
@@ -1,13 +1,20 @@
-import requests
+import asyncio
+import httpx
+from typing import Callable
+from .du_client import get_du_client
+from .rate_limiter import get_rate_limiter
 from .async_request_handler import submit_async_request
+from .result_cache import get_result_cache, prompt_hash
+from .single_flight import get_single_flight
 from database.db_utils import update_document_stage, insert_classification_results
 
 
 class Classify:
-    def __init__(self, base_url, project_id, bearer_token):
+    def __init__(self, base_url, project_id, token_provider):
         self.base_url = base_url
         self.project_id = project_id
-        self.bearer_token = bearer_token
+        # Resolves the bearer token per request so it is never stale
+        self.token_provider = token_provider
 
     def _parse_classification_results(
         self,
@@ -48,16 +55,13 @@ class Classify:
             print(f"Error parsing JSON response: {ve}")
             return None
 
-    def classify_document(
-        self,
-        document_path: str,
-        document_id: str,
-        classifier: str,
-        classification_prompts: dict,
-        validate_classification: bool = False,
-    ) -> dict | None:
+    async def start_classification(
+        self, document_id: str, classifier: str, classification_prompts: dict
+    ) -> str | None:
+        """Submit a classification request and return its operation ID."""
         # Update the cache to indicate the classification process has started
-        update_document_stage(
+        await asyncio.to_thread(
+            update_document_stage,
             action="classification",
             document_id=document_id,
             operation_id=None,
@@ -66,55 +70,171 @@ class Classify:
         # Define the API endpoint for document classification
         api_url = f"{self.base_url}/du_/api/framework/projects/{self.project_id}/classifiers/{classifier}/classification/start?api-version=1.1"
 
-        # Define the headers with the Bearer token and content type
+        # Define the headers with the bearer token and content type
         headers = {
-            "Authorization": f"Bearer {self.bearer_token}",
+            **await self.token_provider.authorization_header(),
             "accept": "text/plain",
             "Content-Type": "application/json",
         }
 
         data = {"documentId": f"{document_id}", **(classification_prompts or {})}
 
+        response = await get_du_client().post(
+            api_url, json=data, headers=headers, family="classification"
+        )
+        response.raise_for_status()  # Raise an exception for HTTP errors
+
+        if response.status_code == 202:
+            print("Document submitted for classification!")
+            response_data = response.json()
+            # Extract and return operationId
+            operation_id = response_data.get("operationId")
+            if operation_id:
+                return operation_id
+
+        print(f"Error: {response.status_code} - {response.text}")
+        return None
+
+    async def _fetch_classification(
+        self,
+        document_id: str,
+        classifier: str,
+        classification_prompts: dict,
+        operation_id: str | None,
+        on_operation: Callable[[str], None] | None,
+        content_hash: str | None,
+    ) -> tuple[dict | None, str | None]:
+        """Return (classification results, operation ID) from the cache or DU."""
+        result_cache = get_result_cache()
+        if operation_id is None:
+            cached = await asyncio.to_thread(
+                result_cache.get,
+                "classification",
+                content_hash,
+                classifier,
+                classification_prompts,
+            )
+            if cached:
+                print("Using cached classification results")
+                # Move the document on as a finished operation would; there
+                # is no duration to record
+                await asyncio.to_thread(
+                    update_document_stage,
+                    action="classification",
+                    document_id=document_id,
+                    new_stage="classification",
+                    operation_id=cached[1],
+                    classifier_id=classifier,
+                )
+                return cached
+
+        # Hold one of the classifier's in-flight slots until it finishes
+        async with get_rate_limiter().module_slot(classifier):
+            if operation_id is None:
+                operation_id = await self.start_classification(
+                    document_id, classifier, classification_prompts
+                )
+                if not operation_id:
+                    return None, None
+                if on_operation:
+                    on_operation(operation_id)
+
+            # Wait until classification request is completed
+            classification_results = await submit_async_request(
+                action="classification",
+                base_url=self.base_url,
+                project_id=self.project_id,
+                module_id=classifier,
+                operation_id=operation_id,
+                document_id=document_id,
+                token_provider=self.token_provider,
+            )
+        await asyncio.to_thread(
+            result_cache.put,
+            "classification",
+            content_hash,
+            classifier,
+            classification_results,
+            classification_prompts,
+            operation_id,
+        )
+        return classification_results, operation_id
+
+    async def classify_document(
+        self,
+        document_path: str,
+        document_id: str,
+        classifier: str,
+        classification_prompts: dict,
+        validate_classification: bool = False,
+        operation_id: str | None = None,
+        on_operation: Callable[[str], None] | None = None,
+        content_hash: str | None = None,
+        split_documents: bool = False,
+    ) -> dict | str | list[dict] | None:
+        """Classify a document.
+
+        Returns the DocumentTypeId of the first classified sub-document, or
+        with ``split_documents`` a list with the type and pages of each one.
+
+        Passing ``operation_id`` reattaches to a classification that is
+        already running instead of submitting a new one. ``on_operation`` is
+        called with the operation ID of a newly submitted request. With a
+        ``content_hash``, results are served from and stored in the result
+        cache, and concurrent requests for the same content share one
+        classification.
+        """
         try:
-            response = requests.post(api_url, json=data, headers=headers, timeout=60)
-            response.raise_for_status()  # Raise an exception for HTTP errors
-
-            if response.status_code == 202:
-                print("Document submitted for classification!")
-                response_data = response.json()
-                # Extract and return operationId
-                operation_id = response_data.get("operationId")
-
-                # Wait until classification request is completed
-                if operation_id:
-                    classification_results = submit_async_request(
-                        action="classification",
-                        base_url=self.base_url,
-                        project_id=self.project_id,
-                        module_id=classifier,
-                        operation_id=operation_id,
-                        document_id=document_id,
-                        bearer_token=self.bearer_token,
-                    )
-
-                    if validate_classification:
-                        return classification_results
-
-                    self._parse_classification_results(
-                        classification_results, document_path, operation_id
-                    )
-
-                    document_type_id = classification_results["classificationResults"][
-                        0
-                    ]["DocumentTypeId"]
-                    print(f"Classification: {document_type_id}\n")
-
-                    return document_type_id
-
-            print(f"Error: {response.status_code} - {response.text}")
-            return None
 
-        except requests.exceptions.RequestException as e:
+            def fetch():
+                return self._fetch_classification(
+                    document_id,
+                    classifier,
+                    classification_prompts,
+                    operation_id,
+                    on_operation,
+                    content_hash,
+                )
+
+            if operation_id is None and content_hash:
+                key = (
+                    "classification",
+                    content_hash,
+                    classifier,
+                    prompt_hash(classification_prompts),
+                )
+                classification_results, operation_id = await get_single_flight().do(
+                    key, fetch
+                )
+            else:
+                classification_results, operation_id = await fetch()
+            if classification_results is None:
+                return None
+
+            if validate_classification:
+                return classification_results
+
+            self._parse_classification_results(
+                classification_results, document_path, operation_id
+            )
+            if split_documents:
+                return [
+                    {
+                        "document_type_id": result["DocumentTypeId"],
+                        "start_page": result["DocumentBounds"]["StartPage"],
+                        "page_count": result["DocumentBounds"]["PageCount"],
+                    }
+                    for result in classification_results["classificationResults"]
+                ]
+
+            document_type_id = classification_results["classificationResults"][0][
+                "DocumentTypeId"
+            ]
+            print(f"Classification: {document_type_id}\n")
+
+            return document_type_id
+
+        except httpx.HTTPError as e:
             print(f"Error submitting classification request: {e}")
             # Handle network-related errors
         except Exception as ex:
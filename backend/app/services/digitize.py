@@ -1,9 +1,20 @@
 import os
+import httpx
+import asyncio
 import logging
-import requests
 import mimetypes
+from typing import Callable
+from .du_client import get_du_client
 from .async_request_handler import submit_async_request
-from database.db_utils import get_document_id_from_cache, update_cache
+from .rate_limiter import get_rate_limiter
+from .single_flight import get_single_flight
+from database.db_utils import (
+    get_cached_digitization,
+    save_cached_digitization,
+    update_cache,
+)
+from utils.file_hash import sha256_file
+from utils.multipart import MultipartFile
 
 # Configure logging
 logging.basicConfig(
@@ -12,35 +23,141 @@ logging.basicConfig(
 
 
 class Digitize:
-    def __init__(self, base_url, project_id, bearer_token):
+    def __init__(self, base_url, project_id, token_provider):
         self.base_url = base_url
         self.project_id = project_id
-        self.bearer_token = bearer_token
+        # Resolves the bearer token per request so it is never stale
+        self.token_provider = token_provider
         self.action = "digitization"
 
-    def _log_error(self, filename, action, error_code, error_message):
+    async def _log_error(self, filename, action, error_code, error_message):
         """Log an error and update the database."""
         logging.error(
             f"{action.capitalize()} failed for {filename}. Code: {error_code}, Message: {error_message}"
         )
-        update_cache(filename, None, f"{action}_failed", error_code, error_message)
+        await asyncio.to_thread(
+            update_cache, filename, None, f"{action}_failed", error_code, error_message
+        )
+
+    async def start_digitization(self, document_path: str) -> str | None:
+        """Upload a document for digitization and return its documentId."""
+        filename = os.path.basename(document_path)
+        api_url = f"{self.base_url}/du_/api/framework/projects/{self.project_id}/digitization/start?api-version=1"
+        headers = {
+            **await self.token_provider.authorization_header(),
+            "accept": "text/plain",
+        }
 
-    def _prepare_file(self, document_path: str):
-        """Prepare the file for upload."""
         mime_type, _ = mimetypes.guess_type(document_path)
-        mime_type = mime_type or "multipart/form-data"
-        return {
-            "File": (
-                os.path.basename(document_path),
-                open(document_path, "rb"),
-                mime_type,
+        body = MultipartFile(
+            document_path, "File", filename, mime_type or "application/octet-stream"
+        )
+        # Stream the file from disk; the byte budget bounds concurrent uploads
+        async with get_rate_limiter().upload_bytes(body.size):
+            response = await get_du_client().post(
+                api_url,
+                content=body,
+                headers={**headers, **body.headers},
+                family="digitization",
             )
-        }
+        response.raise_for_status()
+
+        if response.status_code == 202:
+            response_data = response.json()
+            document_id = response_data.get("documentId")
+            if not document_id:
+                raise ValueError("Missing documentId in the response.")
+
+            # Update cache with the retrieved document_id
+            await asyncio.to_thread(
+                update_cache,
+                filename=filename,
+                document_id=document_id,
+                stage="digitize-pending",
+                project_id=self.project_id,
+            )
+            return document_id
+
+        await self._log_error(
+            filename, self.action, str(response.status_code), response.text
+        )
+        return None
+
+    async def digitize(
+        self,
+        document_path: str,
+        operation_id: str | None = None,
+        on_operation: Callable[[str], None] | None = None,
+        content_hash: str | None = None,
+    ) -> str | None:
+        """Digitize a document and handle caching.
+
+        Results are cached by the SHA-256 of the file contents and the
+        project, so a re-sent file is not uploaded again whatever its name;
+        ``content_hash`` skips hashing when the caller already has it.
+        Concurrent requests for the same content share one upload, and each
+        records the resulting documentId on its own file's row.
+        Passing ``operation_id`` (the documentId returned by digitization/start)
+        reattaches to a digitization that is already running. ``on_operation``
+        is called with the documentId of a newly started digitization.
+        """
+        filename = os.path.basename(document_path)
+
+        # Whether this call runs the digitization rather than joining one
+        led = operation_id is not None
+
+        def digitize_content():
+            nonlocal led
+            led = True
+            return self._digitize_content(document_path, content_hash, on_operation)
+
+        try:
+            if content_hash is None:
+                content_hash = await asyncio.to_thread(sha256_file, document_path)
+            if operation_id is not None:
+                document_id = await self._wait_for_digitization(
+                    operation_id, filename, content_hash
+                )
+            else:
+                document_id = await get_single_flight().do(
+                    ("digitization", self.project_id, content_hash),
+                    digitize_content,
+                )
+            # The shared digitization only wrote the row of the file that
+            # started it; every caller records the result for its own file
+            if document_id:
+                await asyncio.to_thread(
+                    update_cache,
+                    filename=filename,
+                    document_id=document_id,
+                    stage="digitization",
+                    project_id=self.project_id,
+                )
+            elif not led:
+                await self._log_error(
+                    filename,
+                    self.action,
+                    "SharedDigitizationFailed",
+                    "Digitization of a file with the same content failed",
+                )
+            return document_id
+        except httpx.HTTPError as e:
+            await self._log_error(filename, self.action, "NetworkError", str(e))
+        except Exception as ex:
+            await self._log_error(filename, self.action, "UnexpectedError", str(ex))
+        return None
 
-    def digitize(self, document_path: str) -> str | None:
-        """Digitize a document and handle caching."""
+    async def _digitize_content(
+        self,
+        document_path: str,
+        content_hash: str,
+        on_operation: Callable[[str], None] | None,
+    ) -> str | None:
+        """Return the documentId for a file's content, uploading it if needed."""
         filename = os.path.basename(document_path)
-        cached_document_id = get_document_id_from_cache(filename)
+        cached_document_id = await asyncio.to_thread(
+            get_cached_digitization, content_hash, self.project_id or ""
+        )
         if cached_document_id:
             logging.info(
                 f"Using cached document ID: {cached_document_id} for {filename}"
@@ -48,58 +165,43 @@ class Digitize:
             return cached_document_id
 
         # Log the initiation stage with no document_id
-        update_cache(
+        await asyncio.to_thread(
+            update_cache,
             filename=filename,
             document_id=None,
             stage="init",
             project_id=self.project_id,
         )
 
-        api_url = f"{self.base_url}/du_/api/framework/projects/{self.project_id}/digitization/start?api-version=1"
-        headers = {
-            "Authorization": f"Bearer {self.bearer_token}",
-            "accept": "text/plain",
-        }
-
-        try:
-            files = self._prepare_file(document_path)
-            response = requests.post(api_url, files=files, headers=headers, timeout=60)
-            response.raise_for_status()
-
-            if response.status_code == 202:
-                response_data = response.json()
-                document_id = response_data.get("documentId")
-                if not document_id:
-                    raise ValueError("Missing documentId in the response.")
-
-                # Update cache with the retrieved document_id
-                update_cache(
-                    filename=filename,
-                    document_id=document_id,
-                    stage="digitize-pending",
-                    project_id=self.project_id,
-                )
-
-                digitize_results = submit_async_request(
-                    action=self.action,
-                    base_url=self.base_url,
-                    project_id=self.project_id,
-                    module_id="digitization",
-                    operation_id=document_id,
-                    document_id=document_id,
-                    bearer_token=self.bearer_token,
-                )
-
-                if digitize_results:
-                    return digitize_results.get("documentObjectModel", {}).get(
-                        "documentId"
-                    )
+        operation_id = await self.start_digitization(document_path)
+        if not operation_id:
+            return None
+        if on_operation:
+            on_operation(operation_id)
+        return await self._wait_for_digitization(operation_id, filename, content_hash)
 
-            self._log_error(
-                filename, self.action, str(response.status_code), response.text
+    async def _wait_for_digitization(
+        self, operation_id: str, filename: str, content_hash: str
+    ) -> str | None:
+        """Wait for a digitization to finish and cache its documentId."""
+        digitize_results = await submit_async_request(
+            action=self.action,
+            base_url=self.base_url,
+            project_id=self.project_id,
+            module_id="digitization",
+            operation_id=operation_id,
+            document_id=operation_id,
+            token_provider=self.token_provider,
+        )
+        if not digitize_results:
+            return None
+        document_id = digitize_results.get("documentObjectModel", {}).get("documentId")
+        if document_id:
+            await asyncio.to_thread(
+                save_cached_digitization,
+                content_hash,
+                self.project_id or "",
+                document_id,
+                filename,
             )
-        except requests.exceptions.RequestException as e:
-            self._log_error(filename, self.action, "NetworkError", str(e))
-        except Exception as ex:
-            self._log_error(filename, self.action, "UnexpectedError", str(ex))
-        return None
+        return document_id
@@ -1,10 +1,36 @@
+import os
+import uuid
+import asyncio
 import logging
 from concurrent.futures import ThreadPoolExecutor
-from typing import Optional, Tuple
+from typing import Callable, Optional, Tuple
 from utils.write_results import WriteResults
+from utils.file_hash import sha256_file
 from config.project_setup import load_prompts, initialize_environment
+from config.project_config import (
+    DIGITIZATION_CONCURRENCY,
+    CLASSIFICATION_CONCURRENCY,
+    EXTRACTION_CONCURRENCY,
+    VALIDATION_CONCURRENCY,
+    CACHE_DIR,
+    JOB_LEASE_SECONDS,
+)
 from api.discovery_routes import SettingsManager
 from models.settings_model import Settings
+from database.db_utils import (
+    save_job,
+    update_job_stage,
+    update_job_state,
+    update_job_operation,
+    finish_job,
+    claim_resumable_jobs,
+    claim_orphaned_documents,
+    renew_job_leases,
+)
+from .pipeline import DocumentPipeline, PipelineJob
+from .resilience import CircuitBreaker, get_resilience
+from .result_cache import get_result_cache
+from .speculation import Speculation, get_speculation_tracker
 
 logging.basicConfig(level=logging.INFO)
 
@@ -17,38 +43,623 @@ class DocumentProcessor:
         self.classify_client = classify_client
         self.extract_client = extract_client
         self.validate_client = validate_client
-        self.executor = ThreadPoolExecutor(max_workers=20)
         self.documents_status = {}
+        self.pipeline = DocumentPipeline(
+            [
+                ("digitization", self.digitize_stage, DIGITIZATION_CONCURRENCY),
+                ("classification", self.classify_stage, CLASSIFICATION_CONCURRENCY),
+                ("extraction", self.extraction_stage, EXTRACTION_CONCURRENCY),
+                ("validation", self.validation_stage, VALIDATION_CONCURRENCY),
+            ],
+            on_failure=self._on_stage_failure,
+        )
+        # Leases this process's jobs so no other process resumes them
+        self.lease_owner = uuid.uuid4().hex
+        self._lease_keeper: Optional[asyncio.Task] = None
+        # Job rows are written off the event loop on one thread, so writes
+        # for a job land in the order they were made
+        self._job_writer = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="JobWriter"
+        )
+        # Extractions in flight, including speculative ones started during
+        # classification, are limited to EXTRACTION_CONCURRENCY
+        self.extraction_slots = asyncio.Semaphore(EXTRACTION_CONCURRENCY)
+        # Jobs whose validation is submitted and waiting on a person
+        self.pending_validations: set[asyncio.Task] = set()
+
+    async def submit(
+        self,
+        document_id: str,
+        document_path: str,
+        config: Settings,
+        content_hash: Optional[str] = None,
+    ) -> None:
+        """Persist a document as a job and queue it at the start of the pipeline.
+
+        ``content_hash`` is the hash recorded at upload; without it the file
+        is hashed when digitization starts.
+        """
+        job = PipelineJob(document_id, document_path, config, content_hash)
+        await self._write_job(
+            save_job,
+            document_id,
+            os.path.basename(document_path),
+            document_path,
+            self.pipeline.first_stage,
+            job.to_state(),
+            self.lease_owner,
+            JOB_LEASE_SECONDS,
+        )
+        self.documents_status[document_id] = "Queued"
+        self.pipeline.submit(job)
+        self._ensure_lease_keeper()
+
+    def resume_jobs(self, jobs: list[tuple]) -> None:
+        """Requeue persisted jobs at the stage they were in.
+
+        A job whose stage had already started a DU operation reattaches to
+        that operation instead of submitting it again.
+        """
+        for document_id, document_path, stage, operation_id, state in jobs:
+            job = PipelineJob.from_state(
+                document_id, document_path, state, operation_id
+            )
+            logging.info(
+                f"Resuming {document_path} at {stage}"
+                + (f" (operation {operation_id})" if operation_id else "")
+            )
+            self.documents_status[document_id] = "Queued"
+            self.pipeline.submit(job, stage)
+
+    async def resume(self) -> int:
+        """Take over the work of processes that stopped; returns how many jobs.
+
+        Leases the jobs whose lease expired and requeues them, then queues
+        the documents such a process claimed but never saved a job for.
+        Keeps doing so, and renewing this process's leases, while it runs.
+        """
+        _, jobs = await asyncio.to_thread(
+            claim_resumable_jobs, self.lease_owner, JOB_LEASE_SECONDS
+        )
+        if jobs:
+            self.resume_jobs(jobs)
+        _, documents = await asyncio.to_thread(
+            claim_orphaned_documents, JOB_LEASE_SECONDS
+        )
+        if documents:
+            config = SettingsManager.get_settings()
+            for filename, content_hash in documents:
+                logging.info(f"Requeuing {filename}, claimed but never queued")
+                await self.submit(
+                    filename.rsplit(".", 1)[0],
+                    os.path.join(f"{CACHE_DIR}/documents/", filename),
+                    config,
+                    content_hash,
+                )
+        self._ensure_lease_keeper()
+        return len(jobs) + len(documents)
+
+    def _ensure_lease_keeper(self) -> None:
+        if self._lease_keeper is None or self._lease_keeper.done():
+            self._lease_keeper = asyncio.create_task(
+                self._keep_leases(), name="JobLeaseKeeper"
+            )
+
+    async def _keep_leases(self) -> None:
+        """Renew this process's leases and take over jobs whose lease expired."""
+        while True:
+            await asyncio.sleep(JOB_LEASE_SECONDS / 3)
+            try:
+                await asyncio.to_thread(
+                    renew_job_leases, self.lease_owner, JOB_LEASE_SECONDS
+                )
+                await self.resume()
+            except Exception as e:
+                logging.error(f"Failed to renew job leases: {e}")
+
+    async def stop(self) -> None:
+        """Stop renewing leases and cancel the pipeline workers.
+
+        Unfinished jobs are resumed by another process once their lease
+        expires, or by this app when it next starts.
+        """
+        if self._lease_keeper is not None:
+            self._lease_keeper.cancel()
+            try:
+                await self._lease_keeper
+            except asyncio.CancelledError:
+                pass
+            self._lease_keeper = None
+        for task in self.pending_validations:
+            task.cancel()
+        await asyncio.gather(*self.pending_validations, return_exceptions=True)
+        await self.pipeline.stop()
+
+    def _write_job(self, write: Callable, *args) -> asyncio.Future:
+        """Queue a write to the jobs table behind the ones made before it."""
+        return asyncio.get_running_loop().run_in_executor(
+            self._job_writer, write, *args
+        )
+
+    async def _enter_stage(self, job: PipelineJob, stage: str, status: str) -> None:
+        self.documents_status[job.document_id] = status
+        await self._write_job(
+            update_job_stage, job.document_id, stage, job.to_state(), job.operation_id
+        )
+
+    def _operation_recorder(self, job: PipelineJob):
+        # Called synchronously by the clients; the write is queued, not awaited
+        return lambda operation_id: self._write_job(
+            update_job_operation, job.document_id, operation_id
+        )
+
+    async def _on_stage_failure(
+        self, job: PipelineJob, stage: str, error: Exception
+    ) -> None:
+        self.documents_status[job.document_id] = "Failed"
+        await self._write_job(finish_job, job.document_id, "failed", str(error))
+
+    def _park(self, job: PipelineJob, stage: str, breaker: CircuitBreaker) -> None:
+        """Hold a job aside until the breaker accepts work, then requeue it."""
+        logging.info(f"Parking {job.document_path} while {breaker.name} is unavailable")
+        self.documents_status[job.document_id] = "Waiting"
+        breaker.park(lambda: self.pipeline.submit(job, stage))
+        return None
+
+    async def _complete(self, job: PipelineJob) -> None:
+        self.documents_status[job.document_id] = "Completed"
+        await self._write_job(finish_job, job.document_id, "completed")
+        return None
+
+    async def digitize_stage(self, job: PipelineJob) -> Optional[str]:
+        await self._enter_stage(job, "digitization", "Digitizing")
+        if job.content_hash is None:
+            # Keys the digitization and result caches for every later stage
+            job.content_hash = await asyncio.to_thread(sha256_file, job.document_path)
+        job.du_document_id = await self.digitize_client.digitize(
+            job.document_path,
+            operation_id=job.take_operation(),
+            on_operation=self._operation_recorder(job),
+            content_hash=job.content_hash,
+        )
+        if not job.du_document_id:
+            raise RuntimeError("Digitization did not return a document ID")
+
+        if job.config.perform_classification and not self._skip_classification(
+            job.config
+        ):
+            return "classification"
+        if job.config.perform_extraction:
+            return "extraction"
+        return await self._complete(job)
+
+    @staticmethod
+    def _skip_classification(config: Settings) -> bool:
+        """In speculative mode, skip classifying for a project with one extractor.
+
+        Every document goes to that extractor whatever its type, unless the
+        classification is to be validated or split into sub-documents.
+        """
+        return (
+            config.speculative_extraction
+            and config.perform_extraction
+            and not config.validate_classification
+            and not config.fan_out_extraction
+            and config.project.extractor_ids is not None
+            and len(config.project.extractor_ids) == 1
+        )
+
+    def _start_speculation(self, job: PipelineJob) -> Optional[Speculation]:
+        """Start extracting with the predicted extractor while classification runs.
+
+        The prediction is always returned so its hit rate is tracked, but the
+        extraction is only launched while that rate pays off, an extraction
+        slot is free and the extractor's breaker lets work through.
+        """
+        tracker = get_speculation_tracker()
+        extractor_id, extractor_name = self.get_extractor(
+            job.config, tracker.predict_document_type(job.config.project.id)
+        )
+        if not (extractor_id and extractor_name):
+            return None
+        speculation = Speculation(extractor_id, extractor_name)
+        if (
+            tracker.should_speculate(extractor_id)
+            and not self.extraction_slots.locked()
+            # Last: in a half-open breaker this takes the probe
+            and get_resilience().breaker(extractor_id).allow()
+        ):
+            speculation.prompts = self._extraction_prompts(job.config, extractor_name)
+            speculation.task = asyncio.create_task(self._speculate(job, speculation))
+            tracker.launched += 1
+        return speculation
 
-    def process_document(self, document_id: str, document_path: str, config: Settings):
-        """Process a single document."""
+    async def _speculate(
+        self, job: PipelineJob, speculation: Speculation
+    ) -> Optional[dict]:
+        def on_operation(operation_id: str) -> None:
+            job.speculative_operation = {
+                "extractor_id": speculation.extractor_id,
+                "operation_id": operation_id,
+            }
+            self._write_job(update_job_state, job.document_id, job.to_state())
+
+        async with self.extraction_slots:
+            return await self.extract_client.extract_document(
+                speculation.extractor_id,
+                job.du_document_id,
+                speculation.prompts,
+                on_operation=on_operation,
+                content_hash=job.content_hash,
+            )
+
+    def _resolve_speculation(
+        self, job: PipelineJob, speculation: Optional[Speculation]
+    ) -> None:
+        """Keep a speculative extraction classification agreed with, else cancel it."""
+        if speculation is None:
+            return
+        tracker = get_speculation_tracker()
+        tracker.record_document_type(job.config.project.id, job.document_type_id)
+        extractor_id, _ = self.get_extractor(job.config, job.document_type_id)
+        hit = extractor_id == speculation.extractor_id
+        tracker.record(speculation.extractor_id, hit)
+        if speculation.task is None:
+            return
+        if hit and job.config.perform_extraction:
+            job.speculation = speculation
+        else:
+            job.speculative_operation = None
+            # Results of a wrong guess are never written. Cancelling stops
+            # polling DU and frees the extractor's slot, unless the
+            # extraction is shared with another document still waiting for it
+            speculation.task.cancel()
+            tracker.discarded += 1
+
+    async def classify_stage(self, job: PipelineJob) -> Optional[str]:
+        await self._enter_stage(job, "classification", "Classifying")
+        speculation = (
+            self._start_speculation(job)
+            if job.config.speculative_extraction
+            and job.config.perform_extraction
+            and not job.config.fan_out_extraction
+            and job.operation_id is None
+            and job.speculative_operation is None
+            else None
+        )
         try:
-            self.documents_status[document_id] = "Digitizing"
-            doc_id = self.digitize_client.digitize(document_path)
-
-            document_type_id = None
-            if config.perform_classification:
-                self.documents_status[document_id] = "Classifying"
-                document_type_id = self.classify_document(doc_id, document_path, config)
-
-            if config.perform_extraction:
-                self.documents_status[document_id] = "Extracting"
-                extractor_id, extractor_name = self.get_extractor(
-                    config, document_type_id
+            result = await self.classify_document(
+                job.du_document_id,
+                job.document_path,
+                job.config,
+                operation_id=job.take_operation(),
+                on_operation=self._operation_recorder(job),
+                content_hash=job.content_hash,
+                split_documents=job.config.fan_out_extraction,
+            )
+        except BaseException:
+            # Same as a wrong guess: stop the extraction nobody will use
+            if speculation is not None and speculation.task is not None:
+                speculation.task.cancel()
+            raise
+        if isinstance(result, list):
+            job.splits = result
+            job.document_type_id = result[0]["document_type_id"] if result else None
+        else:
+            job.document_type_id = result
+        self._resolve_speculation(job, speculation)
+
+        if job.config.perform_extraction:
+            return "extraction"
+        return await self._complete(job)
+
+    async def extraction_stage(self, job: PipelineJob) -> Optional[str]:
+        await self._enter_stage(job, "extraction", "Extracting")
+        if job.splits and len(job.splits) > 1:
+            return await self._extract_splits(job)
+
+        job.extractor_id, job.extractor_name = self.get_extractor(
+            job.config, job.document_type_id
+        )
+        if not (job.extractor_id and job.extractor_name):
+            return await self._complete(job)
+
+        speculation, job.speculation = job.speculation, None
+        speculative_operation, job.speculative_operation = (
+            job.speculative_operation,
+            None,
+        )
+        if speculation is not None:
+            extraction_results = await speculation.task
+            if extraction_results is not None:
+                get_speculation_tracker().used += 1
+                if speculative_operation:
+                    job.extraction_operation_id = speculative_operation["operation_id"]
+                job.extraction_results = extraction_results
+                job.prompts = speculation.prompts
+                await self.write_extraction_results(
+                    extraction_results, job.document_path
                 )
-                if extractor_id and extractor_name:
-                    self.perform_extraction(
-                        doc_id, document_path, extractor_id, extractor_name, config
-                    )
+                if job.config.validate_extraction:
+                    return "validation"
+                return await self._complete(job)
 
-            self.documents_status[document_id] = "Completed"
-        except Exception as e:
-            logging.error(f"Error processing {document_path}: {e}", exc_info=True)
-            self.documents_status[document_id] = "Failed"
+        elif (
+            speculative_operation
+            and job.operation_id is None
+            and speculative_operation["extractor_id"] == job.extractor_id
+        ):
+            # Resumed after a restart: reattach to the speculative extraction
+            job.operation_id = speculative_operation["operation_id"]
+
+        breaker = get_resilience().breaker(job.extractor_id)
+        # A job already attached to a running operation only polls for it
+        if job.operation_id is None and not breaker.allow():
+            return self._park(job, "extraction", breaker)
+
+        record_operation = self._operation_recorder(job)
+
+        def on_operation(operation_id: str) -> None:
+            job.extraction_operation_id = operation_id
+            record_operation(operation_id)
+
+        operation_id = job.take_operation()
+        if operation_id:
+            job.extraction_operation_id = operation_id
+        job.extraction_results, job.prompts = await self.perform_extraction(
+            job.du_document_id,
+            job.document_path,
+            job.extractor_id,
+            job.extractor_name,
+            job.config,
+            operation_id=operation_id,
+            on_operation=on_operation,
+            content_hash=job.content_hash,
+        )
+        if job.extraction_results is None:
+            if breaker.is_open():
+                # The extractor is failing: retry once its breaker lets work through
+                return self._park(job, "extraction", breaker)
+            raise RuntimeError(f"Extraction with {job.extractor_name} failed")
+
+        if job.config.validate_extraction:
+            return "validation"
+        return await self._complete(job)
+
+    async def _extract_splits(self, job: PipelineJob) -> Optional[str]:
+        """Extract every classified sub-document concurrently.
+
+        Each split is sent to the extractor for its document type, limited to
+        its pages, and its rows are merged into the extraction table under
+        its page range. The stage takes as long as the slowest split.
+        Operations of split extractions are not reattached after a restart;
+        finished splits are served from the result cache instead.
+        """
+        job.take_operation()
+        splits = []
+        for split in job.splits:
+            extractor_id, extractor_name = self.get_extractor(
+                job.config, split["document_type_id"]
+            )
+            if extractor_id and extractor_name:
+                splits.append((split, extractor_id, extractor_name))
+        if not splits:
+            return await self._complete(job)
+
+        breakers = {
+            extractor_id: get_resilience().breaker(extractor_id)
+            for _, extractor_id, _ in splits
+        }
+        # Check every breaker before taking any half-open probe, so a probe
+        # is never taken for a job that then parks on another breaker
+        for breaker in breakers.values():
+            if not breaker.ready():
+                return self._park(job, "extraction", breaker)
+        for breaker in breakers.values():
+            breaker.allow()
 
-    def classify_document(
-        self, document_id: str, document_path: str, config: Settings
+        results = await asyncio.gather(
+            *(
+                self.perform_extraction(
+                    job.du_document_id,
+                    job.document_path,
+                    extractor_id,
+                    extractor_name,
+                    job.config,
+                    content_hash=job.content_hash,
+                    page_range={
+                        "StartPage": split["start_page"],
+                        "PageCount": split["page_count"],
+                    },
+                )
+                for split, extractor_id, _ in splits
+            )
+        )
+        for (split, extractor_id, extractor_name), (extraction_results, _) in zip(
+            splits, results
+        ):
+            if extraction_results is None:
+                if breakers[extractor_id].is_open():
+                    return self._park(job, "extraction", breakers[extractor_id])
+                raise RuntimeError(
+                    f"Extraction with {extractor_name} failed for pages "
+                    f"{split['start_page']}+{split['page_count']}"
+                )
+
+        job.split_extractions = [
+            {
+                "pages": f"{split['start_page']}+{split['page_count']}",
+                "extractor_id": extractor_id,
+                "extraction_results": extraction_results,
+                "prompts": prompts,
+            }
+            for (split, extractor_id, _), (extraction_results, prompts) in zip(
+                splits, results
+            )
+        ]
+        if job.config.validate_extraction:
+            return "validation"
+        return await self._complete(job)
+
+    async def validation_stage(self, job: PipelineJob) -> Optional[str]:
+        """Submit the extraction for human validation and release the worker.
+
+        Validation waits on a person in Action Center, so the stage only
+        submits it. The shared poller waits for the result and
+        ``_finish_validation`` writes it and completes the job.
+        """
+        await self._enter_stage(job, "validation", "Validating")
+        if job.splits and len(job.splits) > 1:
+            if job.split_extractions is None:
+                # Resumed after a restart: collect the split extractions again
+                return "extraction"
+            if job.split_validation_operations is None:
+                job.split_validation_operations = {}
+            operation_ids = await asyncio.gather(
+                *(
+                    self._submit_split_validation(job, split)
+                    for split in job.split_extractions
+                )
+            )
+            validations = [
+                (split["extractor_id"], split["extraction_results"], operation_id)
+                for split, operation_id in zip(job.split_extractions, operation_ids)
+            ]
+            return await self._await_validations(job, validations)
+
+        if job.extraction_results is None:
+            # Resumed after a restart: reload the finished extraction result
+            # rather than running a new extraction
+            job.extraction_results = await self._reload_extraction(job)
+            if job.extraction_results is None:
+                logging.warning(
+                    f"No extraction result to validate for {job.document_path}; "
+                    "extracting again"
+                )
+                job.take_operation()
+                return "extraction"
+        operation_id = job.take_operation() or await self.submit_validation(
+            job,
+            job.extractor_id,
+            job.extraction_results,
+            job.prompts,
+            on_operation=self._operation_recorder(job),
+        )
+        return await self._await_validations(
+            job, [(job.extractor_id, job.extraction_results, operation_id)]
+        )
+
+    async def _submit_split_validation(
+        self, job: PipelineJob, split: dict
     ) -> Optional[str]:
+        """Submit a split's validation, or reattach to the one submitted before."""
+        operation_id = job.split_validation_operations.get(split["pages"])
+        if operation_id:
+            return operation_id
+
+        def on_operation(operation_id: str) -> None:
+            job.split_validation_operations[split["pages"]] = operation_id
+            self._write_job(update_job_state, job.document_id, job.to_state())
+
+        return await self.submit_validation(
+            job,
+            split["extractor_id"],
+            split["extraction_results"],
+            split["prompts"],
+            on_operation=on_operation,
+        )
+
+    async def _await_validations(
+        self, job: PipelineJob, validations: list[tuple]
+    ) -> None:
+        """Finish the job once its (extractor_id, extraction_results,
+        operation_id) validations complete, without holding a stage worker.
+        """
+        if job.config.validate_extraction_later:
+            # Deferred: the validations are submitted, store the extractions
+            await self._write_validations(job, validations, [None] * len(validations))
+            return await self._complete(job)
+
+        self.documents_status[job.document_id] = "Awaiting validation"
+        task = asyncio.create_task(
+            self._finish_validation(job, validations),
+            name=f"validation-{job.document_id}",
+        )
+        self.pending_validations.add(task)
+        task.add_done_callback(self.pending_validations.discard)
+        return None
+
+    async def _finish_validation(
+        self, job: PipelineJob, validations: list[tuple]
+    ) -> None:
+        try:
+            validated = await asyncio.gather(
+                *(
+                    self.validate_client.wait_for_extraction_validation(
+                        extractor_id, operation_id
+                    )
+                    for extractor_id, _, operation_id in validations
+                    if operation_id
+                )
+            )
+            # Validations that could not be submitted store the extraction alone
+            validated = iter(validated)
+            results = [
+                next(validated) if operation_id else None
+                for _, _, operation_id in validations
+            ]
+            await self._write_validations(job, validations, results)
+            await self._complete(job)
+        except Exception as e:
+            # Cancellation on shutdown is not a failure: the job is resumed
+            # and reattaches to the validation in DU
+            logging.error(
+                f"Validation failed for {job.document_path}: {e}", exc_info=True
+            )
+            await self._on_stage_failure(job, "validation", e)
+
+    async def _write_validations(
+        self, job: PipelineJob, validations: list[tuple], results: list
+    ) -> None:
+        for (_, extraction_results, _), validated_results in zip(validations, results):
+            await self.write_validated_results(
+                validated_results, extraction_results, job.document_path
+            )
+
+    async def _reload_extraction(self, job: PipelineJob) -> Optional[dict]:
+        """Fetch the extraction result of a job resumed at validation.
+
+        Results are not persisted with the job, only what finds them again:
+        the DU operation that produced them, or the result cache key for
+        results served from the cache or a speculative run.
+        """
+        if job.extraction_operation_id:
+            extraction_results = await self.extract_client.extract_document(
+                job.extractor_id,
+                job.du_document_id,
+                operation_id=job.extraction_operation_id,
+            )
+            if extraction_results is not None:
+                return extraction_results
+        cached = await asyncio.to_thread(
+            get_result_cache().get,
+            "extraction",
+            job.content_hash,
+            job.extractor_id,
+            job.prompts,
+        )
+        return cached[0] if cached else None
+
+    async def classify_document(
+        self,
+        document_id: str,
+        document_path: str,
+        config: Settings,
+        operation_id: Optional[str] = None,
+        on_operation: Optional[Callable[[str], None]] = None,
+        content_hash: Optional[str] = None,
+        split_documents: bool = False,
+    ):
         prompts = (
             load_prompts("classification")
             if config.project.classifier_id
@@ -56,7 +667,7 @@ class DocumentProcessor:
             else None
         )
         try:
-            return self.classify_client.classify_document(
+            return await self.classify_client.classify_document(
                 document_path,
                 document_id,
                 config.project.classifier_id.id
@@ -64,6 +675,10 @@ class DocumentProcessor:
                 else None,
                 prompts,
                 config.validate_classification,
+                operation_id=operation_id,
+                on_operation=on_operation,
+                content_hash=content_hash,
+                split_documents=split_documents,
             )
         except Exception as e:
             logging.error(f"Classification failed for {document_id}: {e}")
@@ -81,39 +696,72 @@ class DocumentProcessor:
         )
         return extractor.get("id"), extractor.get("name")
 
-    def perform_extraction(
+    @staticmethod
+    def _extraction_prompts(config: Settings, extractor_name: str) -> Optional[dict]:
+        return (
+            load_prompts(extractor_name)
+            if config.project.id == "00000000-0000-0000-0000-000000000001"
+            else None
+        )
+
+    async def perform_extraction(
         self,
         document_id: str,
         document_path: str,
         extractor_id: str,
         extractor_name: str,
         config: Settings,
+        operation_id: Optional[str] = None,
+        on_operation: Optional[Callable[[str], None]] = None,
+        content_hash: Optional[str] = None,
+        page_range: Optional[dict] = None,
     ):
-        prompts = (
-            load_prompts(extractor_name)
-            if config.project.id == "00000000-0000-0000-0000-000000000001"
-            else None
-        )
-        extraction_results = self.extract_client.extract_document(
-            extractor_id, document_id, prompts
-        )
-        self.write_extraction_results(extraction_results, document_path)
-        if config.validate_extraction:
-            validated_results = self.validate_client.validate_extraction_results(
-                extractor_id, document_id, extraction_results, prompts
-            )
-            self.write_validated_results(
-                validated_results, extraction_results, document_path
+        prompts = self._extraction_prompts(config, extractor_name)
+        async with self.extraction_slots:
+            extraction_results = await self.extract_client.extract_document(
+                extractor_id,
+                document_id,
+                prompts,
+                operation_id=operation_id,
+                on_operation=on_operation,
+                content_hash=content_hash,
+                page_range=page_range,
             )
+        if extraction_results is not None:
+            await self.write_extraction_results(extraction_results, document_path)
+        return extraction_results, prompts
 
-    def write_extraction_results(self, extraction_results, document_path: str):
-        WriteResults(
-            document_path=document_path, extraction_results=extraction_results
-        ).write_results()
+    async def submit_validation(
+        self,
+        job: PipelineJob,
+        extractor_id: str,
+        extraction_results: dict,
+        prompts: Optional[dict],
+        on_operation: Optional[Callable[[str], None]] = None,
+    ) -> Optional[str]:
+        return await self.validate_client.submit_extraction_validation(
+            os.path.basename(job.document_path),
+            extractor_id,
+            job.du_document_id,
+            extraction_results,
+            prompts,
+            on_operation=on_operation,
+        )
 
-    def write_validated_results(
+    async def write_extraction_results(self, extraction_results, document_path: str):
+        # SQLite and CSV writes are blocking, keep them off the event loop
+        await asyncio.to_thread(self._write_results, document_path, extraction_results)
+
+    async def write_validated_results(
         self, validated_results, extraction_results, document_path: str
     ):
+        await asyncio.to_thread(
+            self._write_results, document_path, extraction_results, validated_results
+        )
+
+    @staticmethod
+    def _write_results(document_path, extraction_results, validated_results=None):
+        # The SQLite connection must be opened on the worker thread that uses it
         WriteResults(
             document_path=document_path,
             extraction_results=extraction_results,
@@ -147,3 +795,20 @@ def get_document_processor() -> DocumentProcessor:
     if _document_processor is None:
         initialize_processor_with_settings()
     return _document_processor
+
+
+async def resume_document_processor() -> int:
+    """Requeue jobs left unfinished by a stopped process; returns how many.
+
+    The processor loads settings and creates its clients from disk, so it
+    is built off the event loop. It keeps taking over expired jobs while it
+    runs.
+    """
+    processor = await asyncio.to_thread(get_document_processor)
+    return await processor.resume()
+
+
+async def stop_document_processor() -> None:
+    """Stop the pipeline workers if the processor was ever started."""
+    if _document_processor is not None:
+        await _document_processor.stop()
@@ -0,0 +1,188 @@
+import asyncio
+import logging
+from typing import Optional
+from urllib.parse import urlsplit
+import httpx
+from config.project_config import (
+    DU_MAX_CONNECTIONS,
+    DU_MAX_KEEPALIVE_CONNECTIONS,
+    DU_MAX_CONNECTIONS_PER_HOST,
+    DU_KEEPALIVE_EXPIRY,
+    DU_CONNECT_TIMEOUT,
+    DU_READ_TIMEOUT,
+    DU_WRITE_TIMEOUT,
+    DU_POOL_TIMEOUT,
+    DU_MAX_THROTTLE_RETRIES,
+)
+from .rate_limiter import get_rate_limiter
+from .resilience import backoff_delay, get_resilience
+
+logger = logging.getLogger(__name__)
+
+# Gateway errors DU returns while a service is briefly unavailable
+TRANSIENT_STATUS_CODES = {502, 503, 504}
+
+# Errors raised before the request reached DU, so retrying cannot duplicate it
+CONNECTION_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class DUClient:
+    """Shared asyncio HTTP client for all Document Understanding calls.
+
+    Wraps a single ``httpx.AsyncClient`` so every service reuses the same
+    keep-alive connection pool, and caps the number of concurrent requests
+    sent to any one host.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = DU_MAX_CONNECTIONS,
+        max_keepalive_connections: int = DU_MAX_KEEPALIVE_CONNECTIONS,
+        max_connections_per_host: int = DU_MAX_CONNECTIONS_PER_HOST,
+        keepalive_expiry: float = DU_KEEPALIVE_EXPIRY,
+        connect_timeout: float = DU_CONNECT_TIMEOUT,
+        read_timeout: float = DU_READ_TIMEOUT,
+        write_timeout: float = DU_WRITE_TIMEOUT,
+        pool_timeout: float = DU_POOL_TIMEOUT,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(
+            connect=connect_timeout,
+            read=read_timeout,
+            write=write_timeout,
+            pool=pool_timeout,
+        )
+        self.max_connections_per_host = max_connections_per_host
+        self._host_semaphores: dict[str, asyncio.Semaphore] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Return the pooled client, creating it on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout)
+        return self._client
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_connections_per_host)
+            self._host_semaphores[host] = semaphore
+        return semaphore
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        timeout: Optional[float] = None,
+        family: Optional[str] = None,
+        **kwargs,
+    ) -> httpx.Response:
+        """Send a request through the shared pool.
+
+        ``timeout`` overrides the read timeout for long-running calls such as
+        extraction start; connect and pool timeouts stay as configured.
+        ``family`` names the DU endpoint family whose rate limit applies; a
+        429 pauses that family for its Retry-After and the request is retried;
+        without a family the request itself sleeps for the Retry-After.
+        Transient failures are retried with jittered backoff. Every retry is
+        drawn from the shared retry budget. A streamed ``content`` body must be
+        re-iterable so it can be sent again on retry.
+        """
+        if timeout is not None:
+            kwargs["timeout"] = httpx.Timeout(
+                connect=self.timeout.connect,
+                read=timeout,
+                write=self.timeout.write,
+                pool=self.timeout.pool,
+            )
+        rate_limiter = get_rate_limiter()
+        resilience = get_resilience()
+        throttles = retries = 0
+        while True:
+            await rate_limiter.acquire(family)
+            resilience.budget.record_request()
+            delay = 0.0
+            try:
+                async with self._host_semaphore(url):
+                    response = await self.client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                if not _is_retryable_error(method, e) or not resilience.should_retry(
+                    retries
+                ):
+                    raise
+                delay = backoff_delay(retries)
+                retries += 1
+                logger.warning(
+                    f"{method} {url} failed ({e!r}); retrying in {delay:.1f}s"
+                )
+            else:
+                if response.status_code == 429:
+                    if (
+                        throttles >= DU_MAX_THROTTLE_RETRIES
+                        or not resilience.budget.try_spend()
+                    ):
+                        return response
+                    throttles += 1
+                    delay = rate_limiter.throttle(
+                        family, response.headers.get("Retry-After")
+                    )
+                    if rate_limiter.paces(family):
+                        # The family's bucket is paused, so acquire() does the waiting
+                        delay = 0.0
+                elif (
+                    response.status_code in TRANSIENT_STATUS_CODES
+                    and resilience.should_retry(retries)
+                ):
+                    delay = backoff_delay(retries)
+                    retries += 1
+                    logger.warning(
+                        f"{method} {url} returned {response.status_code}; "
+                        f"retrying in {delay:.1f}s"
+                    )
+                else:
+                    return response
+            if delay:
+                await asyncio.sleep(delay)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self) -> None:
+        """Close the pool and drop per-host state bound to the current loop."""
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+        self._host_semaphores.clear()
+
+
+def _is_retryable_error(method: str, error: httpx.TransportError) -> bool:
+    """Reads can always be retried; other requests only if they were never sent."""
+    return method == "GET" or isinstance(error, CONNECTION_ERRORS)
+
+
+# Singleton instance of DUClient
+_du_client: Optional[DUClient] = None
+
+
+def get_du_client() -> DUClient:
+    """Get the shared DU client, creating it if necessary."""
+    global _du_client
+    if _du_client is None:
+        _du_client = DUClient()
+    return _du_client
+
+
+async def close_du_client() -> None:
+    """Close the shared DU client's connection pool."""
+    if _du_client is not None:
+        await _du_client.aclose()
+        logger.info("DU client connection pool closed")
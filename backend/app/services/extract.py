@@ -1,19 +1,37 @@
-import requests
+import asyncio
+import httpx
+from typing import Callable
 from database.db_utils import update_document_stage
+from .du_client import get_du_client
+from .rate_limiter import get_rate_limiter
+from .resilience import get_resilience
+from .result_cache import get_result_cache, page_scoped_hash, prompt_hash
+from .single_flight import get_single_flight
 from .async_request_handler import submit_async_request
 
 
 class Extract:
-    def __init__(self, base_url, project_id, bearer_token):
+    def __init__(self, base_url, project_id, token_provider):
         self.base_url = base_url
         self.project_id = project_id
-        self.bearer_token = bearer_token
+        # Resolves the bearer token per request so it is never stale
+        self.token_provider = token_provider
 
-    def extract_document(
-        self, extractor_id: str, document_id: str, prompts: dict = None
-    ) -> dict | None:
+    async def start_extraction(
+        self,
+        extractor_id: str,
+        document_id: str,
+        prompts: dict = None,
+        page_range: dict | None = None,
+    ) -> str | None:
+        """Submit an extraction request and return its operation ID.
+
+        ``page_range`` ({"StartPage", "PageCount"}) limits extraction to one
+        classified sub-document.
+        """
         # Update the cache to indicate the extraction process has started
-        update_document_stage(
+        await asyncio.to_thread(
+            update_document_stage,
             action="extraction",
             document_id=document_id,
             operation_id=None,
@@ -22,46 +40,148 @@ class Extract:
         # Define the API endpoint for document extraction
         api_url = f"{self.base_url}/du_/api/framework/projects/{self.project_id}/extractors/{extractor_id}/extraction/start?api-version=1.1"
 
-        # Define the headers with the Bearer token and content type
+        # Define the headers with the bearer token and content type
         headers = {
-            "Authorization": f"Bearer {self.bearer_token}",
+            **await self.token_provider.authorization_header(),
             "accept": "text/plain",
             "Content-Type": "application/json",
         }
 
         data = {"documentId": f"{document_id}", **(prompts or {})}
+        if page_range:
+            data["pageRange"] = page_range
 
-        try:
-            response = requests.post(api_url, json=data, headers=headers, timeout=300)
-            response.raise_for_status()  # Raise an exception for HTTP errors
+        response = await get_du_client().post(
+            api_url, json=data, headers=headers, timeout=300, family="extraction"
+        )
+        response.raise_for_status()  # Raise an exception for HTTP errors
 
-            if response.status_code == 202:
-                print("Document submitted for extraction!\n")
-                response_data = response.json()
-                # Extract and return operationId
-                operation_id = response_data.get("operationId")
+        if response.status_code == 202:
+            print("Document submitted for extraction!\n")
+            response_data = response.json()
+            # Extract and return operationId
+            operation_id = response_data.get("operationId")
+            if operation_id:
+                return operation_id
 
-                # Wait until extraction request is completed
-                if operation_id:
-                    extraction_results = submit_async_request(
-                        action="extraction",
-                        base_url=self.base_url,
-                        project_id=self.project_id,
-                        module_id=extractor_id,
-                        operation_id=operation_id,
-                        document_id=document_id,
-                        bearer_token=self.bearer_token,
+        print(f"Error: {response.status_code} - {response.text}")
+        return None
+
+    async def extract_document(
+        self,
+        extractor_id: str,
+        document_id: str,
+        prompts: dict = None,
+        operation_id: str | None = None,
+        on_operation: Callable[[str], None] | None = None,
+        content_hash: str | None = None,
+        page_range: dict | None = None,
+    ) -> dict | None:
+        """Extract a document, or only the pages in ``page_range``.
+
+        Passing ``operation_id`` reattaches to an extraction that is already
+        running instead of submitting a new one. ``on_operation`` is called
+        with the operation ID of a newly submitted request. A success closes
+        the extractor's circuit breaker; only ``IxpExtractorUnavailableError``
+        responses, seen while polling, count against it, so network errors
+        and bugs cannot park a healthy extractor. With a ``content_hash``,
+        results are served from and stored in the result cache, and
+        concurrent requests for the same content share one extraction.
+        """
+
+        # Each page range of a split document is cached and coalesced separately
+        content_hash = page_scoped_hash(content_hash, page_range)
+
+        def extract():
+            return self._extract(
+                extractor_id,
+                document_id,
+                prompts,
+                operation_id,
+                on_operation,
+                content_hash,
+                page_range,
+            )
+
+        if operation_id is None and content_hash:
+            key = ("extraction", content_hash, extractor_id, prompt_hash(prompts))
+            return await get_single_flight().do(key, extract)
+        return await extract()
+
+    async def _extract(
+        self,
+        extractor_id: str,
+        document_id: str,
+        prompts: dict | None,
+        operation_id: str | None,
+        on_operation: Callable[[str], None] | None,
+        content_hash: str | None,
+        page_range: dict | None,
+    ) -> dict | None:
+        breaker = get_resilience().breaker(extractor_id)
+        result_cache = get_result_cache()
+        try:
+            cached = (
+                await asyncio.to_thread(
+                    result_cache.get, "extraction", content_hash, extractor_id, prompts
+                )
+                if operation_id is None
+                else None
+            )
+            if cached:
+                extraction_results, cached_operation_id = cached
+                print("Using cached extraction results")
+                # Move the document on as a finished operation would; there
+                # is no duration to record
+                await asyncio.to_thread(
+                    update_document_stage,
+                    action="extraction",
+                    document_id=document_id,
+                    new_stage="extraction",
+                    operation_id=cached_operation_id,
+                    extractor_id=extractor_id,
+                )
+                return extraction_results
+
+            # Hold one of the extractor's in-flight slots until it finishes
+            async with get_rate_limiter().module_slot(extractor_id):
+                if operation_id is None:
+                    operation_id = await self.start_extraction(
+                        extractor_id, document_id, prompts, page_range
                     )
-                    if extraction_results:
-                        print("Document Extraction Complete!\n")
-                    return extraction_results
+                    if not operation_id:
+                        return None
+                    if on_operation:
+                        on_operation(operation_id)
 
-            print(f"Error: {response.status_code} - {response.text}")
-            return None
+                # Wait until extraction request is completed
+                extraction_results = await submit_async_request(
+                    action="extraction",
+                    base_url=self.base_url,
+                    project_id=self.project_id,
+                    module_id=extractor_id,
+                    operation_id=operation_id,
+                    document_id=document_id,
+                    token_provider=self.token_provider,
+                )
+            await asyncio.to_thread(
+                result_cache.put,
+                "extraction",
+                content_hash,
+                extractor_id,
+                extraction_results,
+                prompts,
+                operation_id,
+            )
+            if extraction_results:
+                print("Document Extraction Complete!\n")
+                breaker.record_success()
+            return extraction_results
 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"Error submitting extraction request: {e}")
             # Handle network-related errors
         except Exception as ex:
             print(f"An error occurred during extraction: {ex}")
             # Handle any other unexpected errors
+        return None
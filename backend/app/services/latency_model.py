@@ -0,0 +1,124 @@
+from collections import deque
+from typing import Optional
+from config.project_config import (
+    POLL_MIN_INTERVAL,
+    POLL_MAX_INTERVAL,
+    VALIDATION_POLL_MAX_INTERVAL,
+    POLL_HISTORY_WINDOW,
+)
+from database.db_utils import get_stage_durations
+
+# Intervals used until a module has enough history to model
+DEFAULT_INTERVALS = {"validation": 5.0}
+DEFAULT_INTERVAL = 1.0
+MIN_SAMPLES = 5
+
+
+class LatencyModel:
+    """Completion-time model per (action, module_id) that picks poll intervals.
+
+    Seeded from the ``documents.*_duration`` columns and updated as operations
+    finish. Polls are sparse while an operation is unlikely to be done, dense
+    between the 10th and 90th percentile of observed durations, and back off
+    again once an operation is overdue. Every interval is capped.
+    """
+
+    def __init__(
+        self,
+        min_interval: float = POLL_MIN_INTERVAL,
+        max_interval: float = POLL_MAX_INTERVAL,
+        validation_max_interval: float = VALIDATION_POLL_MAX_INTERVAL,
+        window: int = POLL_HISTORY_WINDOW,
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.validation_max_interval = validation_max_interval
+        self.window = window
+        self._samples: dict[tuple[str, str], deque] = {}
+        self._loaded_actions: set[str] = set()
+
+    def _load_history(self, action: str) -> None:
+        """Seed samples for an action from durations stored in the database."""
+        if action in self._loaded_actions:
+            return
+        self._loaded_actions.add(action)
+        # Rows come back newest first; append oldest first so the deque keeps the latest
+        for module_id, duration in reversed(
+            get_stage_durations(action, self.window * 10)
+        ):
+            if module_id and duration and duration > 0:
+                self._series(action, module_id).append(duration)
+
+    def _series(self, action: str, module_id: str) -> deque:
+        key = (action, module_id)
+        if key not in self._samples:
+            self._samples[key] = deque(maxlen=self.window)
+        return self._samples[key]
+
+    def record(self, action: str, module_id: str, duration: float) -> None:
+        """Add an observed completion time."""
+        self._load_history(action)
+        if module_id and duration > 0:
+            self._series(action, module_id).append(duration)
+
+    def percentiles(
+        self, action: str, module_id: str
+    ) -> Optional[tuple[float, float, float]]:
+        """Return (p10, p50, p90) durations, or None without enough history."""
+        self._load_history(action)
+        samples = sorted(self._samples.get((action, module_id), ()))
+        if len(samples) < MIN_SAMPLES:
+            return None
+
+        def pick(q: float) -> float:
+            return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+        return pick(0.1), pick(0.5), pick(0.9)
+
+    def next_interval(self, action: str, module_id: str, elapsed: float) -> float:
+        """Seconds to wait before the next status poll of an operation."""
+        is_validation = action.endswith("validation")
+        cap = self.validation_max_interval if is_validation else self.max_interval
+        default = DEFAULT_INTERVALS["validation"] if is_validation else DEFAULT_INTERVAL
+
+        model = self.percentiles(action, module_id)
+        if model is None:
+            interval = default
+        else:
+            p10, p50, p90 = model
+            if elapsed < p10:
+                # Too early to finish: sleep up to the start of the likely window
+                interval = p10 - elapsed
+            elif elapsed <= p90:
+                # Inside the likely window: poll densely
+                interval = (p90 - p10) / 10
+            else:
+                # Overdue: back off in proportion to how late the operation is
+                interval = (elapsed - p90) / 4 + (p90 - p10) / 10
+
+        return max(self.min_interval, min(cap, interval))
+
+    def stats(self) -> dict:
+        """Return the current model per stage and module for monitoring."""
+        stats = {}
+        for action, module_id in self._samples:
+            model = self.percentiles(action, module_id)
+            stats.setdefault(action, {})[module_id] = {
+                "samples": len(self._samples[(action, module_id)]),
+                "p10": model[0] if model else None,
+                "p50": model[1] if model else None,
+                "p90": model[2] if model else None,
+            }
+        return stats
+
+
+# Singleton instance of LatencyModel
+_latency_model: Optional[LatencyModel] = None
+
+
+def get_latency_model() -> LatencyModel:
+    """Get the shared latency model, creating it if necessary."""
+    global _latency_model
+    if _latency_model is None:
+        _latency_model = LatencyModel()
+    return _latency_model
@@ -0,0 +1,300 @@
+import time
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+import httpx
+from config.project_config import (
+    POLLER_TICK_SECONDS,
+    POLLER_WHEEL_SLOTS,
+    POLLER_MAX_CONCURRENT_POLLS,
+)
+from api.auth import AuthenticationError, TokenProvider
+from .du_client import get_du_client
+from .resilience import backoff_delay
+
+logger = logging.getLogger(__name__)
+
+# Status poll responses that say nothing about the operation, which is polled again
+RETRYABLE_POLL_STATUS_CODES = {401, 408, 429}
+
+
+@dataclass
+class PollResult:
+    """Outcome of evaluating one status response.
+
+    ``done`` resolves the operation with ``result``; otherwise the operation
+    is polled again after ``delay`` seconds.
+    """
+
+    done: bool = False
+    result: Any = None
+    delay: Optional[float] = None
+
+
+@dataclass
+class PolledOperation:
+    """A DU operation registered with the poller."""
+
+    operation_id: str
+    url: str
+    headers: dict
+    evaluate: Callable[[dict, "PolledOperation"], Awaitable[PollResult]]
+    future: asyncio.Future
+    interval: float
+    # Supplies a current Authorization header for each poll
+    token_provider: Optional[TokenProvider] = None
+    started_at: float = field(default_factory=time.time)
+    polls: int = 0
+    # Status polls in a row that failed before reaching the operation's status
+    failures: int = 0
+    due_tick: int = 0
+
+
+class TimerWheel:
+    """Hashed timing wheel.
+
+    Scheduling and expiry are O(1) per entry: each entry lands in the slot for
+    its due tick and is only released once the wheel has advanced that far.
+    """
+
+    def __init__(
+        self, tick: float = POLLER_TICK_SECONDS, slots: int = POLLER_WHEEL_SLOTS
+    ):
+        self.tick = tick
+        self.slots: list[list[PolledOperation]] = [[] for _ in range(slots)]
+        self._origin = time.monotonic()
+        self._current_tick = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _tick_at(self, now: float) -> int:
+        return int((now - self._origin) / self.tick)
+
+    def schedule(self, entry: PolledOperation, delay: float) -> None:
+        due_tick = max(
+            self._current_tick + 1,
+            self._tick_at(time.monotonic() + max(delay, 0.0)),
+        )
+        entry.due_tick = due_tick
+        self.slots[due_tick % len(self.slots)].append(entry)
+        self._size += 1
+
+    def advance(self) -> list[PolledOperation]:
+        """Advance to the current time and return every entry that is due."""
+        now_tick = self._tick_at(time.monotonic())
+        expired = []
+        # One full revolution visits every slot, so never walk further than that
+        start = max(self._current_tick + 1, now_tick - len(self.slots) + 1)
+        for tick in range(start, now_tick + 1):
+            slot = self.slots[tick % len(self.slots)]
+            if not slot:
+                continue
+            pending = []
+            for entry in slot:
+                (expired if entry.due_tick <= now_tick else pending).append(entry)
+            self.slots[tick % len(self.slots)] = pending
+        self._current_tick = max(self._current_tick, now_tick)
+        self._size -= len(expired)
+        return expired
+
+
+class OperationPoller:
+    """Polls every outstanding DU operation from a single asyncio task.
+
+    Operations are registered by operation_id and return a future that
+    resolves with the operation result, so callers await completion instead
+    of sleeping in their own loop. The number of threads and tasks used for
+    polling stays constant regardless of how many operations are in flight.
+    """
+
+    def __init__(
+        self,
+        tick: float = POLLER_TICK_SECONDS,
+        slots: int = POLLER_WHEEL_SLOTS,
+        max_concurrent_polls: int = POLLER_MAX_CONCURRENT_POLLS,
+    ):
+        self.wheel = TimerWheel(tick, slots)
+        self.max_concurrent_polls = max_concurrent_polls
+        self.operations: dict[str, PolledOperation] = {}
+        self.polls_sent = 0
+        self.failed_polls = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._runner: Optional[asyncio.Task] = None
+        self._poll_slots: Optional[asyncio.Semaphore] = None
+        self._in_flight: set[asyncio.Task] = set()
+
+    def register(
+        self,
+        operation_id: str,
+        url: str,
+        headers: dict,
+        evaluate: Callable[[dict, PolledOperation], Awaitable[PollResult]],
+        interval: float = 1.0,
+        callback: Optional[Callable[[asyncio.Future], None]] = None,
+        delay: float = 0,
+        token_provider: Optional[TokenProvider] = None,
+    ) -> asyncio.Future:
+        """Register an operation and return a future for its result.
+
+        The first poll is sent after ``delay`` seconds. Registering an
+        operation_id that is already being polled returns the existing future.
+        """
+        operation = self.operations.get(operation_id)
+        if operation is None:
+            loop = asyncio.get_running_loop()
+            operation = PolledOperation(
+                operation_id=operation_id,
+                url=url,
+                headers=headers,
+                evaluate=evaluate,
+                future=loop.create_future(),
+                interval=interval,
+                token_provider=token_provider,
+            )
+            self.operations[operation_id] = operation
+            operation.future.add_done_callback(
+                lambda _: self.operations.pop(operation_id, None)
+            )
+            self._ensure_running()
+            self._schedule(operation, delay)
+        if callback is not None:
+            operation.future.add_done_callback(callback)
+        return operation.future
+
+    def _ensure_running(self) -> None:
+        if self._runner is None or self._runner.done():
+            self._wakeup = asyncio.Event()
+            self._poll_slots = asyncio.Semaphore(self.max_concurrent_polls)
+            self._runner = asyncio.create_task(self._run(), name="OperationPoller")
+
+    def _schedule(self, operation: PolledOperation, delay: float) -> None:
+        self.wheel.schedule(operation, delay)
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            for operation in self.wheel.advance():
+                if not operation.future.done():
+                    task = asyncio.create_task(self._poll(operation))
+                    self._in_flight.add(task)
+                    task.add_done_callback(self._in_flight.discard)
+
+            # Tick while anything is scheduled, otherwise sleep until registered
+            timeout = self.wheel.tick if len(self.wheel) else None
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _poll(self, operation: PolledOperation) -> None:
+        try:
+            response = await self._get_status(operation)
+        except Exception as e:
+            if operation.future.done():
+                return
+            if not _is_retryable_poll_error(e):
+                operation.future.set_exception(e)
+                return
+            # The operation keeps running in DU, so poll it again once DU recovers
+            delay = max(operation.interval, backoff_delay(operation.failures))
+            operation.failures += 1
+            self.failed_polls += 1
+            logger.warning(
+                f"Status poll for operation {operation.operation_id} failed ({e!r}); "
+                f"polling again in {delay:.1f}s"
+            )
+            self._schedule(operation, delay)
+            return
+
+        operation.failures = 0
+        try:
+            outcome = await operation.evaluate(response.json(), operation)
+        except Exception as e:
+            if not operation.future.done():
+                operation.future.set_exception(e)
+            return
+
+        if operation.future.done():
+            return
+        if outcome.done:
+            operation.future.set_result(outcome.result)
+        else:
+            delay = outcome.delay if outcome.delay is not None else operation.interval
+            self._schedule(operation, delay)
+
+    async def _get_status(self, operation: PolledOperation) -> httpx.Response:
+        """Send one status poll and raise for an error response."""
+        headers = operation.headers
+        if operation.token_provider is not None:
+            # Operations can outlive a token, so resolve it on every poll
+            headers = {
+                **headers,
+                **await operation.token_provider.authorization_header(),
+            }
+        async with self._poll_slots:
+            response = await get_du_client().get(
+                operation.url, headers=headers, family="result"
+            )
+        self.polls_sent += 1
+        operation.polls += 1
+        response.raise_for_status()
+        return response
+
+    def stats(self) -> dict:
+        """Return poller counters for monitoring."""
+        return {
+            "outstanding_operations": len(self.operations),
+            "scheduled": len(self.wheel),
+            "polls_sent": self.polls_sent,
+            "failed_polls": self.failed_polls,
+        }
+
+    async def stop(self) -> None:
+        """Cancel the scheduler and fail any operation still outstanding."""
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+        for operation in list(self.operations.values()):
+            if not operation.future.done():
+                operation.future.cancel()
+        self.wheel = TimerWheel(self.wheel.tick, len(self.wheel.slots))
+
+
+def _is_retryable_poll_error(error: Exception) -> bool:
+    """True if a failed status poll leaves the operation's outcome unknown.
+
+    Transport errors, throttling, 5xx responses and token failures are
+    retried; other 4xx responses and failures to read the status are final.
+    """
+    if isinstance(error, (httpx.TransportError, AuthenticationError)):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        status_code = error.response.status_code
+        return status_code >= 500 or status_code in RETRYABLE_POLL_STATUS_CODES
+    return False
+
+
+# Singleton instance of OperationPoller
+_operation_poller: Optional[OperationPoller] = None
+
+
+def get_operation_poller() -> OperationPoller:
+    """Get the shared operation poller, creating it if necessary."""
+    global _operation_poller
+    if _operation_poller is None:
+        _operation_poller = OperationPoller()
+    return _operation_poller
+
+
+async def stop_operation_poller() -> None:
+    """Stop the shared operation poller."""
+    if _operation_poller is not None:
+        await _operation_poller.stop()
@@ -0,0 +1,211 @@
+import time
+import json
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+from models.settings_model import Settings
+
+logger = logging.getLogger(__name__)
+
+# Window used to report per-stage throughput
+THROUGHPUT_WINDOW_SECONDS = 60
+
+
+@dataclass
+class PipelineJob:
+    """A document moving through the processing pipeline."""
+
+    document_id: str
+    document_path: str
+    config: Settings
+    content_hash: Optional[str] = None
+    du_document_id: Optional[str] = None
+    document_type_id: Optional[str] = None
+    extractor_id: Optional[str] = None
+    extractor_name: Optional[str] = None
+    prompts: Optional[dict] = None
+    extraction_results: Optional[dict] = None
+    extraction_operation_id: Optional[str] = None
+    # Classified sub-documents of a split document (fan-out extraction)
+    splits: Optional[list[dict]] = None
+    split_extractions: Optional[list[dict]] = None
+    # Validation operation of each split by its pages ("start+count")
+    split_validation_operations: Optional[dict] = None
+    # Extraction started before classification finished (not persisted)
+    speculation: Optional[Any] = None
+    # {"extractor_id", "operation_id"} of that extraction once DU accepted it,
+    # so a restart reattaches to it instead of extracting again
+    speculative_operation: Optional[dict] = None
+    # DU operation already running for the job's current stage (set on resume)
+    operation_id: Optional[str] = None
+    enqueued_at: float = field(default_factory=time.time)
+
+    # Fields persisted with the job so it can be resumed after a restart
+    STATE_FIELDS = (
+        "content_hash",
+        "du_document_id",
+        "document_type_id",
+        "extractor_id",
+        "extractor_name",
+        "prompts",
+        "extraction_operation_id",
+        "splits",
+        "split_validation_operations",
+        "speculative_operation",
+    )
+
+    def take_operation(self) -> Optional[str]:
+        """Return the operation to reattach to for this stage, only once."""
+        operation_id, self.operation_id = self.operation_id, None
+        return operation_id
+
+    def to_state(self) -> str:
+        """Serialize the resumable part of the job to JSON."""
+        state = {name: getattr(self, name) for name in self.STATE_FIELDS}
+        state["config"] = self.config.model_dump()
+        return json.dumps(state)
+
+    @classmethod
+    def from_state(
+        cls,
+        document_id: str,
+        document_path: str,
+        state: str,
+        operation_id: Optional[str] = None,
+    ) -> "PipelineJob":
+        """Rebuild a job from its persisted state."""
+        data = json.loads(state)
+        config = Settings.model_validate(data.pop("config"))
+        return cls(
+            document_id,
+            document_path,
+            config,
+            operation_id=operation_id,
+            **{name: data.get(name) for name in cls.STATE_FIELDS},
+        )
+
+
+# A stage handler processes a job and returns the next stage name, or None when done
+StageHandler = Callable[[PipelineJob], Awaitable[Optional[str]]]
+
+
+class PipelineStage:
+    """A queue plus a fixed number of workers for one processing stage."""
+
+    def __init__(self, name: str, handler: StageHandler, concurrency: int):
+        self.name = name
+        self.handler = handler
+        self.concurrency = concurrency
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.in_progress = 0
+        self.completed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self._completions: deque = deque()
+
+    def record_finished(self, started: float) -> None:
+        now = time.time()
+        self.busy_seconds += now - started
+        self._completions.append(now)
+        while (
+            self._completions and self._completions[0] < now - THROUGHPUT_WINDOW_SECONDS
+        ):
+            self._completions.popleft()
+
+    def stats(self) -> dict:
+        now = time.time()
+        recent = sum(
+            1 for t in self._completions if t >= now - THROUGHPUT_WINDOW_SECONDS
+        )
+        finished = self.completed + self.failed
+        return {
+            "concurrency": self.concurrency,
+            "queue_depth": self.queue.qsize(),
+            "in_progress": self.in_progress,
+            "completed": self.completed,
+            "failed": self.failed,
+            "throughput_per_minute": recent * 60 / THROUGHPUT_WINDOW_SECONDS,
+            "avg_seconds": self.busy_seconds / finished if finished else None,
+        }
+
+
+class DocumentPipeline:
+    """Runs documents through independent per-stage worker pools.
+
+    Each stage has its own queue and concurrency limit, so a backlog in one
+    stage (e.g. slow extractions) does not stop new documents from being
+    digitized. When a stage finishes a job it hands it to the queue of the
+    stage its handler returned.
+    """
+
+    def __init__(
+        self,
+        stages: list[tuple[str, StageHandler, int]],
+        on_failure: Optional[
+            Callable[[PipelineJob, str, Exception], Awaitable[None]]
+        ] = None,
+    ):
+        self.stages = {
+            name: PipelineStage(name, handler, concurrency)
+            for name, handler, concurrency in stages
+        }
+        self.first_stage = stages[0][0]
+        self.on_failure = on_failure
+        self._workers: list[asyncio.Task] = []
+
+    def submit(self, job: PipelineJob, stage: Optional[str] = None) -> None:
+        """Queue a job at the given stage (the first stage by default)."""
+        self._ensure_workers()
+        self.stages[stage or self.first_stage].queue.put_nowait(job)
+
+    def _ensure_workers(self) -> None:
+        if self._workers and not all(worker.done() for worker in self._workers):
+            return
+        self._workers = [
+            asyncio.create_task(self._work(stage), name=f"{stage.name}-worker-{i}")
+            for stage in self.stages.values()
+            for i in range(stage.concurrency)
+        ]
+
+    async def _work(self, stage: PipelineStage) -> None:
+        while True:
+            job = await stage.queue.get()
+            stage.in_progress += 1
+            started = time.time()
+            try:
+                next_stage = await stage.handler(job)
+                stage.completed += 1
+                if next_stage is not None:
+                    self.stages[next_stage].queue.put_nowait(job)
+            except Exception as e:
+                stage.failed += 1
+                logger.error(
+                    f"{stage.name.capitalize()} stage failed for {job.document_path}: {e}",
+                    exc_info=True,
+                )
+                if self.on_failure is not None:
+                    # A failing callback must not take the worker down with it
+                    try:
+                        await self.on_failure(job, stage.name, e)
+                    except Exception:
+                        logger.error(
+                            f"Failure handler raised for {job.document_path}",
+                            exc_info=True,
+                        )
+            finally:
+                stage.in_progress -= 1
+                stage.record_finished(started)
+                stage.queue.task_done()
+
+    def stats(self) -> dict:
+        """Return queue depth and throughput for every stage."""
+        return {name: stage.stats() for name, stage in self.stages.items()}
+
+    async def stop(self) -> None:
+        """Cancel all stage workers."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
@@ -0,0 +1,114 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+PROMPTS_DIRECTORY = "generative_prompts"
+
+
+def compute_prompt_hash(prompts: Optional[dict]) -> str:
+    """Stable hash of a prompt set ("" when there are none)."""
+    if not prompts:
+        return ""
+    encoded = json.dumps(prompts, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class PromptEntry:
+    # (mtime_ns, size) of the file when it was read; None while it is missing
+    signature: Optional[tuple[int, int]]
+    prompts: Optional[dict]
+    prompt_hash: str
+
+
+class PromptRegistry:
+    """Process-wide cache of the ``<type>_prompts.json`` files.
+
+    Each file is parsed once and re-read only when its mtime or size
+    changes, so prompts can be edited without a restart. A missing file is
+    remembered too: it is reported once and then answered with None until it
+    appears. Loaded prompt sets are shared and must not be modified.
+    """
+
+    def __init__(self, directory: str = PROMPTS_DIRECTORY):
+        self.directory = directory
+        self._entries: dict[str, PromptEntry] = {}
+        # Precomputed hashes of the prompt sets currently held, by identity
+        self._hashes: dict[int, str] = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.hits = 0
+
+    def _path(self, document_type_id: str) -> str:
+        return os.path.join(self.directory, f"{document_type_id}_prompts.json")
+
+    def _entry(self, document_type_id: str) -> PromptEntry:
+        path = self._path(document_type_id)
+        try:
+            stat = os.stat(path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            signature = None
+
+        entry = self._entries.get(document_type_id)
+        if entry is not None and entry.signature == signature:
+            self.hits += 1
+            return entry
+
+        with self._lock:
+            entry = self._entries.get(document_type_id)
+            if entry is not None and entry.signature == signature:
+                return entry
+            if signature is None:
+                logger.error(f"Prompts file '{path}' not found")
+                prompts = None
+            else:
+                with open(path, "r", encoding="utf-8") as file:
+                    prompts = json.load(file)
+                self.loads += 1
+                if entry is not None:
+                    logger.info(f"Reloaded prompts from '{path}'")
+            new_entry = PromptEntry(signature, prompts, compute_prompt_hash(prompts))
+            if entry is not None and entry.prompts is not None:
+                self._hashes.pop(id(entry.prompts), None)
+            if prompts is not None:
+                self._hashes[id(prompts)] = new_entry.prompt_hash
+            self._entries[document_type_id] = new_entry
+            return new_entry
+
+    def get(self, document_type_id: str) -> Optional[dict]:
+        """Return the prompts for a document type, or None if it has none."""
+        return self._entry(document_type_id).prompts
+
+    def prompt_hash(self, document_type_id: str) -> str:
+        return self._entry(document_type_id).prompt_hash
+
+    def cached_hash(self, prompts: dict) -> Optional[str]:
+        """Return the precomputed hash of a prompt set loaded by the registry."""
+        return self._hashes.get(id(prompts))
+
+    def stats(self) -> dict:
+        return {
+            "files": len(self._entries),
+            "missing": sum(1 for e in self._entries.values() if e.prompts is None),
+            "loads": self.loads,
+            "hits": self.hits,
+        }
+
+
+# Singleton instance of PromptRegistry
+_prompt_registry: Optional[PromptRegistry] = None
+
+
+def get_prompt_registry() -> PromptRegistry:
+    """Get the shared prompt registry, creating it if necessary."""
+    global _prompt_registry
+    if _prompt_registry is None:
+        _prompt_registry = PromptRegistry()
+    return _prompt_registry
@@ -0,0 +1,227 @@
+import time
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from config.project_config import (
+    DU_RATE_LIMITS,
+    DU_RATE_BURST,
+    DU_MODULE_MAX_IN_FLIGHT,
+    DU_MODULE_IN_FLIGHT_OVERRIDES,
+    DU_UPLOAD_MAX_IN_FLIGHT_BYTES,
+)
+
+logger = logging.getLogger(__name__)
+
+# Delay applied after a 429 that carries no usable Retry-After header
+DEFAULT_RETRY_AFTER = 1.0
+
+
+class TokenBucket:
+    """Async token bucket; ``rate`` tokens per second up to ``burst``.
+
+    A rate of zero or less disables limiting. ``pause`` empties the bucket
+    and blocks every caller until the pause expires, which is how a 429
+    Retry-After from DU is honored for the whole endpoint family.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.capacity = max(1.0, burst)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.throttled = 0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> None:
+        if self.rate <= 0 and self.paused_until <= time.monotonic():
+            return
+        # The lock queues waiters so tokens are handed out in arrival order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                if self.rate <= 0:
+                    return
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        now = time.monotonic()
+        self.paused_until = max(self.paused_until, now + seconds)
+        self.tokens = 0
+        self.updated = now
+        self.throttled += 1
+
+    def stats(self) -> dict:
+        return {
+            "rate_per_second": self.rate,
+            "burst": self.capacity,
+            "paused_for": max(0.0, self.paused_until - time.monotonic()),
+            "throttled": self.throttled,
+        }
+
+
+class ByteBudget:
+    """Bounds the total size of uploads in flight at once.
+
+    A capacity of zero or less disables the limit. A file larger than the
+    whole budget waits until nothing else is uploading and then goes alone.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.in_use = 0
+        self.waiting = 0
+        self._condition = asyncio.Condition()
+
+    @asynccontextmanager
+    async def reserve(self, size: int):
+        if self.capacity <= 0:
+            yield
+            return
+        size = min(size, self.capacity)
+        async with self._condition:
+            self.waiting += 1
+            try:
+                await self._condition.wait_for(
+                    lambda: self.in_use + size <= self.capacity
+                )
+            finally:
+                self.waiting -= 1
+            self.in_use += size
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self.in_use -= size
+                self._condition.notify_all()
+
+    def stats(self) -> dict:
+        return {
+            "capacity_bytes": self.capacity,
+            "in_use_bytes": self.in_use,
+            "waiting": self.waiting,
+        }
+
+
+class RateLimiter:
+    """Request-rate buckets per DU endpoint family and in-flight caps per module.
+
+    Families are ``digitization``, ``classification``, ``extraction`` and
+    ``validation`` (the */start calls), ``result`` (status polling) and
+    ``discovery`` (projects, classifiers and extractors). The
+    module caps bound how many operations may run at once against one
+    classifier_id or extractor_id, across every service class, and the
+    upload budget bounds how many file bytes are being sent to DU at once.
+    """
+
+    def __init__(
+        self,
+        rates: dict[str, float] = DU_RATE_LIMITS,
+        burst: float = DU_RATE_BURST,
+        module_max_in_flight: int = DU_MODULE_MAX_IN_FLIGHT,
+        module_overrides: dict[str, int] = DU_MODULE_IN_FLIGHT_OVERRIDES,
+        upload_max_in_flight_bytes: int = DU_UPLOAD_MAX_IN_FLIGHT_BYTES,
+    ):
+        self.buckets = {
+            family: TokenBucket(rate, burst) for family, rate in rates.items()
+        }
+        self.module_max_in_flight = module_max_in_flight
+        self.module_overrides = module_overrides
+        self._module_slots: dict[str, asyncio.Semaphore] = {}
+        self._module_in_flight: dict[str, int] = {}
+        self.upload_budget = ByteBudget(upload_max_in_flight_bytes)
+
+    async def acquire(self, family: Optional[str]) -> None:
+        """Wait for a request token in the given endpoint family."""
+        bucket = self.buckets.get(family)
+        if bucket is not None:
+            await bucket.acquire()
+
+    def paces(self, family: Optional[str]) -> bool:
+        """True if requests in ``family`` wait in ``acquire``, including after a 429."""
+        return family in self.buckets
+
+    def throttle(self, family: Optional[str], retry_after: Optional[str]) -> float:
+        """Pause a family after a 429 and return the delay that was applied."""
+        delay = parse_retry_after(retry_after)
+        bucket = self.buckets.get(family)
+        if bucket is not None:
+            bucket.pause(delay)
+        logger.warning(f"DU throttled {family or 'request'}; backing off {delay:.1f}s")
+        return delay
+
+    def _module_slot(self, module_id: str) -> asyncio.Semaphore:
+        slot = self._module_slots.get(module_id)
+        if slot is None:
+            limit = self.module_overrides.get(module_id, self.module_max_in_flight)
+            slot = asyncio.Semaphore(limit)
+            self._module_slots[module_id] = slot
+        return slot
+
+    @asynccontextmanager
+    async def module_slot(self, module_id: Optional[str]):
+        """Hold one in-flight slot for a classifier or extractor."""
+        if not module_id or self.module_max_in_flight <= 0:
+            yield
+            return
+        async with self._module_slot(module_id):
+            self._module_in_flight[module_id] = (
+                self._module_in_flight.get(module_id, 0) + 1
+            )
+            try:
+                yield
+            finally:
+                self._module_in_flight[module_id] -= 1
+
+    def upload_bytes(self, size: int):
+        """Reserve ``size`` bytes of the upload budget for one file upload."""
+        return self.upload_budget.reserve(size)
+
+    def stats(self) -> dict:
+        """Return bucket state per family, module and upload usage."""
+        return {
+            "families": {
+                family: bucket.stats() for family, bucket in self.buckets.items()
+            },
+            "modules_in_flight": dict(self._module_in_flight),
+            "uploads": self.upload_budget.stats(),
+        }
+
+
+def parse_retry_after(value: Optional[str]) -> float:
+    """Parse a Retry-After header given in seconds or as an HTTP date."""
+    if not value:
+        return DEFAULT_RETRY_AFTER
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER
+
+
+# Singleton instance of RateLimiter
+_rate_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Get the shared rate limiter, creating it if necessary."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter()
+    return _rate_limiter
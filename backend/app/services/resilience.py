@@ -0,0 +1,229 @@
+import time
+import random
+import asyncio
+import logging
+from collections import deque
+from typing import Callable, Optional
+from config.project_config import (
+    DU_MAX_RETRIES,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+    RETRY_BUDGET_RATIO,
+    RETRY_BUDGET_MIN,
+    RETRY_BUDGET_WINDOW,
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_RESET_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def backoff_delay(
+    attempt: int, base: float = RETRY_BASE_DELAY, cap: float = RETRY_MAX_DELAY
+) -> float:
+    """Full-jitter exponential backoff for the given zero-based retry attempt."""
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+class RetryBudget:
+    """Caps retries at a fraction of the requests sent in a sliding window.
+
+    ``min_retries`` are always allowed per window so a quiet system can still
+    retry; beyond that every retry must be paid for by ``1 / ratio`` requests.
+    """
+
+    def __init__(
+        self,
+        ratio: float = RETRY_BUDGET_RATIO,
+        min_retries: int = RETRY_BUDGET_MIN,
+        window: float = RETRY_BUDGET_WINDOW,
+    ):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        self._requests: deque = deque()
+        self._retries: deque = deque()
+        self.total_requests = 0
+        self.total_retries = 0
+        self.rejected = 0
+
+    def _prune(self, now: float) -> None:
+        for events in (self._requests, self._retries):
+            while events and events[0] < now - self.window:
+                events.popleft()
+
+    def available(self) -> int:
+        self._prune(time.monotonic())
+        allowed = self.min_retries + self.ratio * len(self._requests)
+        return max(0, int(allowed) - len(self._retries))
+
+    def record_request(self) -> None:
+        self._requests.append(time.monotonic())
+        self.total_requests += 1
+
+    def try_spend(self) -> bool:
+        """Take one retry from the budget; False when it is exhausted."""
+        if self.available() <= 0:
+            self.rejected += 1
+            return False
+        self._retries.append(time.monotonic())
+        self.total_retries += 1
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.total_requests,
+            "retries": self.total_retries,
+            "rejected": self.rejected,
+            "available": self.available(),
+        }
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one extractor.
+
+    After ``failure_threshold`` failures in a row the breaker opens and
+    ``allow`` refuses work until ``reset_timeout`` has passed. It then lets a
+    single probe through (half-open): success closes the breaker, failure
+    opens it again. Work refused while open is parked and resumed when the
+    next probe may be sent or the breaker closes.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened = 0
+        # When the next probe may be sent while open or half-open
+        self.retry_at = 0.0
+        self._parked: list[Callable[[], None]] = []
+        self._release_handle: Optional[asyncio.TimerHandle] = None
+
+    def ready(self) -> bool:
+        """Return True if ``allow`` would let work through, without taking a probe."""
+        return self.state == self.CLOSED or time.monotonic() >= self.retry_at
+
+    def allow(self) -> bool:
+        """Return True if work may be sent to the extractor now."""
+        if self.state == self.CLOSED:
+            return True
+        now = time.monotonic()
+        if now < self.retry_at:
+            return False
+        # Let one probe through; a probe that never reports back is replaced
+        # by another once reset_timeout has passed
+        self.state = self.HALF_OPEN
+        self.retry_at = now + self.reset_timeout
+        return True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        if self.state != self.CLOSED:
+            logger.info(f"Circuit for {self.name} closed")
+            self.state = self.CLOSED
+            self._release()
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or (
+            self.state == self.CLOSED and self.failures >= self.failure_threshold
+        ):
+            self.state = self.OPEN
+            self.retry_at = time.monotonic() + self.reset_timeout
+            self.opened += 1
+            logger.warning(
+                f"Circuit for {self.name} opened after {self.failures} failures; "
+                f"retrying in {self.reset_timeout:.0f}s"
+            )
+            self._schedule_release()
+
+    def is_open(self) -> bool:
+        return self.state != self.CLOSED
+
+    def park(self, resume: Callable[[], None]) -> None:
+        """Hold work until the breaker may accept it, then call ``resume``."""
+        self._parked.append(resume)
+        self._schedule_release()
+
+    def _schedule_release(self) -> None:
+        if self._release_handle is not None:
+            self._release_handle.cancel()
+            self._release_handle = None
+        if not self._parked:
+            return
+        delay = 0.0 if self.state == self.CLOSED else self.retry_at - time.monotonic()
+        self._release_handle = asyncio.get_running_loop().call_later(
+            max(0.0, delay), self._release
+        )
+
+    def _release(self) -> None:
+        if self._release_handle is not None:
+            self._release_handle.cancel()
+            self._release_handle = None
+        parked, self._parked = self._parked, []
+        for resume in parked:
+            resume()
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.opened,
+            "retry_in": max(0.0, self.retry_at - time.monotonic())
+            if self.state != self.CLOSED
+            else None,
+            "parked": len(self._parked),
+        }
+
+
+class Resilience:
+    """Retry policy and circuit breakers shared by every DU call."""
+
+    def __init__(self, max_retries: int = DU_MAX_RETRIES):
+        self.max_retries = max_retries
+        self.budget = RetryBudget()
+        self.breakers: dict[str, CircuitBreaker] = {}
+
+    def should_retry(self, attempt: int, max_retries: Optional[int] = None) -> bool:
+        """Return True if retry ``attempt`` (zero-based) may be made."""
+        limit = self.max_retries if max_retries is None else max_retries
+        return attempt < limit and self.budget.try_spend()
+
+    def breaker(self, module_id: str) -> CircuitBreaker:
+        breaker = self.breakers.get(module_id)
+        if breaker is None:
+            breaker = CircuitBreaker(module_id)
+            self.breakers[module_id] = breaker
+        return breaker
+
+    def stats(self) -> dict:
+        """Return retry counters and the state of every breaker."""
+        return {
+            "retry_budget": self.budget.stats(),
+            "breakers": {
+                name: breaker.stats() for name, breaker in self.breakers.items()
+            },
+        }
+
+
+# Singleton instance of Resilience
+_resilience: Optional[Resilience] = None
+
+
+def get_resilience() -> Resilience:
+    """Get the shared resilience policy, creating it if necessary."""
+    global _resilience
+    if _resilience is None:
+        _resilience = Resilience()
+    return _resilience
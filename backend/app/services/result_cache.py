@@ -0,0 +1,120 @@
+import json
+import time
+from typing import Optional
+from config.project_config import (
+    RESULT_CACHE_ENABLED,
+    RESULT_CACHE_TTL_DAYS,
+    RESULT_CACHE_MAX_ENTRIES,
+)
+from database.db_utils import (
+    get_result_cache_entry,
+    save_result_cache_entry,
+    evict_result_cache,
+    delete_result_cache_entries,
+)
+from .prompt_registry import compute_prompt_hash, get_prompt_registry
+
+
+def prompt_hash(prompts: Optional[dict]) -> str:
+    """Stable hash of the prompts sent with a request ("" when there are none).
+
+    Prompt sets loaded through the prompt registry reuse its precomputed hash.
+    """
+    if not prompts:
+        return ""
+    cached = get_prompt_registry().cached_hash(prompts)
+    return cached if cached is not None else compute_prompt_hash(prompts)
+
+
+def page_scoped_hash(
+    content_hash: Optional[str], page_range: Optional[dict]
+) -> Optional[str]:
+    """Narrow a content hash to one page range of a split document."""
+    if not (content_hash and page_range):
+        return content_hash
+    return f"{content_hash}:{page_range['StartPage']}+{page_range['PageCount']}"
+
+
+class ResultCache:
+    """Persistent cache of raw classification and extraction results.
+
+    Entries are keyed by (action, document content hash, module id, prompt
+    hash), so re-running a batch with unchanged documents, modules and
+    prompts is served without calling DU. Entries expire after ``ttl_days``
+    and the least recently used are evicted beyond ``max_entries``.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = RESULT_CACHE_ENABLED,
+        ttl_days: float = RESULT_CACHE_TTL_DAYS,
+        max_entries: int = RESULT_CACHE_MAX_ENTRIES,
+    ):
+        self.enabled = enabled
+        self.max_age = ttl_days * 86400 if ttl_days > 0 else None
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self,
+        action: str,
+        content_hash: Optional[str],
+        module_id: str,
+        prompts: Optional[dict] = None,
+    ) -> Optional[tuple[dict, Optional[str]]]:
+        """Return (payload, operation_id) of a cached result, or None."""
+        if not (self.enabled and content_hash and module_id):
+            return None
+        entry = get_result_cache_entry(
+            action, content_hash, module_id, prompt_hash(prompts)
+        )
+        if entry is None or (self.max_age and time.time() - entry[2] > self.max_age):
+            self.misses += 1
+            return None
+        self.hits += 1
+        operation_id, payload, _ = entry
+        return json.loads(payload), operation_id
+
+    def put(
+        self,
+        action: str,
+        content_hash: Optional[str],
+        module_id: str,
+        payload: dict,
+        prompts: Optional[dict] = None,
+        operation_id: Optional[str] = None,
+    ) -> None:
+        """Store a result and evict expired or least recently used entries."""
+        if not (self.enabled and content_hash and module_id and payload):
+            return
+        save_result_cache_entry(
+            action,
+            content_hash,
+            module_id,
+            prompt_hash(prompts),
+            operation_id,
+            json.dumps(payload),
+        )
+        evict_result_cache(self.max_entries, self.max_age)
+
+    def invalidate(
+        self, action: Optional[str] = None, module_id: Optional[str] = None
+    ) -> int:
+        """Drop cached results, e.g. after a module is retrained."""
+        return delete_result_cache_entries(action, module_id)
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, "hits": self.hits, "misses": self.misses}
+
+
+# Singleton instance of ResultCache
+_result_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> ResultCache:
+    """Get the shared result cache, creating it if necessary."""
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = ResultCache()
+    return _result_cache
@@ -0,0 +1,71 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one in-flight task.
+
+    The first caller for a key starts the work; callers arriving while it
+    runs await the same task instead of repeating it. Once the task finishes
+    the key is released, so later calls run again (and usually hit a cache).
+    A caller that is cancelled does not cancel the shared work while other
+    callers still wait for it; when the last one is cancelled the work is
+    cancelled too, since nobody is left to use its result.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Task] = {}
+        self._waiters: dict[asyncio.Task, int] = {}
+        self.started = 0
+        self.coalesced = 0
+        self.cancelled = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``fn`` once per key at a time and return its result to every caller."""
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.create_task(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._release(key, done))
+            self.started += 1
+        else:
+            self.coalesced += 1
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters[task] == 1 and not task.done():
+                # Release the key first so a new caller starts fresh work
+                # instead of joining the cancelled task
+                self._release(key, task)
+                task.cancel()
+                self.cancelled += 1
+            raise
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+
+    def _release(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._calls),
+            "started": self.started,
+            "coalesced": self.coalesced,
+            "cancelled": self.cancelled,
+        }
+
+
+# Singleton instance of SingleFlight
+_single_flight: Optional[SingleFlight] = None
+
+
+def get_single_flight() -> SingleFlight:
+    """Get the shared single-flight registry, creating it if necessary."""
+    global _single_flight
+    if _single_flight is None:
+        _single_flight = SingleFlight()
+    return _single_flight
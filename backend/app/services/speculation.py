@@ -0,0 +1,110 @@
+import asyncio
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import Optional
+from config.project_config import (
+    SPECULATION_MIN_HIT_RATE,
+    SPECULATION_WARMUP,
+    SPECULATION_WINDOW,
+)
+
+
+@dataclass
+class Speculation:
+    """An extraction predicted before classification has finished.
+
+    ``task`` is None when the prediction was only recorded, not launched.
+    """
+
+    extractor_id: str
+    extractor_name: str
+    prompts: Optional[dict] = None
+    task: Optional[asyncio.Task] = None
+
+
+class SpeculationTracker:
+    """Predicts the extractor a document will need and tracks how often it is right.
+
+    The prediction is the extractor of the document type classified most
+    often in the project. Every classified document records whether the
+    prediction matched, whether or not an extraction was launched, so an
+    extractor that stops paying off is switched off and switches itself back
+    on if its hit rate recovers.
+    """
+
+    def __init__(
+        self,
+        min_hit_rate: float = SPECULATION_MIN_HIT_RATE,
+        warmup: int = SPECULATION_WARMUP,
+        window: int = SPECULATION_WINDOW,
+    ):
+        self.min_hit_rate = min_hit_rate
+        self.warmup = warmup
+        self.window = window
+        self._document_types: dict[str, Counter] = {}
+        self._outcomes: dict[str, deque] = {}
+        self.launched = 0
+        self.used = 0
+        self.discarded = 0
+
+    def predict_document_type(self, project_id: Optional[str]) -> Optional[str]:
+        counts = self._document_types.get(project_id)
+        if not counts:
+            return None
+        return counts.most_common(1)[0][0]
+
+    def record_document_type(
+        self, project_id: Optional[str], document_type_id: Optional[str]
+    ) -> None:
+        if document_type_id:
+            self._document_types.setdefault(project_id, Counter())[
+                document_type_id
+            ] += 1
+
+    def record(self, extractor_id: str, hit: bool) -> None:
+        """Record whether classification agreed with the predicted extractor."""
+        outcomes = self._outcomes.get(extractor_id)
+        if outcomes is None:
+            outcomes = deque(maxlen=self.window)
+            self._outcomes[extractor_id] = outcomes
+        outcomes.append(hit)
+
+    def hit_rate(self, extractor_id: str) -> Optional[float]:
+        outcomes = self._outcomes.get(extractor_id)
+        if not outcomes:
+            return None
+        return sum(outcomes) / len(outcomes)
+
+    def should_speculate(self, extractor_id: str) -> bool:
+        """Speculate while warming up, then only if the hit rate pays off."""
+        outcomes = self._outcomes.get(extractor_id, ())
+        if len(outcomes) < self.warmup:
+            return True
+        return self.hit_rate(extractor_id) >= self.min_hit_rate
+
+    def stats(self) -> dict:
+        return {
+            "launched": self.launched,
+            "used": self.used,
+            "discarded": self.discarded,
+            "extractors": {
+                extractor_id: {
+                    "samples": len(outcomes),
+                    "hit_rate": self.hit_rate(extractor_id),
+                    "enabled": self.should_speculate(extractor_id),
+                }
+                for extractor_id, outcomes in self._outcomes.items()
+            },
+        }
+
+
+# Singleton instance of SpeculationTracker
+_speculation_tracker: Optional[SpeculationTracker] = None
+
+
+def get_speculation_tracker() -> SpeculationTracker:
+    """Get the shared speculation tracker, creating it if necessary."""
+    global _speculation_tracker
+    if _speculation_tracker is None:
+        _speculation_tracker = SpeculationTracker()
+    return _speculation_tracker
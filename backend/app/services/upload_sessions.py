@@ -0,0 +1,216 @@
+import os
+import json
+import uuid
+import asyncio
+import logging
+from typing import AsyncIterator, Optional
+from config.project_config import (
+    CACHE_DIR,
+    UPLOAD_SESSION_DIR,
+    UPLOAD_MAX_FILE_BYTES,
+    UPLOAD_MAX_CHUNK_BYTES,
+    UPLOAD_SESSION_TTL_HOURS,
+)
+from database.db_utils import (
+    create_upload_session,
+    get_upload_session,
+    update_upload_session,
+    delete_upload_session,
+    get_expired_upload_sessions,
+    register_uploads,
+)
+from utils.file_hash import sha256_file
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_EXTENSIONS = (".png", ".jpg", ".jpeg", ".pdf", ".tif")
+
+
+class UploadSessionError(Exception):
+    """A request that does not fit the state of an upload session."""
+
+
+class UploadSessionNotFound(UploadSessionError):
+    """The upload session does not exist or has expired."""
+
+
+class UploadTooLarge(UploadSessionError):
+    """The announced file size is above the upload limit."""
+
+
+def merge_ranges(ranges: list[list[int]], start: int, end: int) -> list[list[int]]:
+    """Add the half-open byte range [start, end) to sorted, disjoint ranges."""
+    merged = []
+    for range_start, range_end in sorted(ranges + [[start, end]]):
+        if merged and range_start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], range_end)
+        else:
+            merged.append([range_start, range_end])
+    return merged
+
+
+class UploadSessions:
+    """Resumable chunked uploads.
+
+    A session reserves a partial file of the announced size. Chunks are
+    written at their offsets in any order, and the received byte ranges are
+    stored in SQLite so a client can ask what is missing after a dropped
+    connection or a restart and send only that. Finalizing a complete
+    session hashes the file, moves it into ``cache/documents/`` and registers
+    it as uploaded.
+    """
+
+    def __init__(
+        self,
+        directory: str = UPLOAD_SESSION_DIR,
+        documents_dir: str = os.path.join(CACHE_DIR, "documents"),
+        max_file_bytes: int = UPLOAD_MAX_FILE_BYTES,
+        max_chunk_bytes: int = UPLOAD_MAX_CHUNK_BYTES,
+        ttl_hours: float = UPLOAD_SESSION_TTL_HOURS,
+    ):
+        self.directory = directory
+        self.documents_dir = documents_dir
+        self.max_file_bytes = max_file_bytes
+        self.max_chunk_bytes = max_chunk_bytes
+        self.ttl_seconds = ttl_hours * 3600
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    def _part_path(self, session_id: str) -> str:
+        return os.path.join(self.directory, f"{session_id}.part")
+
+    def _lock(self, session_id: str) -> asyncio.Lock:
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[session_id] = lock
+        return lock
+
+    async def _load(self, session_id: str) -> tuple[str, int, list[list[int]]]:
+        session = await asyncio.to_thread(get_upload_session, session_id)
+        if session is None:
+            raise UploadSessionNotFound(f"Upload session {session_id} not found")
+        filename, size, received, _ = session
+        return filename, size, json.loads(received)
+
+    @staticmethod
+    def _describe(session_id: str, filename: str, size: int, ranges: list) -> dict:
+        received_bytes = sum(end - start for start, end in ranges)
+        return {
+            "session_id": session_id,
+            "filename": filename,
+            "size": size,
+            "received": ranges,
+            "received_bytes": received_bytes,
+            "complete": received_bytes == size,
+        }
+
+    def _remove(self, session_id: str) -> None:
+        path = self._part_path(session_id)
+        if os.path.exists(path):
+            os.remove(path)
+        delete_upload_session(session_id)
+        self._locks.pop(session_id, None)
+
+    def _expire(self) -> None:
+        for session_id in get_expired_upload_sessions(self.ttl_seconds):
+            logger.info(f"Removing expired upload session {session_id}")
+            self._remove(session_id)
+
+    def _allocate(self, session_id: str, size: int) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._part_path(session_id), "wb") as part:
+            part.truncate(size)
+
+    async def create(self, filename: str, size: int) -> dict:
+        """Start an upload of ``size`` bytes that will be saved as ``filename``."""
+        filename = os.path.basename(filename)
+        if not filename.lower().endswith(ALLOWED_EXTENSIONS):
+            raise UploadSessionError(f"Unsupported file type: {filename}")
+        # The partial file is allocated at full size up front
+        if size > self.max_file_bytes:
+            raise UploadTooLarge(
+                f"File is larger than the {self.max_file_bytes} byte limit"
+            )
+        await asyncio.to_thread(self._expire)
+
+        session_id = uuid.uuid4().hex
+        await asyncio.to_thread(self._allocate, session_id, size)
+        await asyncio.to_thread(create_upload_session, session_id, filename, size)
+        return self._describe(session_id, filename, size, [])
+
+    async def status(self, session_id: str) -> dict:
+        """Return the byte ranges received so far."""
+        return self._describe(session_id, *await self._load(session_id))
+
+    async def write_chunk(
+        self, session_id: str, offset: int, chunks: AsyncIterator[bytes]
+    ) -> dict:
+        """Write a streamed chunk at ``offset``.
+
+        Bytes written before a dropped connection or an oversized chunk are
+        still recorded, so the client only resends what is missing.
+        """
+        filename, size, _ = await self._load(session_id)
+        if not 0 <= offset < size:
+            raise UploadSessionError(f"Offset {offset} is outside 0..{size - 1}")
+
+        position = offset
+        part = await asyncio.to_thread(open, self._part_path(session_id), "r+b")
+        try:
+            await asyncio.to_thread(part.seek, offset)
+            async for data in chunks:
+                if position + len(data) > size:
+                    raise UploadSessionError("Chunk extends past the end of the file")
+                if position + len(data) - offset > self.max_chunk_bytes:
+                    raise UploadSessionError(
+                        f"Chunk is larger than {self.max_chunk_bytes} bytes"
+                    )
+                await asyncio.to_thread(part.write, data)
+                position += len(data)
+        finally:
+            await asyncio.to_thread(part.close)
+            if position > offset:
+                async with self._lock(session_id):
+                    _, _, ranges = await self._load(session_id)
+                    ranges = merge_ranges(ranges, offset, position)
+                    await asyncio.to_thread(
+                        update_upload_session, session_id, json.dumps(ranges)
+                    )
+        return await self.status(session_id)
+
+    async def finalize(self, session_id: str) -> dict:
+        """Move a fully received upload into place and register it."""
+        async with self._lock(session_id):
+            filename, size, ranges = await self._load(session_id)
+            if ranges != [[0, size]]:
+                raise UploadSessionError(
+                    "Upload is incomplete; query the session for missing ranges"
+                )
+            part_path = self._part_path(session_id)
+            content_hash = await asyncio.to_thread(sha256_file, part_path)
+            os.makedirs(self.documents_dir, exist_ok=True)
+            await asyncio.to_thread(
+                os.replace, part_path, os.path.join(self.documents_dir, filename)
+            )
+            await asyncio.to_thread(register_uploads, [(filename, content_hash, size)])
+            await asyncio.to_thread(delete_upload_session, session_id)
+        self._locks.pop(session_id, None)
+        return {"filename": filename, "size": size, "content_hash": content_hash}
+
+    async def abort(self, session_id: str) -> None:
+        """Discard an upload session and its partial file."""
+        await self._load(session_id)
+        async with self._lock(session_id):
+            await asyncio.to_thread(self._remove, session_id)
+
+
+# Singleton instance of UploadSessions
+_upload_sessions: Optional[UploadSessions] = None
+
+
+def get_upload_sessions() -> UploadSessions:
+    """Get the shared upload session manager, creating it if necessary."""
+    global _upload_sessions
+    if _upload_sessions is None:
+        _upload_sessions = UploadSessions()
+    return _upload_sessions
@@ -1,42 +1,46 @@
-import requests
+import asyncio
+import httpx
+from typing import Callable
 from database.db_utils import update_document_stage
+from .du_client import get_du_client
 from .async_request_handler import submit_validation_request
 
 
 class Validate:
-    def __init__(self, base_url, project_id, bearer_token):
+    def __init__(self, base_url, project_id, token_provider):
         self.base_url = base_url
         self.project_id = project_id
-        self.bearer_token = bearer_token
+        # Resolves the bearer token per request so it is never stale
+        self.token_provider = token_provider
 
-    def validate_extraction_results(
+    async def submit_extraction_validation(
         self,
         filename: str,
         extractor_id: str,
         document_id: str,
         extraction_results: dict,
         extraction_prompts: dict,
-        validate_extraction_later: bool = False,
-    ) -> dict | None:
+        on_operation: Callable[[str], None] | None = None,
+    ) -> str | None:
         """
-        Submits a validation request for extraction results and optionally waits for the result.
+        Submits a validation request for extraction results without waiting for it.
 
         Args:
             extractor_id (str): The ID of the extractor.
             document_id (str): The ID of the document.
             extraction_results (dict): The extraction results to validate.
             extraction_prompts (dict): Additional prompts for extraction validation.
-            validate_extraction_later (bool): If True, submits the request but does not wait for results.
+            on_operation (Callable | None): Called with the operation ID of the submitted request.
 
         Returns:
-            dict | None: The validation results, or None if validation is deferred.
+            str | None: The operation ID of the validation, or None if it could not be submitted.
         """
         # Define the API endpoint for validation
         api_url = f"{self.base_url}/du_/api/framework/projects/{self.project_id}/extractors/{extractor_id}/validation/start?api-version=1.1"
 
-        # Define the headers with the Bearer token and content type
+        # Define the headers with the bearer token and content type
         headers = {
-            "Authorization": f"Bearer {self.bearer_token}",
+            **await self.token_provider.authorization_header(),
             "accept": "text/plain",
             "Content-Type": "application/json",
         }
@@ -55,56 +59,70 @@ class Validate:
 
         try:
             # Make the POST request to initiate validation
-            response = requests.post(api_url, json=data, headers=headers, timeout=60)
+            response = await get_du_client().post(
+                api_url, json=data, headers=headers, family="validation"
+            )
             response.raise_for_status()  # Raise an exception for HTTP errors
 
-            if response.status_code == 202:
-                print("\nExtraction Validation request sent!")
-                # Parse the JSON response
-                response_data = response.json()
-                # Extract and return the operationId
-                operation_id = response_data.get("operationId")
-
-                # Update the document stage if operationId exists
-                if operation_id:
-                    update_document_stage(
-                        action="extraction_validation",
-                        document_id=document_id,
-                        new_stage="extraction-validation-submitted",
-                        operation_id=operation_id,
-                        error_code=None,
-                        error_message=None,
-                    )
+            if response.status_code != 202:
+                return None
+            print("\nExtraction Validation request sent!")
+            # Parse the JSON response
+            response_data = response.json()
+            # Extract and return the operationId
+            operation_id = response_data.get("operationId")
 
-                    if validate_extraction_later:
-                        # If deferred, do not wait for the result
-                        print(
-                            f"Validation request for document {document_id} submitted and deferred."
-                        )
-                        return None
-
-                    # Wait for the validation result
-                    validation_result = submit_validation_request(
-                        action="extraction_validation",
-                        bearer_token=self.bearer_token,
-                        base_url=self.base_url,
-                        project_id=self.project_id,
-                        operation_id=operation_id,
-                        module_id=extractor_id,
-                    )
-                    print("Extraction Validation Complete!\n")
-                    return validation_result
+            if not operation_id:
                 print(f"Error: {response.status_code} - {response.text}")
                 return None
 
-        except requests.exceptions.RequestException as e:
+            # Update the document stage now that the operationId exists
+            await asyncio.to_thread(
+                update_document_stage,
+                action="extraction_validation",
+                document_id=document_id,
+                new_stage="extraction-validation-submitted",
+                operation_id=operation_id,
+                error_code=None,
+                error_message=None,
+            )
+            if on_operation:
+                on_operation(operation_id)
+            return operation_id
+
+        except httpx.HTTPError as e:
             print(f"Error submitting extraction validation request: {e}")
             # Handle network-related errors
         except Exception as ex:
             print(f"An error occurred during extraction validation: {ex}")
             # Handle any other unexpected errors
 
-    def validate_classification_results(
+    async def wait_for_extraction_validation(
+        self, extractor_id: str, operation_id: str
+    ) -> dict | None:
+        """
+        Waits for a submitted extraction validation to be completed in Action Center.
+
+        Args:
+            extractor_id (str): The ID of the extractor.
+            operation_id (str): The operation ID returned when the validation was submitted.
+
+        Returns:
+            dict | None: The validation results, or None if the validation failed.
+        """
+        # The shared poller polls the operation; nothing else waits on DU meanwhile
+        validation_result = await submit_validation_request(
+            action="extraction_validation",
+            token_provider=self.token_provider,
+            base_url=self.base_url,
+            project_id=self.project_id,
+            operation_id=operation_id,
+            module_id=extractor_id,
+        )
+        print("Extraction Validation Complete!\n")
+        return validation_result
+
+    async def validate_classification_results(
         self,
         document_id: str,
         classifier_id: str,
@@ -118,9 +136,9 @@ class Validate:
             "DocumentTypeId"
         ]
 
-        # Define the headers with the Bearer token and content type
+        # Define the headers with the bearer token and content type
         headers = {
-            "Authorization": f"Bearer {self.bearer_token}",
+            **await self.token_provider.authorization_header(),
             "accept": "text/plain",
             "Content-Type": "application/json",
         }
@@ -140,7 +158,9 @@ class Validate:
 
         try:
             # Make the POST request to initiate validation
-            response = requests.post(api_url, json=data, headers=headers, timeout=60)
+            response = await get_du_client().post(
+                api_url, json=data, headers=headers, family="validation"
+            )
             response.raise_for_status()  # Raise an exception for HTTP errors
 
             if response.status_code == 202:
@@ -152,7 +172,8 @@ class Validate:
 
                 # Wait until the validation operation is completed
                 if operation_id:
-                    update_document_stage(
+                    await asyncio.to_thread(
+                        update_document_stage,
                         action="classification_validation",
                         document_id=document_id,
                         new_stage="classification-validation-submitted",
@@ -160,9 +181,9 @@ class Validate:
                         error_code=None,
                         error_message=None,
                     )
-                    validation_result = submit_validation_request(
+                    validation_result = await submit_validation_request(
                         action="classification_validation",
-                        bearer_token=self.bearer_token,
+                        token_provider=self.token_provider,
                         base_url=self.base_url,
                         project_id=self.project_id,
                         operation_id=operation_id,
@@ -179,7 +200,7 @@ class Validate:
             print(f"Error: {response.status_code} - {response.text}")
             return None
 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"Error submitting classification validation request: {e}")
             # Handle network-related errors
         except Exception as ex:
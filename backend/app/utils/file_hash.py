@@ -0,0 +1,13 @@
+import hashlib
+
+# Read size used when hashing files, so large documents never sit in memory
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def sha256_file(path: str, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """Return the hex SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
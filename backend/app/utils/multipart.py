@@ -0,0 +1,58 @@
+import os
+import asyncio
+import secrets
+from typing import AsyncIterator
+
+# Bytes read from disk per chunk while streaming an upload
+UPLOAD_CHUNK_SIZE = 256 * 1024
+
+
+class MultipartFile:
+    """multipart/form-data body for a single file, streamed from disk.
+
+    Only one chunk of the file is held in memory at a time and reads run off
+    the event loop. The file is opened when iteration starts and always
+    closed when it ends, even if the upload fails part way. Every iteration
+    starts again from the beginning, so the same body can be re-sent when a
+    request is retried.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        field_name: str,
+        filename: str,
+        content_type: str,
+        chunk_size: int = UPLOAD_CHUNK_SIZE,
+    ):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.size = os.path.getsize(path)
+        self.boundary = secrets.token_hex(16)
+        quoted_name = filename.replace('"', "%22")
+        self._head = (
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field_name}"; '
+            f'filename="{quoted_name}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode("utf-8")
+        self._tail = f"\r\n--{self.boundary}--\r\n".encode("utf-8")
+
+    @property
+    def headers(self) -> dict:
+        """Content-Type and Content-Length headers for the body."""
+        length = len(self._head) + self.size + len(self._tail)
+        return {
+            "Content-Type": f"multipart/form-data; boundary={self.boundary}",
+            "Content-Length": str(length),
+        }
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        yield self._head
+        file = await asyncio.to_thread(open, self.path, "rb")
+        try:
+            while chunk := await asyncio.to_thread(file.read, self.chunk_size):
+                yield chunk
+        finally:
+            file.close()
+        yield self._tail
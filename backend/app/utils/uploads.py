@@ -0,0 +1,37 @@
+import os
+import asyncio
+import hashlib
+import tempfile
+from fastapi import UploadFile
+
+# Bytes read from the request body per chunk
+UPLOAD_READ_CHUNK_SIZE = 1024 * 1024
+
+
+async def save_upload(
+    upload: UploadFile, directory: str, filename: str
+) -> tuple[str, int]:
+    """Stream an uploaded file to ``directory`` and return (sha256, size).
+
+    The body is written in chunks to a temporary file in the same directory
+    and renamed into place once complete, so a partial upload never replaces
+    an existing document. Disk writes run off the event loop and the hash is
+    computed in the same pass.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".upload-")
+    try:
+        with os.fdopen(fd, "wb") as buffer:
+            while chunk := await upload.read(UPLOAD_READ_CHUNK_SIZE):
+                digest.update(chunk)
+                size += len(chunk)
+                await asyncio.to_thread(buffer.write, chunk)
+        await asyncio.to_thread(
+            os.replace, temp_path, os.path.join(directory, filename)
+        )
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return digest.hexdigest(), size
@@ -1,7 +1,63 @@
 import os
 import csv
 import sqlite3
-from config.project_config import SQLITE_DB_PATH
+from database.connection import get_connection
+
+
+# Column order of every extraction row written by WriteResults
+EXTRACTION_ROW_COLUMNS = (
+    "filename",
+    "document_id",
+    "document_type_id",
+    "field_id",
+    "field",
+    "is_missing",
+    "field_value",
+    "field_unformatted_value",
+    "confidence",
+    "ocr_confidence",
+    "operator_confirmed",
+    "is_correct",
+    "page_range",
+    "page_count",
+    "row_index",
+    "column_index",
+)
+EXTRACTION_KEY_COLUMNS = (
+    "filename",
+    "page_range",
+    "field_id",
+    "field",
+    "row_index",
+    "column_index",
+)
+
+# Built once; every row of a result is sent through one executemany
+UPSERT_EXTRACTION_SQL = f"""
+    INSERT INTO extraction ({", ".join(EXTRACTION_ROW_COLUMNS)})
+    VALUES ({", ".join("?" * len(EXTRACTION_ROW_COLUMNS))})
+    ON CONFLICT({", ".join(EXTRACTION_KEY_COLUMNS)})
+    DO UPDATE SET {
+    ", ".join(
+        f"{column} = excluded.{column}"
+        for column in EXTRACTION_ROW_COLUMNS
+        if column not in EXTRACTION_KEY_COLUMNS
+    )
+}
+"""
+
+UPDATE_VALIDATED_FIELD_SQL = """
+    UPDATE extraction
+    SET validated_field_value = ?, operator_confirmed = ?, is_correct = ?
+    WHERE document_id = ? AND field_id = ? AND (? IS NULL OR page_range = ?)
+"""
+
+UPDATE_VALIDATED_CELL_SQL = """
+    UPDATE extraction
+    SET validated_field_value = ?, operator_confirmed = ?, is_correct = ?
+    WHERE document_id = ? AND field_id = ? AND field = ? AND row_index = ? AND column_index = ?
+    AND (? IS NULL OR page_range = ?)
+"""
 
 
 class WriteResults:
@@ -10,7 +66,8 @@ class WriteResults:
     ):
         self.extraction_results = extraction_results
         self.validation_results = validation_extraction_results
-        self.conn = sqlite3.connect(SQLITE_DB_PATH)
+        # The calling thread's shared connection; it stays open afterwards
+        self.conn = get_connection()
         self.cursor = self.conn.cursor()
         self.filename = os.path.basename(document_path)
 
@@ -28,182 +85,141 @@ class WriteResults:
             header_dict[field_id] = field_headers
         return header_dict
 
-    def insert_field_data(self):
-        document_id = self.extraction_results["extractionResult"]["DocumentId"]
-        document_type_id = self.extraction_results["extractionResult"][
+    def _results_document(self):
+        results_document = self.extraction_results["extractionResult"][
             "ResultsDocument"
-        ]["DocumentTypeId"]
-        page_range = self.extraction_results["extractionResult"]["ResultsDocument"][
-            "Bounds"
-        ]["PageRange"]
-        page_count = self.extraction_results["extractionResult"]["ResultsDocument"][
-            "Bounds"
-        ]["PageCount"]
+        ]
+        return (
+            self.extraction_results["extractionResult"]["DocumentId"],
+            results_document["DocumentTypeId"],
+            results_document["Bounds"]["PageRange"],
+            results_document["Bounds"]["PageCount"],
+        )
 
+    def field_rows(self) -> list[tuple]:
+        """Extraction rows of the document's fields, in EXTRACTION_ROW_COLUMNS order."""
+        document_id, document_type_id, page_range, page_count = self._results_document()
+        rows = []
         for field in self.extraction_results["extractionResult"]["ResultsDocument"][
             "Fields"
         ]:
-            field_data = {
-                "filename": self.filename,
-                "document_id": document_id,
-                "document_type_id": document_type_id,
-                "field_id": field.get("FieldId"),
-                "field": field.get("FieldName"),
-                "is_missing": field.get("IsMissing"),
-                "field_value": None,
-                "field_unformatted_value": None,
-                "confidence": None,
-                "ocr_confidence": None,
-                "operator_confirmed": None,
-                "is_correct": True,
-                "page_range": page_range,
-                "page_count": page_count,
-            }
-            if "Values" in field and field["Values"]:
-                field_data.update(
-                    {
-                        "field_value": field["Values"][0].get("Value"),
-                        "field_unformatted_value": field["Values"][0].get(
-                            "UnformattedValue"
-                        ),
-                        "confidence": field["Values"][0].get("Confidence"),
-                        "ocr_confidence": field["Values"][0].get("OcrConfidence"),
-                        "operator_confirmed": field["Values"][0].get(
-                            "OperatorConfirmed"
-                        ),
-                    }
+            first_value = field["Values"][0] if field.get("Values") else {}
+            rows.append(
+                (
+                    self.filename,
+                    document_id,
+                    document_type_id,
+                    field.get("FieldId"),
+                    field.get("FieldName"),
+                    field.get("IsMissing"),
+                    first_value.get("Value"),
+                    first_value.get("UnformattedValue"),
+                    first_value.get("Confidence"),
+                    first_value.get("OcrConfidence"),
+                    first_value.get("OperatorConfirmed"),
+                    True,
+                    page_range,
+                    page_count,
+                    -1,  # Fields are not table cells
+                    -1,
                 )
-            columns = ", ".join(field_data.keys())
-            placeholders = ", ".join(["?"] * len(field_data))
-            update_assignments = ", ".join(
-                f"{key} = excluded.{key}" for key in field_data.keys()
             )
+        return rows
 
-            # Upsert SQL query
-            sql = f"""
-                INSERT INTO extraction ({columns})
-                VALUES ({placeholders})
-                ON CONFLICT(filename, field_id, field, row_index, column_index)
-                DO UPDATE SET {update_assignments}
-            """
+    def table_rows(self) -> list[tuple]:
+        """Extraction rows of every non-header table cell, in EXTRACTION_ROW_COLUMNS order."""
+        document_id, document_type_id, page_range, page_count = self._results_document()
+        tables = (
+            self.extraction_results.get("extractionResult", {})
+            .get("ResultsDocument", {})
+            .get("Tables", [])
+        )
+        rows = []
+        for table in tables or []:
+            headers_lookup = self.create_headers_lookup_dict([table])
+            field_id = table["FieldId"]
+            headers = headers_lookup.get(field_id, {})
 
-            self.cursor.execute(sql, list(field_data.values()))
+            for value in table["Values"]:
+                for cell in value["Cells"]:
+                    # Skip header row
+                    if cell["RowIndex"] == 0 or cell["IsHeader"]:
+                        continue
+                    cell_values = cell.get("Values", [{}])
+                    first_value = cell_values[0] if cell_values else {}
+                    rows.append(
+                        (
+                            self.filename,
+                            document_id,
+                            document_type_id,
+                            field_id,
+                            headers.get(cell["ColumnIndex"]),
+                            cell.get("IsMissing", False),
+                            first_value.get("Value"),
+                            first_value.get("UnformattedValue"),
+                            first_value.get("Confidence"),
+                            first_value.get("OcrConfidence"),
+                            first_value.get("OperatorConfirmed"),
+                            first_value.get("DataSource") != "ManuallyChanged",
+                            page_range,
+                            page_count,
+                            cell["RowIndex"],
+                            cell["ColumnIndex"],
+                        )
+                    )
+        return rows
 
-    def insert_table_data(self):
-        document_id = self.extraction_results["extractionResult"]["DocumentId"]
-        document_type_id = self.extraction_results["extractionResult"][
-            "ResultsDocument"
-        ]["DocumentTypeId"]
+    def insert_field_data(self):
+        self.cursor.executemany(UPSERT_EXTRACTION_SQL, self.field_rows())
 
-        page_range = self.extraction_results["extractionResult"]["ResultsDocument"][
-            "Bounds"
-        ]["PageRange"]
-        page_count = self.extraction_results["extractionResult"]["ResultsDocument"][
-            "Bounds"
-        ]["PageCount"]
+    def insert_table_data(self):
+        self.cursor.executemany(UPSERT_EXTRACTION_SQL, self.table_rows())
 
-        tables = (
-            self.extraction_results.get("extractionResult", {})
+    def _validated_page_range(self):
+        """Page range of the validated split, used to scope the updates to it."""
+        return (
+            self.validation_results["result"]["validatedExtractionResults"]
             .get("ResultsDocument", {})
-            .get("Tables", [])
+            .get("Bounds", {})
+            .get("PageRange")
         )
-        if tables:
-            for table in tables:
-                headers_lookup = self.create_headers_lookup_dict([table])
-                field_id = table["FieldId"]
-                headers = headers_lookup.get(field_id, {})
-
-                for value in table["Values"]:
-                    for cell in value["Cells"]:
-                        # Skip header row
-                        if cell["RowIndex"] != 0 and not cell["IsHeader"]:
-                            cell_values = cell.get("Values", [{}])
-                            first_value = cell_values[0] if cell_values else {}
-
-                            row_data = {
-                                "filename": self.filename,
-                                "document_id": document_id,
-                                "document_type_id": document_type_id,
-                                "field_id": field_id,
-                                "field": headers.get(cell["ColumnIndex"]),
-                                "is_missing": cell.get("IsMissing", False),
-                                "field_value": first_value.get("Value"),
-                                "field_unformatted_value": first_value.get(
-                                    "UnformattedValue"
-                                ),
-                                "confidence": first_value.get("Confidence"),
-                                "ocr_confidence": first_value.get("OcrConfidence"),
-                                "operator_confirmed": first_value.get(
-                                    "OperatorConfirmed"
-                                ),
-                                "is_correct": (
-                                    first_value.get("DataSource") != "ManuallyChanged"
-                                ),
-                                "page_range": page_range,
-                                "page_count": page_count,
-                                "row_index": cell["RowIndex"],
-                                "column_index": cell["ColumnIndex"],
-                            }
-
-                            # Dynamic upsert SQL query
-                            columns = ", ".join(row_data.keys())
-                            placeholders = ", ".join(["?"] * len(row_data))
-                            update_assignments = ", ".join(
-                                f"{key} = excluded.{key}" for key in row_data.keys()
-                            )
-
-                            sql = f"""
-                                INSERT INTO extraction ({columns})
-                                VALUES ({placeholders})
-                                ON CONFLICT(filename, field_id, field, row_index, column_index)
-                                DO UPDATE SET {update_assignments}
-                            """
-                            self.cursor.execute(sql, list(row_data.values()))
 
     def update_validated_field_data(self):
         document_id = self.validation_results["result"]["validatedExtractionResults"][
             "DocumentId"
         ]
+        page_range = self._validated_page_range()
 
-        # Iterate through each field in the validatedExtractionResults
+        # One update per field, sent together
+        updates = []
         for field in self.validation_results["result"]["validatedExtractionResults"][
             "ResultsDocument"
         ]["Fields"]:
-            field_id = field.get("FieldId")
-            operator_confirmed = field.get("OperatorConfirmed")
             validated_value = (
                 field.get("Values", [{}])[0].get("Value", None)
                 if field.get("Values")
                 else None
             )
-
             # Determine is_correct based on the DataSource
-            if field.get("DataSource") in {"ManuallyChanged", "Manual"}:
-                is_correct = False
-            else:
-                is_correct = True
-
-            # Update the validated_field_value in the database for the corresponding DocumentId and FieldId
-            sql = """
-                UPDATE extraction
-                SET validated_field_value = ?, operator_confirmed = ?, is_correct = ?
-                WHERE document_id = ? AND field_id = ?
-            """
-            self.cursor.execute(
-                sql,
+            is_correct = field.get("DataSource") not in {"ManuallyChanged", "Manual"}
+            updates.append(
                 (
                     validated_value,
-                    operator_confirmed,
+                    field.get("OperatorConfirmed"),
                     is_correct,
                     document_id,
-                    field_id,
-                ),
+                    field.get("FieldId"),
+                    page_range,
+                    page_range,
+                )
             )
+        self.cursor.executemany(UPDATE_VALIDATED_FIELD_SQL, updates)
 
     def update_validated_table_data(self):
         document_id = self.validation_results["result"]["validatedExtractionResults"][
             "DocumentId"
         ]
+        page_range = self._validated_page_range()
 
         # Retrieve tables from validatedExtractionResults
         tables = (
@@ -212,56 +228,44 @@ class WriteResults:
             .get("ResultsDocument", {})
             .get("Tables", [])
         )
-        if tables:
-            for table in tables:
-                headers_lookup = self.create_headers_lookup_dict([table])
-                field_id = table["FieldId"]
-                headers = headers_lookup.get(field_id, {})
-
-                # Iterate over each row in the table
-                for value in table["Values"]:
-                    for cell in value["Cells"]:
-                        # Only process non-header rows
-                        if cell["RowIndex"] != 0 and not cell["IsHeader"]:
-                            cell_values = cell.get("Values", [{}])
-                            first_value = cell_values[0] if cell_values else {}
-
-                            # Get validated_field_value and other relevant data
-                            validated_field_value = first_value.get("Value", None)
-                            operator_confirmed = cell.get("OperatorConfirmed")
-                            is_correct = cell.get("DataSource") not in {
-                                "ManuallyChanged",
-                                "Manual",
-                            }
-
-                            # Map to the appropriate database field name for the cell's column
-                            field_name = headers.get(cell["ColumnIndex"])
-                            if field_name is None:
-                                print(
-                                    f"Warning: Column index {cell['ColumnIndex']} not found in headers."
-                                )
-                                continue  # Skip if field name is not found
-
-                            # Execute a separate update for each cell to ensure accurate row-by-row updates
-                            sql = """
-                                UPDATE extraction
-                                SET validated_field_value = ?, operator_confirmed = ?, is_correct = ?
-                                WHERE document_id = ? AND field_id = ? AND field = ? AND row_index = ? AND column_index = ?
-                            """
-                            # Execute the update with the prepared data
-                            self.cursor.execute(
-                                sql,
-                                (
-                                    validated_field_value,
-                                    operator_confirmed,
-                                    is_correct,
-                                    document_id,
-                                    field_id,
-                                    field_name,
-                                    cell["RowIndex"],  # Unique row index
-                                    cell["ColumnIndex"],  # Unique column index
-                                ),
-                            )
+        # One update per non-header cell, sent together
+        updates = []
+        for table in tables or []:
+            headers_lookup = self.create_headers_lookup_dict([table])
+            field_id = table["FieldId"]
+            headers = headers_lookup.get(field_id, {})
+
+            for value in table["Values"]:
+                for cell in value["Cells"]:
+                    # Only process non-header rows
+                    if cell["RowIndex"] == 0 or cell["IsHeader"]:
+                        continue
+                    cell_values = cell.get("Values", [{}])
+                    first_value = cell_values[0] if cell_values else {}
+
+                    # Map to the appropriate database field name for the cell's column
+                    field_name = headers.get(cell["ColumnIndex"])
+                    if field_name is None:
+                        print(
+                            f"Warning: Column index {cell['ColumnIndex']} not found in headers."
+                        )
+                        continue  # Skip if field name is not found
+
+                    updates.append(
+                        (
+                            first_value.get("Value", None),
+                            cell.get("OperatorConfirmed"),
+                            cell.get("DataSource") not in {"ManuallyChanged", "Manual"},
+                            document_id,
+                            field_id,
+                            field_name,
+                            cell["RowIndex"],
+                            cell["ColumnIndex"],
+                            page_range,
+                            page_range,
+                        )
+                    )
+        self.cursor.executemany(UPDATE_VALIDATED_CELL_SQL, updates)
 
     def write_extraction_results(self):
         self.insert_field_data()
@@ -347,5 +351,4 @@ class WriteResults:
             print(f"An error occurred: {e}")
             self.conn.rollback()  # Rollback in case of error
         finally:
-            # Close the connection after all operations
-            self.conn.close()
+            self.cursor.close()